@@ -375,8 +375,28 @@ spec_1, spec_2 = np.meshgrid(spec_1, spec_2)
 
 # %% Run TRY analysis 
 
-data_1 = BDO_data = spec.evaluate_across_specs(
-        BDO_sys, spec_1, spec_2, BDO_metrics, spec_3)
+# Set to True to split the grid across worker processes; note that each 
+# worker builds its own system and evaluates the metrics in setup_TRY_worker
+run_in_parallel = False
+
+# Set to a path prefix (e.g. 'BDO_TRY_checkpoint') to save each completed 
+# (yield, titer) point to disk as it is evaluated; rerunning this cell with the
+# same grid resumes an interrupted analysis from the completed points
+checkpoint = None
+
+# Set to True to walk the grid in serpentine order, seeding each point with 
+# the converged recycle states of its closest neighbour
+warm_start = False
+
+if run_in_parallel:
+    from biorefineries.BDO._process_specification import setup_TRY_worker
+    data_1 = BDO_data = spec.evaluate_across_specs_in_parallel(
+            setup_TRY_worker, spec_1, spec_2, spec_3, checkpoint=checkpoint,
+            warm_start=warm_start)
+else:
+    data_1 = BDO_data = spec.evaluate_across_specs(
+            BDO_sys, spec_1, spec_2, BDO_metrics, spec_3, checkpoint=checkpoint,
+            warm_start=warm_start)
 
 # spec.load_spec_1 = spec.load_dehydration_conversion
 # spec.load_spec_2 = spec.load_titer
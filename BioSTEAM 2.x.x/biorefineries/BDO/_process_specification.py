@@ -8,26 +8,35 @@ Created on Fri Jul 31 12:00:51 2020
 import biosteam as bst
 import flexsolve as flx
 import numpy as np
+from biorefineries.utils import SpecificationSweep, prepare_TRY_worker
 # from biosteam.process_tools.reactor_specification import evaluate_across_TRY
 _kg_per_ton = 907.18474
 def evaluate_across_specs(spec, system,
             spec_1, spec_2, metrics, spec_3):
+    spec.count += 1
     try:
         spec.load_specifications(spec_1=spec_1, spec_2=spec_2)
         system.simulate()
-    except (ValueError, RuntimeError): # (ValueError, RuntimeError) (ValueError, AssertionError)
+    except (ValueError, RuntimeError) as e: # (ValueError, RuntimeError) (ValueError, AssertionError)
+        spec.count_exceptions += 1
+        spec.exceptions_dict[spec.count] = e
         return np.nan*np.ones([len(metrics), len(spec_3)])
     return spec.evaluate_across_productivity(metrics, spec_3)
+
+
+def setup_TRY_worker():
+    """
+    Return the process specification, system, and metrics (MPSP, GWP, and FEC)
+    for TRY analysis. This function is called once by each worker of 
+    ProcessSpecification.evaluate_across_specs_in_parallel.
     
-evaluate_across_specs = np.vectorize(
-    evaluate_across_specs, 
-    excluded=['spec', 'system', 'metrics', 'spec_3'],
-    signature='(),(),(),(),(m),(p)->(m,p)'
-)
+    """
+    from biorefineries.BDO.system_MS2 import BDO_sys, BDO_tea, MEK, spec, get_GWP, get_FEC
+    return prepare_TRY_worker(spec, BDO_sys, BDO_tea, MEK, get_GWP, get_FEC)
 
 
 
-class ProcessSpecification(bst.process_tools.ReactorSpecification):
+class ProcessSpecification(SpecificationSweep, bst.process_tools.ReactorSpecification):
     
     __slots__ = ('reactor',
                  'substrates',
@@ -46,7 +55,11 @@ class ProcessSpecification(bst.process_tools.ReactorSpecification):
                  'load_spec_3',
                  'feedstock',
                  'dehydration_reactor', 
-                 'byproduct_streams')
+                 'byproduct_streams',
+                 'count',
+                 'count_exceptions',
+                 'total_iterations',
+                 'exceptions_dict')
     
     def __init__(self, evaporator, mixer, reactor, reaction_name, substrates, products,
                  spec_1, spec_2, spec_3, path, xylose_utilization_fraction,
@@ -66,6 +79,11 @@ class ProcessSpecification(bst.process_tools.ReactorSpecification):
         self.feedstock = feedstock
         self.dehydration_reactor = dehydration_reactor
         self.byproduct_streams = byproduct_streams
+        
+        self.count = 0
+        self.count_exceptions = 0
+        self.total_iterations = 0
+        self.exceptions_dict = {}
         # self.load_spec_1 = load_spec_1
         # self.load_spec_2 = load_spec_2
         # self.load_spec_3 = load_spec_3
@@ -122,44 +140,15 @@ class ProcessSpecification(bst.process_tools.ReactorSpecification):
             data[:, i] = [j() for j in metrics]
         return data
 
-    def evaluate_across_specs(self, system, 
-            spec_1, spec_2, metrics, spec_3):
-        
+    def evaluate_at_specs(self, system, spec_1, spec_2, metrics, spec_3):
         """
-        Evaluate metrics at given titer and yield across a set of 
-        productivities. Return an array with the all metric results.
-            
-        Parameters
-        ----------
-        titer : array_like[shape]
-            Titer to evaluate.
-        yield_ : array_like[shape]
-            Yield to evaluate.
-        metrics : Iterable[Callable; M elements]
-            Should return a number given no parameters.
-        productivities : array_like[P elements]
-            Productivities to evaluate.
-        
-        Returns
-        -------
-        results : array[shape x M x P]
-            All metric results at given titer/yield across productivities.
-        
-        Notes
-        -----
-        This method is vectorized along titer and yield. If, for example,
-        the parameters had the following dimensions:
-            
-        titer [Y x T], yield [Y x T], metrics [M], productivities [P]
-        
-        This method would return an array with the following dimensions:
-        
-        results [Y x T x M x P]
+        Evaluate metrics at a single titer and yield across a set of 
+        productivities. Return an array with the all metric results
+        (array[M x P]).
         
         """
-        return evaluate_across_specs(self, system, 
-                                   spec_1, spec_2, 
-                                   metrics, spec_3)
+        return evaluate_across_specs(self, system, spec_1, spec_2,
+                                     metrics, spec_3)
     
     @property
     def feed(self):
@@ -295,46 +295,13 @@ get_HP_inhibitors_conc = lambda: 1000*sum(R302.outs[0].imass['AceticAcid', 'Furf
 
 
 ###############################
-# Bugfix barrage
+# Recovery policy
 ###############################
 
 system = HP_sys
 
-def reset_and_reload():
-    print('Resetting cache and emptying recycles ...')
-    system.reset_cache()
-    system.empty_recycles()
-    print('Loading and simulating with baseline specifications ...')
-    spec_1, spec_2 = spec.spec_1, spec.spec_2
-    spec.load_yield(0.49)
-    spec.load_titer(54.8)
-    system.simulate()
-    print('Loading and simulating with required specifications ...')
-    spec.load_specifications(spec_1=spec_1, spec_2=spec_2, spec_3=spec_3)
-    system.simulate()
-    
-def reset_and_switch_solver(solver_ID):
-    system.reset_cache()
-    system.empty_recycles()
-    system.converge_method = solver_ID
-    print(f"Trying {solver_ID} ...")
-    system.simulate()
-    
-def run_bugfix_barrage():
-    try:
-        reset_and_reload()
-    except Exception as e:
-        print(str(e))
-        try:
-            reset_and_switch_solver('fixedpoint')
-        except Exception as e:
-            print(str(e))
-            try:
-                reset_and_switch_solver('aitken')
-            except Exception as e:
-                print(str(e))
-                print(_yellow_text+"Bugfix barrage failed.\n"+_reset_text)
-                raise e
+# Recovers the system if a simulation fails (replaces the bugfix barrage)
+recovery_policy = spec.get_recovery_policy(system)
 ###############################
 
 # =============================================================================
@@ -385,7 +352,7 @@ def model_specification():
             # flowsheet('AcrylicAcid').F_mass /= 1000.
             raise e
         else:
-            run_bugfix_barrage()
+            recovery_policy.recover(e)
 model.specification = model_specification
 
 def single_MPSP_p_viability(MPSP, market_range): # assumes Uniform distribution
@@ -537,8 +504,28 @@ spec_1, spec_2 = np.meshgrid(spec_1, spec_2)
 
 # %% Run TRY analysis 
 
-data_1 = HP_data = spec.evaluate_across_specs(
-        HP_sys, spec_1, spec_2, HP_metrics, spec_3)
+# Set to True to split the grid across worker processes; note that each 
+# worker builds its own system and evaluates the metrics in setup_TRY_worker
+run_in_parallel = False
+
+# Set to a path prefix (e.g. 'HP_TRY_checkpoint') to save each completed 
+# (yield, titer) point to disk as it is evaluated; rerunning this cell with the
+# same grid resumes an interrupted analysis from the completed points
+checkpoint = None
+
+# Set to True to walk the grid in serpentine order, seeding each point with 
+# the converged recycle states of its closest neighbour
+warm_start = False
+
+if run_in_parallel:
+    from biorefineries.HP._process_specification import setup_TRY_worker
+    data_1 = HP_data = spec.evaluate_across_specs_in_parallel(
+            setup_TRY_worker, spec_1, spec_2, spec_3, checkpoint=checkpoint,
+            warm_start=warm_start)
+else:
+    data_1 = HP_data = spec.evaluate_across_specs(
+            HP_sys, spec_1, spec_2, HP_metrics, spec_3, checkpoint=checkpoint,
+            warm_start=warm_start)
 
 # spec.load_spec_1 = spec.load_dehydration_conversion
 # spec.load_spec_2 = spec.load_titer
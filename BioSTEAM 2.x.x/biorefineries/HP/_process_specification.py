@@ -9,7 +9,18 @@ import flexsolve as flx
 import numpy as np
 from biosteam.exceptions import InfeasibleRegion
 from biorefineries.HP.units import compute_HP_titer, compute_HP_mass
-from winsound import Beep
+from biorefineries.utils import (
+    SpecificationSweep,
+    prepare_TRY_worker,
+    solve_with_local_model,
+    RecoveryPolicy,
+    ReloadBaseline,
+    SwitchSolver,
+)
+try:
+    from winsound import Beep
+except ImportError: # Only available on Windows
+    def Beep(frequency, duration): pass
 # from biorefineries.HP import system_light_lle_vacuum_distillation
 
 _red_highlight_white_text = '\033[1;47;41m'
@@ -24,6 +35,8 @@ def get_IDs(units_list):
 
 # Bugfix barrage is not needed anymore because hexane recycle is not emptied anymore
 # and Wegstein and Aitken converge much better.
+# If True, failed simulations are recovered with the recovery policy of the
+# process specification (see ProcessSpecification.get_recovery_policy).
 bugfix = True
 
 # from biosteam.process_tools.reactor_specification import evaluate_across_TRY
@@ -36,44 +49,7 @@ def evaluate_across_specs(spec, system,
         yield_, titer = last_infeasible_simulation
         if spec_1 <= yield_ and spec_2 >= titer:
             return np.nan*np.ones([len(metrics), len(spec_3)])
-    if bugfix:
-        def reset_and_reload():
-            print('Resetting cache and emptying recycles ...')
-            system.reset_cache()
-            system.empty_recycles()
-            print('Loading and simulating with baseline specifications ...')
-            spec.load_yield(0.49)
-            spec.load_titer(54.8)
-            system.simulate()
-            print('Loading and simulating with required specifications ...')
-            spec.load_specifications(spec_1=spec_1, spec_2=spec_2, spec_3=spec_3)
-            system.simulate()
-        
-        def reset_and_switch_solver(solver_ID):
-            system.reset_cache()
-            system.empty_recycles()
-            system.converge_method = solver_ID
-            print(f"Trying {solver_ID} ...")
-            system.simulate()
-            
-        def run_bugfix_barrage():
-            try:
-                reset_and_reload()
-            except Exception as e:
-                print(str(e))
-                try:
-                    reset_and_switch_solver('fixedpoint')
-                except Exception as e:
-                    print(str(e))
-                    try:
-                        reset_and_switch_solver('aitken')
-                    except Exception as e:
-                        print(str(e))
-                        print(_yellow_text+"Bugfix barrage failed."+_reset_text)
-                        raise e
-            finally:
-                system.converge_method = 'wegstein'
-                print('\n')
+    if bugfix: recovery_policy = spec.get_recovery_policy(system)
     
     def HXN_Q_bal_OK():
         HXN = spec.HXN
@@ -119,7 +95,7 @@ def evaluate_across_specs(spec, system,
         elif bugfix:
             print(str_e1)
             try:
-                run_bugfix_barrage()
+                recovery_policy.recover(e1)
                 return get_metrics()
                 # Beep(320, 250)
             except Exception as e2:
@@ -134,16 +110,21 @@ def evaluate_across_specs(spec, system,
     return spec.evaluate_across_productivity(metrics, spec_3)
     
 
+def setup_TRY_worker():
+    """
+    Return the process specification, system, and metrics (MPSP, GWP, and FEC)
+    for TRY analysis. This function is called once by each worker of
+    ProcessSpecification.evaluate_across_specs_in_parallel.
 
-evaluate_across_specs = np.vectorize(
-    evaluate_across_specs, 
-    excluded=['spec', 'system', 'metrics', 'spec_3'],
-    signature='(),(),(),(),(m),(p)->(m,p)'
-)
+    """
+    from biorefineries.HP.system_light_lle_vacuum_distillation import (
+        HP_sys, HP_tea, AA, spec, get_GWP, get_FEC
+    )
+    return prepare_TRY_worker(spec, HP_sys, HP_tea, AA, get_GWP, get_FEC)
 
 
 
-class ProcessSpecification(bst.process_tools.ReactorSpecification):
+class ProcessSpecification(SpecificationSweep, bst.process_tools.ReactorSpecification):
     
     __slots__ = ('reactor',
                  'substrates',
@@ -178,7 +159,8 @@ class ProcessSpecification(bst.process_tools.ReactorSpecification):
                  'baseline_productivity',
                  'HXN_new_HXs',
                  'HXN_new_HX_utils',
-                 'HXN_Q_bal_percent_error_dict',)
+                 'HXN_Q_bal_percent_error_dict',
+                 'recovery_policy',)
     
     def __init__(self, evaporator, pump, mixer, heat_exchanger, seed_train_system, 
                  reactor, reaction_name, substrates, products,
@@ -224,6 +206,10 @@ class ProcessSpecification(bst.process_tools.ReactorSpecification):
         self.load_spec_2 = load_spec_2
         self.load_spec_3 = load_spec_3
         
+        #: [RecoveryPolicy] Recovers the system if a simulation fails
+        #: (see get_recovery_policy).
+        self.recovery_policy = None
+        
         self.titer_inhibitor_specification =\
             TiterAndInhibitorsSpecification(evaporator, pump, mixer, heat_exchanger,
                                             seed_train_system, reactor,
@@ -248,6 +234,39 @@ class ProcessSpecification(bst.process_tools.ReactorSpecification):
         
         self.load_spec_3(spec_3 or self.spec_3)
     
+    def get_specifications(self):
+        """Return current fermentation specifications."""
+        return self.spec_1, self.spec_2, self.spec_3
+    
+    def load_baseline_specifications(self):
+        """Load baseline yield, titer, and productivity."""
+        self.load_yield(self.baseline_yield)
+        self.load_titer(self.baseline_titer)
+        self.load_productivity(self.baseline_productivity)
+    
+    def get_recovery_policy(self, system):
+        """
+        Return a RecoveryPolicy object that recovers the system if a
+        simulation fails by reloading baseline specifications, and then by
+        switching the convergence method to fixed-point and Aitken (after
+        resetting the system), each within 200 s and the `maxiter` of the
+        system. The policy is reused for the same system, so that its
+        statistics are kept across simulations.
+        
+        """
+        policy = self.recovery_policy
+        if policy is None or policy.system is not system:
+            self.recovery_policy = policy = RecoveryPolicy(
+                system,
+                [ReloadBaseline(self.load_baseline_specifications,
+                                self.get_specifications,
+                                self.load_specifications),
+                 SwitchSolver('fixedpoint'),
+                 SwitchSolver('aitken')],
+                max_time=200., max_iterations=system.maxiter,
+            )
+        return policy
+    
     # def load_baseline_TRY(self):
     #     self.load_yield(spec.baseline_yield)
     #     spec.spec_1
@@ -290,53 +309,15 @@ class ProcessSpecification(bst.process_tools.ReactorSpecification):
         print(data)
         return data
 
-    def evaluate_across_specs(self, system, 
-            spec_1, spec_2, metrics, spec_3):
-        
+    def evaluate_at_specs(self, system, spec_1, spec_2, metrics, spec_3):
         """
-        Evaluate metrics at given titer and yield across a set of 
-        productivities. Return an array with the all metric results.
-            
-        Parameters
-        ----------
-        titer : array_like[shape]
-            Titer to evaluate.
-        yield_ : array_like[shape]
-            Yield to evaluate.
-        metrics : Iterable[Callable; M elements]
-            Should return a number given no parameters.
-        productivities : array_like[P elements]
-            Productivities to evaluate.
-        
-        Returns
-        -------
-        results : array[shape x M x P]
-            All metric results at given titer/yield across productivities.
-        
-        Notes
-        -----
-        This method is vectorized along titer and yield. If, for example,
-        the parameters had the following dimensions:
-            
-        titer [Y x T], yield [Y x T], metrics [M], productivities [P]
-        
-        This method would return an array with the following dimensions:
-        
-        results [Y x T x M x P]
-        
+        Evaluate metrics at a single titer and yield across a set of
+        productivities. Return an array with the all metric results
+        (array[M x P]).
+
         """
-        self.count = 0 
-        self.count_exceptions = 0
-        self.total_iterations = 0
-        # self.average_HXN_energy_balance_percent_error = 0.
-        self.exceptions_dict = {}
-        
-        self.total_iterations = len(spec_1) * len(spec_2) * len(spec_3)
-        results = evaluate_across_specs(self, system, 
-                                   spec_1, spec_2, 
-                                   metrics, spec_3)
-        self.average_HXN_energy_balance_percent_error /= self.total_iterations
-        return results
+        return evaluate_across_specs(self, system, spec_1, spec_2,
+                                     metrics, spec_3)
     
     @property
     def feed(self):
@@ -558,7 +539,8 @@ class TiterAndInhibitorsSpecification:
                  maximum_inhibitor_concentration=1.,
                  products=('HP',),
                  sugars = ('Glucose', 'Xylose', 'Arabinose', 'Sucrose'),
-                 inhibitors = ('AceticAcid', 'HMF', 'Furfural'),):
+                 inhibitors = ('AceticAcid', 'HMF', 'Furfural'),
+                 reduced_order=True):
         self.evaporator = evaporator
         self.pump = pump
         self.mixer = mixer
@@ -577,6 +559,10 @@ class TiterAndInhibitorsSpecification:
         self.maximum_inhibitor_concentration = maximum_inhibitor_concentration
         self.get_products_mass = compute_HP_mass
         self.seed_train_system = seed_train_system
+        #: [bool] Whether to solve with a local model of titer and inhibitor
+        #: concentration (verified with one full evaluation) before falling back
+        #: to a bracketed search.
+        self.reduced_order = reduced_order
         
     @property
     def feed(self):
@@ -639,8 +625,17 @@ class TiterAndInhibitorsSpecification:
         V_max = 0.999
         
         if x_titer < self.target_titer: # Evaporate
-            self.evaporator.V = V_min = flx.IQ_interpolation(self.titer_objective_function,
-                                                             V_min, V_max, ytol=1e-3, maxiter=200) 
+            if self.reduced_order:
+                # Assume evaporated water is proportional to volume removed
+                V_guess = 1. - x_titer / self.target_titer
+                self.evaporator.V = V_min = solve_with_local_model(
+                    self.titer_objective_function, self.target_titer,
+                    V_min, x_titer - self.target_titer, V_guess, V_min, V_max,
+                    ytol=1e-3, reciprocal=True
+                )
+            else:
+                self.evaporator.V = V_min = flx.IQ_interpolation(self.titer_objective_function,
+                                                                 V_min, V_max, ytol=1e-3, maxiter=200) 
         elif x_titer > self.target_titer: # Dilute
             self.update_dilution_water(x_titer)
             # self.mixer._run()
@@ -655,8 +650,17 @@ class TiterAndInhibitorsSpecification:
             y_0 = obj_f(V_min)
             
             if y_0 > 0.:
-                self.evaporator.V = flx.IQ_interpolation(obj_f,
-                                                     V_min, V_max, y0 = y_0, ytol=1e-3, maxiter=200) 
+                if self.reduced_order:
+                    # Broth is diluted back to the target titer, so inhibitor
+                    # concentration falls only as volatile inhibitors evaporate
+                    self.evaporator.V = solve_with_local_model(
+                        obj_f, self.maximum_inhibitor_concentration,
+                        V_min, y_0, 0.5 * (V_min + V_max), V_min, V_max,
+                        ytol=1e-3, reciprocal=False
+                    )
+                else:
+                    self.evaporator.V = flx.IQ_interpolation(obj_f,
+                                                         V_min, V_max, y0 = y_0, ytol=1e-3, maxiter=200) 
         
         # self.check_sugar_concentration()
     
@@ -41,9 +41,11 @@ import pandas as pd
 import biosteam as bst
 from biosteam.utils import TicToc
 from biosteam.plots import plot_montecarlo_across_coordinate
-from biorefineries.HP.system_light_lle_vacuum_distillation import spec, HP_sys, get_AA_MPSP, get_GWP, get_FEC, R301
+from biorefineries.HP.system_light_lle_vacuum_distillation import HP_sys, get_AA_MPSP, get_GWP, get_FEC
 from biorefineries.HP.analyses import models
+from biorefineries.utils import evaluate_model_in_parallel, ResultSink
 from datetime import datetime
+from importlib.util import find_spec
 
 
 
@@ -55,14 +57,13 @@ percentiles = [0, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 1]
 # =============================================================================
 # Evaluate and organize results for Monte Carlo analysis
 # =============================================================================
-spec.load_specifications(spec_1=0.49, spec_2=54.8, spec_3=0.76)
 # Initiate a timer
 timer = TicToc('timer')
 timer.tic()
 
 # model = models.model_full
-model = models.HP_model
-R301.set_titer_limit = True
+# Loads baseline specifications and the model specification (with the bugfix barrage)
+model = models.load_full_evaluation_model()
 
 # Set seed to make sure each time the same set of random numbers will be used
 np.random.seed(3221)
@@ -70,89 +71,24 @@ N_simulation = 1000 # 1000
 samples = model.sample(N=N_simulation, rule='L')
 model.load_samples(samples)
 
+# Number of worker processes to evaluate samples (None to use all CPUs);
+# results are saved to model.table in the same order as in series
+N_workers = 1
 
-###############################
-# Bugfix barrage
-###############################
-
-system = HP_sys
-
-def reset_and_reload():
-    print('Resetting cache and emptying recycles ...')
-    system.reset_cache()
-    system.empty_recycles()
-    print('Loading and simulating with baseline specifications ...')
-    spec_1, spec_2, spec_3 = spec.spec_1, spec.spec_2, spec.spec_3
-    spec.load_yield(0.49)
-    spec.load_titer(54.8)
-    spec.load_productivity(0.76)
-    system.simulate()
-    print('Loading and simulating with required specifications ...')
-    spec.load_specifications(spec_1=spec_1, spec_2=spec_2, spec_3=spec_3)
-    system.simulate()
-    
-def reset_and_switch_solver(solver_ID):
-    system.reset_cache()
-    system.empty_recycles()
-    system.converge_method = solver_ID
-    print(f"Trying {solver_ID} ...")
-    system.simulate()
-    
-def run_bugfix_barrage():
-    try:
-        reset_and_reload()
-    except Exception as e:
-        print(str(e))
-        try:
-            reset_and_switch_solver('fixedpoint')
-        except Exception as e:
-            print(str(e))
-            try:
-                reset_and_switch_solver('aitken')
-            except Exception as e:
-                print(str(e))
-                # print(_yellow_text+"Bugfix barrage failed.\n"+_reset_text)
-                print("Bugfix barrage failed.\n")
-                raise e
-###############################
-
-spec.load_spec_1 = spec.load_yield
-spec.load_spec_2 = spec.load_titer
-spec.load_spec_3 = spec.load_productivity
-
-full_path = HP_sys.path
-evaporator_index = full_path.index(spec.titer_inhibitor_specification.evaporator)
-pre_evaporator_units_path = full_path[0:evaporator_index]
-
-def model_specification():
-    try:
-        # model._system._converge()
-        spec.pre_conversion_units.simulate()
-        for unit in pre_evaporator_units_path:
-            unit._run()
-        spec.titer_inhibitor_specification.run_units()
-        spec.load_specifications(spec_1=spec.spec_1, spec_2=spec.spec_2, spec_3=spec.spec_3)
-        
-        for i in range(2):
-            model._system.simulate()
-        
-    except Exception as e:
-        str_e = str(e)
-        print('Error in model spec: %s'%str_e)
-        # raise e
-        if 'sugar concentration' in str_e:
-            # flowsheet('AcrylicAcid').F_mass /= 1000.
-            raise e
-        else:
-            run_bugfix_barrage()
-            
-model.specification = model_specification
+# Results are appended to this directory as samples are evaluated, so partial
+# results can be read with sink.read(); the directory is keyed on the samples
+# and model configuration, so interrupted runs are only resumed if these match.
+# The sink requires pyarrow; None to use it only if pyarrow is installed
+use_sink = None
+if use_sink is None: use_sink = find_spec('pyarrow') is not None
+sink = ResultSink.from_model('HP_1_full_evaluation_results', model, keyed=True) if use_sink else None
 
 baseline_initial = model.metrics_at_baseline()
 baseline = pd.DataFrame(data=np.array([[i for i in baseline_initial.values],]), 
                         columns=baseline_initial.keys())
 
-model.evaluate()
+evaluate_model_in_parallel(model, models.load_full_evaluation_model,
+                           N_workers=N_workers, sink=sink)
 
 # Baseline results
 baseline_end = model.metrics_at_baseline()
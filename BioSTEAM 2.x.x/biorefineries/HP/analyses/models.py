@@ -1155,6 +1155,83 @@ def set_HXN_T_min_app(T_min_app):
 HP_model_HXN_T_min_app.set_parameters(parameters)
 
 
+# %%
+
+# =============================================================================
+# Model specification for Monte Carlo evaluation
+# =============================================================================
+
+# Recovers HP_sys if a simulation fails (replaces the bugfix barrage);
+# see recovery_policy.report() for the strategies that succeed
+recovery_policy = spec.get_recovery_policy(HP_sys)
+
+def model_specification():
+    try:
+        spec.pre_conversion_units.simulate()
+        full_path = HP_sys.path
+        evaporator_index = full_path.index(spec.titer_inhibitor_specification.evaporator)
+        for unit in full_path[0:evaporator_index]:
+            unit._run()
+        spec.titer_inhibitor_specification.run_units()
+        spec.load_specifications(spec_1=spec.spec_1, spec_2=spec.spec_2, spec_3=spec.spec_3)
+        
+        for i in range(2):
+            HP_sys.simulate()
+        
+    except Exception as e:
+        str_e = str(e)
+        print('Error in model spec: %s'%str_e)
+        if 'sugar concentration' in str_e:
+            raise e
+        else:
+            recovery_policy.recover(e)
+
+def titer_model_specification():
+    # Samples are the same at every titer, so only units up to the evaporator
+    # feed are converged before the titer specification reruns the
+    # titer-dependent units (evaporator through fermentation); the system is
+    # simulated once
+    try:
+        spec.pre_conversion_units._converge()
+        spec.load_specifications(spec_1=spec.spec_1, spec_2=spec.spec_2)
+        HP_sys.simulate()
+    except Exception as e:
+        str_e = str(e)
+        print('Error in model spec: %s'%str_e)
+        if 'sugar concentration' in str_e:
+            raise e
+        else:
+            recovery_policy.recover(e)
+
+def load_full_evaluation_model():
+    """Load baseline specifications and return HP_model with the model
+    specification for Monte Carlo evaluation (e.g., in worker processes)."""
+    spec.load_specifications(spec_1=0.49, spec_2=54.8, spec_3=0.76)
+    R301.set_titer_limit = True
+    spec.load_spec_1 = spec.load_yield
+    spec.load_spec_2 = spec.load_titer
+    spec.load_spec_3 = spec.load_productivity
+    HP_model.specification = model_specification
+    return HP_model
+
+def load_montecarlo_across_titer_model():
+    """Load baseline specifications and return HP_model with the model
+    specification for Monte Carlo evaluation across titers."""
+    spec.load_spec_1 = spec.load_yield
+    spec.load_spec_2 = spec.load_titer
+    spec.load_spec_3 = spec.load_productivity
+    spec.load_productivity(0.79)
+    spec.load_yield(0.49)
+    spec.load_titer(54.8)
+    HP_model.specification = titer_model_specification
+    return HP_model
+
+def set_titer(titer):
+    """Load the titer for Monte Carlo evaluation across titers."""
+    HP_sys.converge_method = 'wegstein'
+    spec.load_titer(titer)
+
+
 
 # %% Evaluate
 # N_samples = 100
@@ -16,48 +16,10 @@ from datetime import datetime
 _kg_per_ton = 907.18474
 system = HP_sys
 
-# %% Bugfix barrage
-
-def reset_and_reload():
-    print('Resetting cache and emptying recycles ...')
-    system.reset_cache()
-    system.empty_recycles()
-    print('Loading and simulating with baseline specifications ...')
-    spec_1 = spec.spec_1
-    spec_2 = spec.spec_2
-    spec_3 = spec.spec_3
-    spec.load_yield(0.49)
-    spec.load_titer(54.8)
-    spec.load_productivity(0.76)
-    system.simulate()
-    print('Loading and simulating with required specifications ...')
-    spec.load_specifications(spec_1=spec_1, spec_2=spec_2, spec_3=spec_3)
-    system.simulate()
-
-def reset_and_switch_solver(solver_ID):
-    system.reset_cache()
-    system.empty_recycles()
-    system.converge_method = solver_ID
-    print(f"Trying {solver_ID} ...")
-    system.simulate()
-    
-def run_bugfix_barrage():
-    try:
-        reset_and_reload()
-    except Exception as e:
-        print(str(e))
-        try:
-            reset_and_switch_solver('fixedpoint')
-        except Exception as e:
-            print(str(e))
-            try:
-                reset_and_switch_solver('aitken')
-            except Exception as e:
-                print(str(e))
-                print("Bugfix barrage failed.")
-    finally:
-        system.converge_method = 'wegstein'
-        print('\n')
+# %% Recovery policy
+
+# Recovers the system if a simulation fails (replaces the bugfix barrage)
+recovery_policy = spec.get_recovery_policy(system)
         
 # %% Setup
 spec.load_productivity(0.79)
@@ -114,8 +76,9 @@ for parameter in parameters:
     spec.load_specifications(spec_1=spec.spec_1, spec_2=parameter, spec_3=spec.spec_3)
     try:
         HP_sys.simulate()
-    except:
-        run_bugfix_barrage()
+    except Exception as e1:
+        try: recovery_policy.recover(e1)
+        except Exception as e: print(str(e))
                    
     HP_sys.converge_method = 'wegstein'
     try:
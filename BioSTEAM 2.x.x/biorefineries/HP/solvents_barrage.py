@@ -6,300 +6,403 @@ Created on Sat Jan 16 19:09:17 2021
 """
 # %% Imports and chemicals initialization
 
+import os
+import json
 import numpy as np
-# import thermosteam as tmo
-# import biosteam as bst
-
-from biorefineries.HP.chemicals_data import HP_chemicals
-
-# tmo.settings.set_thermo(['Water', 'octanol', 'hexanol', 'butyl acetate', HP_chemicals['Xylose'], HP_chemicals['Glucose'], HP_chemicals['Triacetic acid lactone'], 'isoamyl alcohol'])
-
-class Metric():
-    
-    def __init__(self, metric_name, metric_getter=lambda:None):
-        self.name = metric_name
-        self.getter = metric_getter
-    
-    def get():
-        return self.getter()
-
-# class Metrics():
-    
-#     def __init__(self, name='Metrics', metrics_dict={}):
-#         self.name = name,
-#         self.metrics = metrics_dict
-    
-#     def add_metric(metric_name, metric_getter=lambda:None):
-#         self.metrics[metric_name] = Metric(metric_name, metric_getter)
-#         print (f'Added metric "{metric_name}" to {self.name}.')
+import pandas as pd
+import thermosteam as tmo
+from multiprocessing import Pool
+
+#: tuple[str] Metrics of each (solvent, temperature, solvent-to-feed ratio) point.
+metric_names = ('K solute', # Partition of solute into extract (molar fraction basis)
+                'K water', # Partition of water into extract
+                'Selectivity', # K solute / K water
+                'K solvent in raffinate', # Partition of solvent into raffinate
+                'Solute recovery', # Fraction of solute in extract
+                'Impurity carryover', # Fraction of impurities in extract
+                'Tb difference') # Solute minus solvent boiling point [K]
 
 class Criterion():
-    
-    def __init__(self, criterion_name, criterion_metric=None, criterion_range=(-np.inf, np.inf)):
+    """
+    Create a Criterion object that tests whether a metric is within a range
+    (exclusive).
+
+    Parameters
+    ----------
+    criterion_name : str
+    criterion_metric : str
+        Name of metric (see `metric_names`).
+    criterion_range : tuple[float, float], optional
+        Lower and upper bounds of metric.
+
+    """
+
+    def __init__(self, criterion_name, criterion_metric, criterion_range=(-np.inf, np.inf)):
         self.name = criterion_name
         self.metric = criterion_metric
         self.range = criterion_range
-        
-    def get_metric():
-        return self.metric.get()
-    
-    def test():
-        gotten_metric = self.get_metric()
+
+    def test(self, results):
+        """Return whether the metric in a dictionary of results is within range."""
         lb, ub = self.range
-        return gotten_metric>lb and gotten_metric<ub
-    
+        value = results[self.metric]
+        return value>lb and value<ub
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self.name}; {self.range[0]} < {self.metric} < {self.range[1]}>"
+
 class Criteria():
-    
-    def __init__(self, name='Criteria', criteria_list=[]):
-        self.name = name,
-        self.criteria = []
-    
-    def add_criterion(criterion_name, criterion_metric=None, criterion_range=(-np.inf, np.inf)):
+    """
+    Create a Criteria object that tests results against a list of criteria.
+
+    """
+
+    def __init__(self, name='Criteria', criteria_list=()):
+        self.name = name
+        self.criteria = list(criteria_list)
+
+    def add_criterion(self, criterion_name, criterion_metric, criterion_range=(-np.inf, np.inf)):
         self.criteria.append(Criterion(criterion_name, criterion_metric, criterion_range))
-        print (f'Added criterion to {self.name} for "{criterion_metric.name}" to be within range {criterion_range}.')
-    
-    def test_all():
-        criteria = self.criteria
-        return [criterion.test() for criterion in criteria]
-    
+        print (f'Added criterion to {self.name} for "{criterion_metric}" to be within range {criterion_range}.')
+
+    def test_all(self, results):
+        """Return a list of whether each criterion is met."""
+        return [criterion.test(results) for criterion in self.criteria]
+
+    def test(self, results):
+        """Return whether all criteria are met."""
+        return all(self.test_all(results))
+
+    def get_failed(self, results):
+        """Return names of criteria that are not met."""
+        return [criterion.name for criterion in self.criteria if not criterion.test(results)]
+
+# %% Evaluation of single points
+
+def get_K(chem_ID, stream, phase_1, phase_2):
+    return (stream[phase_1].imol[chem_ID]/stream[phase_1].F_mol)/(stream[phase_2].imol[chem_ID]/stream[phase_2].F_mol)
+
+def get_mixed_stream(process_stream, solvent, T, ratio):
+    """Return the process stream mixed with solvent (at a solvent-to-feed
+    mass ratio) in liquid-liquid equilibrium at T."""
+    solvent_stream = tmo.Stream(None, thermo=process_stream.thermo, T=T)
+    solvent_stream.imass[solvent] = ratio * process_stream.F_mass
+    mixed_stream = tmo.Stream(None, thermo=process_stream.thermo)
+    mixed_stream.mix_from([process_stream, solvent_stream])
+    mixed_stream.lle(T=T, top_chemical=solvent)
+    return mixed_stream
+
+def evaluate_point(process_stream, solute, water, solvent, T, ratio,
+                   extract_phase='l', raffinate_phase='L'):
+    """Return a tuple of metrics (see `metric_names`) of a solvent at a
+    temperature and solvent-to-feed mass ratio."""
+    chemicals = process_stream.chemicals
+    index = chemicals.index
+    solute_index = index(solute)
+    water_index = index(water)
+    solvent_index = index(solvent)
+    Tb_difference = chemicals.tuple[solute_index].Tb - chemicals.tuple[solvent_index].Tb
+    try:
+        mixed_stream = get_mixed_stream(process_stream, solvent, T, ratio)
+        extract = mixed_stream.imol[extract_phase]
+        raffinate = mixed_stream.imol[raffinate_phase]
+    except Exception as e:
+        print(f"LLE of {solvent} at T={T:.2f} K and ratio={ratio:.3g} failed: {e}")
+        return (*(len(metric_names) - 1) * [np.nan], Tb_difference)
+    feed = process_stream.mol
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_extract = extract / extract.sum()
+        x_raffinate = raffinate / raffinate.sum()
+        K_solute = x_extract[solute_index] / x_raffinate[solute_index]
+        K_water = x_extract[water_index] / x_raffinate[water_index]
+        K_solvent = x_raffinate[solvent_index] / x_extract[solvent_index]
+        solute_recovery = extract[solute_index] / feed[solute_index]
+        impurities = feed > 0.
+        impurities[[solute_index, water_index, solvent_index]] = False
+        impurity_carryover = (extract[impurities].sum() / feed[impurities].sum()
+                              if impurities.any() else 0.)
+    return (K_solute, K_water, K_solute / K_water, K_solvent,
+            solute_recovery, impurity_carryover, Tb_difference)
+
+def _call_setup(setup, args):
+    """Return the process stream from `setup` and restore the default
+    thermodynamic property package that `setup` replaces."""
+    try: thermo = tmo.settings.get_thermo()
+    except RuntimeError: thermo = None
+    try:
+        return setup(*args)
+    finally:
+        if thermo is not None: tmo.settings.set_thermo(thermo)
+
+#: dict Process stream and screen configuration of this worker process.
+_worker = {}
+
+def _initialize_worker(setup, args, configuration):
+    _worker['process_stream'] = setup(*args)
+    _worker['configuration'] = configuration
+
+def _evaluate_point(point):
+    index, solvent, T, ratio = point
+    solute, water, extract_phase, raffinate_phase = _worker['configuration']
+    return index, evaluate_point(_worker['process_stream'], solute, water, solvent,
+                                 T, ratio, extract_phase, raffinate_phase)
+
+# %% Screening engine
+
 class SolventsBarrage():
-    
-
-    def __init__(self, solute, water, solvents_list, T_range, process_stream,
-                 extract_phase, raffinate_phase,
-                 additional_criteria=[],
-                 get_concentration=lambda:None,
-                 get_K=lambda:None,
-                 get_name_from_chemical=lambda:None,
-                 get_chemical_from_name=lambda:None,
-                 get_all_chemicals_in_stream=lambda:None):
+    """
+    Create a SolventsBarrage object that screens solvents for the
+    liquid-liquid extraction of a solute from a process stream at every
+    temperature and solvent-to-feed mass ratio, using a pool of worker
+    processes.
+
+    Parameters
+    ----------
+    setup : Callable
+        Module-level function that sets the thermodynamic property package
+        (with all solvents) and returns the process stream. It is called
+        once by each worker.
+    solute : str
+        ID of solute.
+    solvents_list : Iterable[str]
+        IDs of candidate solvents.
+    T_range : Iterable[float]
+        Temperatures [K].
+    ratios : Iterable[float], optional
+        Solvent-to-feed mass ratios. Defaults to (1.,).
+    args : tuple, optional
+        Arguments of `setup`.
+    water : str, optional
+        ID of water (carrier). Defaults to 'Water'.
+    extract_phase : str, optional
+        Phase of the extract (favored by the solvent). Defaults to 'l'.
+    raffinate_phase : str, optional
+        Phase of the raffinate. Defaults to 'L'.
+    gates : Criteria, optional
+        Criteria that each solvent must meet at its probe point (the middle
+        temperature and ratio) to be evaluated at all other points.
+    criteria : Criteria, optional
+        Criteria of the ranked table.
+    rank_by : str, optional
+        Metric to rank results by (descending). Defaults to 'K solute'.
+    N_workers : int, optional
+        Number of worker processes. Defaults to the number of CPUs. If 1,
+        points are evaluated in this process.
+    sink : ResultSink, optional
+        Sink with columns `metric_names`. Results are streamed to the sink
+        and points already in it are skipped, so partial screens can be
+        resumed. The grid (solute, solvents, temperatures, and ratios) is
+        saved with the sink; resuming with a different grid raises a
+        ValueError.
+
+    Examples
+    --------
+    >>> from biorefineries.utils import ResultSink
+    >>> barrage = SolventsBarrage(create_TAL_process_stream, 'Triacetic acid lactone',
+    ...                           solvent_IDs, T_range=np.linspace(298.15, 353.15, 20),
+    ...                           ratios=(0.02, 0.05, 0.1), gates=gates, criteria=criteria,
+    ...                           sink=ResultSink('TAL_screen', metric_names))
+    >>> barrage.run() # Ranked table; rerun to resume
+    >>> barrage.pruned # Failed gates by pruned solvent
+    >>> barrage.get_partition_data('Octanol', 303.15, 0.05) # For MultiStageMixerSettlers
+
+    """
+
+    def __init__(self, setup, solute, solvents_list, T_range, ratios=(1.,), args=(),
+                 water='Water', extract_phase='l', raffinate_phase='L',
+                 gates=None, criteria=None, rank_by='K solute', N_workers=None,
+                 sink=None):
+        self.setup = setup
+        self.args = args
         self.solute = solute
-        self.solute_name = solute_name = get_name_from_chemical(solute)
         self.water = water
-        self.water_name = water_name = get_name_from_chemical(water)
-        
-        self.solvents_list = solvents_list
-        self.T_range = T_range
+        self.solvents_list = list(solvents_list)
+        self.T_range = np.asarray(T_range, dtype=float)
+        self.ratios = np.asarray(ratios, dtype=float)
         self.extract_phase = extract_phase
         self.raffinate_phase = raffinate_phase
-        
-        self.partition_criteria = partition_criteria = Criteria('Partition criteria')
-        
-        get_K_solute_in_extract = lambda: get_K(self.solute_name, self.mixed_stream, 
-                                                self.extract_phase, self.raffinate_phase)
-        
-        partition_criteria.add_criterion('K_solute_in_extract', get_K(solute, ))
-        self.process_stream = None
-        self.solvent_streams_dict = {}
-        self.mixed_streams_dict = {}
-        self.current_mixed_stream = None
+        self.gates = gates
+        self.criteria = criteria
+        self.rank_by = rank_by
+        self.N_workers = N_workers
+        self.sink = sink
+
+        #: dict[int, tuple] Metrics by point index.
         self.results = {}
-        
-        self.get_concentration = get_concentration
-        self.get_K = get_K
-        self.get_name_from_chemical = get_name_from_chemical
-        self.get_chemical_from_name = get_chemical_from_name
-        self.get_all_chemicals_in_stream = get_all_chemicals_in_stream
-
-
-        solute_name = get_name_from_chemical(self.solute)
-        water_name = get_name_from_chemical(self.water)
-
-    def get_impurities(stream):
-        impurities_dict = {}
-        chemicals_in_stream = get_all_chemicals_in_stream(stream)
-        solute_name = self.solute_name
-        water_name = self.water_name
-        
-        for chemical in chemicals_in_stream:
-            chemical_name = get_name_from_chemical(chemical)
-            if not chemical_name==water_name and not chemical_name==solute_name:
-                chemical_concentration = get_concentration(chemical, stream)
-                if chemical_concentration>0.:
-                    impurities_dict[chemical_name] = chemical_concentration
-        
-        return impurities_dict
-    
-        # return {get_name_from_chemical(chemical): get_concentration(chemical) \
-        #         for chemical in stream.chemicals \
-        #         if not (get_name_from_chemical(chemical)==solute \
-        #                 and not get_name_from_chemical(chemical)==get_name_from_chemical(water)) \
-        #             and get_concentration(get_name_from_chemical(chemical))>0.}
-            
-    def set_process_stream(process_stream):
-        self.process_stream = process_stream
-        self.process_stream_impurities = get_impurities(process_stream)
-        
-    def set_solvent_stream(solvent_name, solvent_mol, water_mol, solvent_stream=None):
-        if solvent_stream:
-            self.solvent_stream = solvent_stream
-        else:
-            
-    def get_results(mixed_stream, )
-    def run_single_test(solvent_chemical, solvent_mol, T):
-        process_stream_impurities = self.process_stream_impurities
-        solvent_stream = get_solvent_stream(solvent_chemical, solvent_mol)
-        mixed_stream = get_mixed_stream(self.process_stream, solvent_stream, T)
-        extract_phase = self.extract_phase
-        raffinate_phase = self.raffinate_phase
-        
-        # Ks = [get_K(solute, mixed_stream, extract_phase, raffinate_phase)] \
-        #     + [get_K(chemical, stream, phase_1, phase_2) for chemical in process_stream_impurities.keys()]
-#%% Set solute and solvents
-solute = TAL
-solvents = [Propyl_acetate, Butyl_acetate, Hexanol, Cyclohexanol, Cyclohexanone, Heptanol, Octanol, Octanediol, te_hexanol, Nonanol, Decanol, Dodecanol, Isoamyl_alcohol, Dioctyl_phthalate, Diethyl_sebacate, Glycerol]
-
-#%% Set thermo
-tmo.settings.set_thermo(solvents + ['Water', 'H2SO4', Arabitol, solute, HP_chemicals['Xylose'], HP_chemicals['Glucose'], HP_chemicals['AceticAcid']])
-
-# %% Streams initialization
-
-T = 303
-process_stream = tmo.Stream('process_stream',
-                            Water = 224000.,
-                            units = 'kmol/hr',
-                            T = T)
-process_stream.imol[solute.ID] = 250.*12.2/7.7
-process_stream.imol['AceticAcid'] = 5.
-process_stream.imol['Arabitol'] = 5.
-
-solvent_stream = tmo.Stream('solvent_stream',
-                            T = T)
-
-mixed_stream = tmo.Stream('mixed_stream')
-extract_phase = 'l'
-raffinate_phase = 'L'
-
-# %%% Functions
 
-def get_K(chem_ID, stream, phase_1, phase_2):
-    return (stream[phase_1].imol[chem_ID]/stream[phase_1].F_mol)/(stream[phase_2].imol[chem_ID]/stream[phase_2].F_mol)
+        #: dict[str, list[str]] Failed gates by pruned solvent.
+        self.pruned = {}
 
-def set_solvent(solvent_chemical, solvent_mol=1350, solvent_stream=solvent_stream):
-    solvent_stream.empty()
-    if type(solvent_chemical) is str:
-        solvent_chemical = tmo.Chemical(solvent_chemical)
-    solvent_ID = solvent_chemical.ID
-    solvent_stream.imol[solvent_ID] = solvent_mol
-    
-def run_single_test(solvent_chemical, solvent_mol=1350, process_stream=process_stream, solvent_stream=solvent_stream):
-    mixed_stream.empty()
-    set_solvent(solvent_chemical, solvent_mol, solvent_stream)
-    solvent_ID = solvent_chemical.ID
-    mixed_stream.mix_from([process_stream, solvent_stream])
-    # print(mixed_stream.lle_chemicals)
-    mixed_stream.lle(T=T, top_chemical = solvent_ID)
-    # mixed_stream.lle(T=T)
-    # mixed_stream.show(N=100, composition=True)
-    K_HP_in_solvent = get_K(solute.ID, mixed_stream, extract_phase, raffinate_phase)
-    # K_Glucose_in_solvent = get_K('Glucose', mixed_stream, extract_phase, raffinate_phase)
-    print(K_HP_in_solvent)
-    K_Water_in_solvent = get_K('Water', mixed_stream, extract_phase, raffinate_phase)
-    print(K_Water_in_solvent)
-    K_solvent_in_Water = get_K(solvent_ID, mixed_stream, raffinate_phase, extract_phase)
-    print(K_solvent_in_Water)
-    # K_Water_in_Water = get_K('Water', mixed_stream, raffinate_phase, extract_phase)
-    T_diff =  solute.Tb - solvent_chemical.Tb
-    print(T_diff)
-    print('\n')
-    K_acetic_acid_in_solvent = 0.000001
-    K_arabitol_in_solvent = 0.000001
-    try:
-        K_acetic_acid_in_solvent = get_K('AceticAcid', mixed_stream, raffinate_phase, extract_phase)
-    except:
-        pass
-    try:
-        K_arabitol_in_solvent = get_K('Arabitol', mixed_stream, raffinate_phase, extract_phase)
-    except:
-        pass
-    return (mixed_stream.copy(), K_HP_in_solvent, K_Water_in_solvent, K_solvent_in_Water, T_diff, K_acetic_acid_in_solvent, K_arabitol_in_solvent)
-
-def get_results_meeting_constraints(results_list, constraints):
-    filtered_results = []
-    for result in results_list:
-        values = result[1]
-        meets_constraints = True
-        for i in range(1,len(constraints)):
-            if not (values[i]>constraints[i-1][0] and values[i]<constraints[i-1][1]):
-                meets_constraints = False
-                # print(i)
-                # print(values[i],constraints[i-1][0],values[i],constraints[i-1][1])
-        if meets_constraints:
-            filtered_results.append(result)
-    return filtered_results
-# %% Run test barrage
-results_dict = {}
-for solvent in solvents:
-    results_dict[solvent.common_name] = run_single_test(solvent)
-
-results_list = list(results_dict.items())
-# results_list is a list of tuples each of the following format:
-# (solvent_common_name, (mixed_stream, K_HP_in_solvent, K_Water_in_solvent, K_solvent_in_Water, T_diff))
-
-# %% Sort results by criterion
-key = None
-
-criterion = 'Partition of solute into extract'
-# criterion = 'Partition of water into extract'
-# criterion = 'Partition of solvent into raffinate'
-# criterion = 'Difference between solute and solvent boiling temperatures'
-# criterion = 'Absolute difference between solute and solvent boiling temperatures'
-
-if criterion == 'Partition of solute into extract':
-    key = lambda i: i[1][1]
-elif criterion == 'Partition of water into extract':
-    key = lambda i: i[1][2]
-elif criterion == 'Partition of solvent into raffinate':
-    key = lambda i: i[1][3]
-elif criterion == 'Difference between solvent and solute boiling temperatures':
-    key = lambda i: i[1][4]
-elif criterion == 'Absolute difference between solvent and solute boiling temperatures':
-    key = lambda i: abs(i[1][4])
-
-reverse = True
-
-results_list.sort(key=key, reverse=reverse)
-
-print(f"\n\nResult with highest {criterion.lower()}: \n")
-print(results_list[0])
-results_list[0][1][0].show()
-
-# %% Filter results through constraints
-
-inf = float('inf')
-
-range_K_HP_in_solvent = (20., inf)
-range_K_Water_in_solvent = (0., 0.2)
-range_K_solvent_in_Water = (0., 0.02)
-range_T_diff = (25, inf)
-# range_abs_T_diff = (0., inf)
-
-constraints = (range_K_HP_in_solvent, range_K_Water_in_solvent, range_K_solvent_in_Water,
-               range_T_diff)
-
-filtered_results = get_results_meeting_constraints(results_list, constraints)
-
-print(f"\n\nResults meeting specified constraints ({len(filtered_results)} results out of {len(results_list)} total): \n")
-for result in filtered_results:
-    print(result)
-    result[1][0].show()
-    print('\n')
-    
-# %% Unit initialization and tests
-solvent_to_run = '1-octanol'
-set_solvent(solvent_to_run)
-partition_data = dict(IDs=('Triacetic acid lactone', 'Water', solvent_to_run,
-                            'AceticAcid', 'Arabitol',), 
-            K=np.array([1./results_dict[solvent_to_run][1],
-                        1/results_dict[solvent_to_run][2],
-                        results_dict[solvent_to_run][3],
-                       results_dict[solvent_to_run][5],
-                       results_dict[solvent_to_run][6]]),
-            phi = 0.5)
-
-MS = bst.units.MultiStageMixerSettlers('MS', ins = (process_stream, solvent_stream),
-                                      outs = ('raffinate', 'extract'),
-                                      N_stages = 5, partition_data = partition_data,) 
-
-MS.simulate()
-MS.show(N=100, composition=True, flow='kg/hr')
\ No newline at end of file
+        self.process_stream = None
+
+    @property
+    def shape(self):
+        """tuple[int, int, int] Number of solvents, temperatures, and ratios."""
+        return (len(self.solvents_list), self.T_range.size, self.ratios.size)
+
+    def get_point(self, index):
+        """Return the (index, solvent, T, ratio) of a point."""
+        i, j, k = np.unravel_index(index, self.shape)
+        return (int(index), self.solvents_list[i], self.T_range[j], self.ratios[k])
+
+    def get_indices(self, solvent_index):
+        """Return the point indices of a solvent."""
+        N_points = self.T_range.size * self.ratios.size
+        return range(solvent_index * N_points, (solvent_index + 1) * N_points)
+
+    def get_probe_index(self, solvent_index):
+        """Return the point index at the middle temperature and ratio of a solvent."""
+        return int(np.ravel_multi_index((solvent_index, self.T_range.size // 2, self.ratios.size // 2),
+                                        self.shape))
+
+    def get_record(self, index):
+        """Return a dictionary of metrics of an evaluated point."""
+        return dict(zip(metric_names, self.results[index]))
+
+    def _get_configuration(self):
+        return (self.solute, self.water, self.extract_phase, self.raffinate_phase)
+
+    def _get_grid(self):
+        return dict(solute=self.solute, water=self.water,
+                    solvents=self.solvents_list,
+                    T_range=self.T_range.tolist(),
+                    ratios=self.ratios.tolist(),
+                    extract_phase=self.extract_phase,
+                    raffinate_phase=self.raffinate_phase)
+
+    def _load_sink(self):
+        grid = self._get_grid()
+        grid_file = os.path.join(self.sink.path, 'grid.json')
+        if os.path.exists(grid_file):
+            with open(grid_file) as f: saved_grid = json.load(f)
+            if saved_grid != grid:
+                raise ValueError(f"grid of the barrage does not match the results in "
+                                 f"'{self.sink.path}'; use a new sink")
+        else:
+            with open(grid_file, 'w') as f: json.dump(grid, f)
+        df = self.sink.read()
+        results = self.results
+        for index, values in zip(df.index.values, df.values):
+            results[int(index)] = tuple(values)
+
+    def _store(self, evaluated):
+        results = self.results
+        sink = self.sink
+        for index, values in evaluated:
+            results[index] = values
+            if sink is not None: sink.append(index, values)
+
+    def _run(self, imap):
+        results = self.results
+        solvents = self.solvents_list
+        gates = self.gates
+        # Evaluate one point of each solvent and prune solvents that fail the gates
+        probes = [self.get_probe_index(i) for i in range(len(solvents))]
+        self._store(imap(_evaluate_point, [self.get_point(i) for i in probes if i not in results]))
+        self.pruned = pruned = {}
+        survivors = []
+        for n, solvent in enumerate(solvents):
+            failed = gates.get_failed(self.get_record(probes[n])) if gates else []
+            if failed: pruned[solvent] = failed
+            else: survivors.append(n)
+        # Evaluate all other points of the remaining solvents
+        points = [self.get_point(i) for n in survivors
+                  for i in self.get_indices(n) if i not in results]
+        self._store(imap(_evaluate_point, points))
+
+    def run(self):
+        """Evaluate all points (except those of pruned solvents) and return
+        the ranked table."""
+        if self.sink is not None: self._load_sink()
+        N_workers = self.N_workers or os.cpu_count() or 1
+        configuration = self._get_configuration()
+        if N_workers == 1:
+            self.process_stream = process_stream = _call_setup(self.setup, self.args)
+            _worker['process_stream'] = process_stream
+            _worker['configuration'] = configuration
+            self._run(map)
+        else:
+            with Pool(N_workers, _initialize_worker, (self.setup, self.args, configuration)) as pool:
+                self._run(pool.imap_unordered)
+        if self.sink is not None: self.sink.flush()
+        return self.get_table()
+
+    def get_table(self):
+        """
+        Return a DataFrame of metrics by (solvent, temperature, ratio), with
+        whether criteria are met and whether the solvent was pruned, ranked
+        by criteria met and then by `rank_by`.
+
+        """
+        indices = sorted(self.results)
+        points = [self.get_point(i)[1:] for i in indices]
+        index = pd.MultiIndex.from_tuples(points, names=('Solvent', 'T [K]', 'Solvent-to-feed ratio'))
+        table = pd.DataFrame([self.results[i] for i in indices], index=index,
+                             columns=metric_names)
+        criteria = self.criteria
+        table['Meets criteria'] = [criteria.test(self.get_record(i)) if criteria else True
+                                   for i in indices]
+        table['Pruned'] = [i[0] in self.pruned for i in points]
+        return table.sort_values(['Meets criteria', self.rank_by], ascending=False)
+
+    def get_partition_data(self, solvent, T, ratio):
+        """
+        Return partition data (raffinate over extract molar fraction ratios)
+        of all chemicals in the mixed stream, as used by
+        MultiStageMixerSettlers objects.
+
+        """
+        if self.process_stream is None: self.process_stream = _call_setup(self.setup, self.args)
+        mixed_stream = get_mixed_stream(self.process_stream, solvent, T, ratio)
+        chemicals = mixed_stream.chemicals
+        IDs = tuple([chemicals.IDs[i] for i in np.flatnonzero(mixed_stream.mol)])
+        K = np.array([get_K(i, mixed_stream, self.raffinate_phase, self.extract_phase) for i in IDs])
+        return dict(IDs=IDs, K=K, phi=0.5)
+
+# %% Screen of solvents for triacetic acid lactone
+
+solvent_IDs = ('Propyl acetate', 'Butyl acetate', 'Hexanol', 'Cyclohexanol', 'Cyclohexanone',
+               'Heptanol', 'Octanol', '1,8-Octanediol', '2-Ethyl hexanol', 'Nonanol', 'Decanol',
+               'Dodecanol', 'Isoamyl alcohol', '117-81-7', 'Diethyl sebacate', 'Glycerol')
+
+def create_TAL_process_stream(T=303.):
+    from biorefineries.HP.chemicals_data import HP_chemicals
+    Furfural = tmo.Chemical('Furfural')
+    TAL = tmo.Chemical('Triacetic acid lactone')
+    TAL.copy_models_from(Furfural, ['Psat', 'Hvap', 'V'])
+    TAL.Hfus = 30883.6698 # !!! from solubility modeling method 4(ii)
+    TAL.Tm = 185 + 273.15
+    TAL.Tb = 239.1 + 273.15
+    Arabitol = tmo.Chemical('Arabitol')
+    Arabitol.copy_models_from(Furfural, ['V',])
+    solvents = [tmo.Chemical(i) for i in solvent_IDs]
+    solvents[solvent_IDs.index('Diethyl sebacate')].copy_models_from(HP_chemicals['Water'], ['Psat', 'Hvap'])
+    tmo.settings.set_thermo(solvents + ['Water', 'H2SO4', Arabitol, TAL, HP_chemicals['Xylose'], HP_chemicals['Glucose'], HP_chemicals['AceticAcid']])
+    process_stream = tmo.Stream(None,
+                                Water = 224000.,
+                                units = 'kmol/hr',
+                                T = T)
+    process_stream.imol[TAL.ID] = 250.*12.2/7.7
+    process_stream.imol['AceticAcid'] = 5.
+    process_stream.imol['Arabitol'] = 5.
+    return process_stream
+
+if __name__ == '__main__':
+    inf = float('inf')
+
+    gates = Criteria('Gates')
+    gates.add_criterion('Partition of solute into extract', 'K solute', (1., inf))
+    gates.add_criterion('Difference between solute and solvent boiling temperatures', 'Tb difference', (25., inf))
+
+    criteria = Criteria('Constraints')
+    criteria.add_criterion('Partition of solute into extract', 'K solute', (20., inf))
+    criteria.add_criterion('Partition of water into extract', 'K water', (0., 0.2))
+    criteria.add_criterion('Partition of solvent into raffinate', 'K solvent in raffinate', (0., 0.02))
+    criteria.add_criterion('Difference between solute and solvent boiling temperatures', 'Tb difference', (25., inf))
+
+    barrage = SolventsBarrage(create_TAL_process_stream, 'Triacetic acid lactone', solvent_IDs,
+                              T_range=np.linspace(298.15, 348.15, 11), ratios=(0.02, 0.05, 0.1),
+                              gates=gates, criteria=criteria)
+    table = barrage.run()
+    print(f"\n\nPruned solvents: {barrage.pruned}\n")
+    print(table.head(20))
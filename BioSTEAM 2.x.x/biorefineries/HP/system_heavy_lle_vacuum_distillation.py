@@ -404,6 +404,8 @@ S404 = bst.units.MultiStageMixerSettlers('S404', ins = (F401_P-0, M401-0),
                           
                           
 S404.vol_frac = 0.05
+from biorefineries.utils.lle_service import LLEService
+S404.lle_service = LLEService('S404')
 
 
 tolerable_loss_fraction = 0.001
@@ -491,9 +493,9 @@ def update_Ks(lle_unit, solute_indices = (0,), carrier_indices = (1,), solvent_i
     test_stream.imol[solute_chemicals] = process_stream.imol[solute_chemicals]
     test_stream.imol[carrier_chemicals] = process_stream.imol[carrier_chemicals]
     test_stream.imol[solvent_chemicals] = solvent_stream.imol[solvent_chemicals]
-    test_stream.lle(T=process_stream.T, top_chemical = 'Octanediol')
-    # test_stream.show()
-    Ks_new = (test_stream['L'].imol[IDs]/test_stream['L'].F_mol)/(test_stream['l'].imol[IDs]/test_stream['l'].F_mol)
+    lle_stream = lle_unit.lle_service(test_stream, T=process_stream.T, top_chemical = 'Octanediol')
+    # lle_stream.show()
+    Ks_new = (lle_stream['L'].imol[IDs]/lle_stream['L'].F_mol)/(lle_stream['l'].imol[IDs]/lle_stream['l'].F_mol)
     
     return Ks_new
 
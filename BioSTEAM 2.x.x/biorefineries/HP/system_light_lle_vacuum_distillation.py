@@ -54,6 +54,7 @@ import matplotlib.pyplot as plt
 import copy
 from biorefineries.cornstover import CellulosicEthanolTEA
 from biosteam import SystemFactory
+from biorefineries.utils import MaterialLCA
 # from lactic.hx_network import HX_Network
 
 # # Do this to be able to show more streams in a diagram
@@ -486,6 +487,8 @@ def create_HP_sys(ins, outs):
                               
                               
     S404.vol_frac = 0.05
+    from biorefineries.utils.lle_service import LLEService
+    S404.lle_service = LLEService('S404')
     
     
     tolerable_loss_fraction = 0.001
@@ -614,9 +617,9 @@ def create_HP_sys(ins, outs):
         test_stream.imol[solute_chemicals] = process_stream.imol[solute_chemicals]
         test_stream.imol[carrier_chemicals] = process_stream.imol[carrier_chemicals]
         test_stream.imol[solvent_chemicals] = solvent_stream.imol[solvent_chemicals]
-        test_stream.lle(T=process_stream.T, top_chemical = 'Hexanol')
-        # test_stream.show()
-        Ks_new = (test_stream['L'].imol[IDs]/test_stream['L'].F_mol)/(test_stream['l'].imol[IDs]/test_stream['l'].F_mol)
+        lle_stream = lle_unit.lle_service(test_stream, T=process_stream.T, top_chemical = 'Hexanol')
+        # lle_stream.show()
+        Ks_new = (lle_stream['L'].imol[IDs]/lle_stream['L'].F_mol)/(lle_stream['l'].imol[IDs]/lle_stream['l'].F_mol)
         
         return Ks_new
     
@@ -1031,7 +1034,8 @@ def create_HP_sys(ins, outs):
                          outs=('process_water', 'discharged_water'))
     
     # Heat exchange network
-    HXN = bst.facilities.HeatExchangerNetwork('HXN')
+    from biorefineries.utils.incremental_hxn import IncrementalHeatExchangerNetwork
+    HXN = IncrementalHeatExchangerNetwork('HXN')
     def HXN_no_run_cost():
         HXN.heat_utilities = tuple()
         HXN._installed_cost = 0.
@@ -1409,13 +1413,16 @@ TEA_products = set([i for i in HP_sys.products if i.price]+ \
     [i for i in BT_sys.products if i.price]+[AA])
 # 100-year global warming potential (GWP) from material flows
 LCA_streams = TEA_feeds.copy()
-LCA_stream = Stream('LCA_stream', units='kg/hr')
 
 feed_chem_IDs = [chem.ID for chem in HP_chemicals]
 
 GWP_CF_stream = CFs['GWP_CF_stream']
 FEC_CF_stream = CFs['FEC_CF_stream']
 
+# Characterization factors are precomputed as vectors; all impacts are
+# computed from the flow rates of LCA_streams at once
+material_LCA = MaterialLCA(LCA_streams, {'GWP': GWP_CF_stream, 'FEC': FEC_CF_stream})
+
 
 # Carbon balance
 total_C_in = sum([feed.get_atomic_flow('C') for feed in feeds])
@@ -1436,18 +1443,12 @@ def get_material_GWP():
     return sum(chemical_GWP)/AA.F_mass
 
 def get_material_GWP_array():
-    LCA_stream.mass = sum(i.mass for i in LCA_streams)
-    # chemical_GWP = LCA_stream.mass*CFs['GWP_CF_stream'].mass
-    chemical_GWP = [LCA_stream.imass[ID] * GWP_CF_stream.imass[ID] for ID in feed_chem_IDs]
-    # feedstock_GWP = feedstock.F_mass*CFs['GWP_CFs']['Corn stover']
-    # return chemical_GWP.sum()/AA.F_mass
-    return chemical_GWP
+    # GWP by chemical, in the order of feed_chem_IDs
+    return material_LCA.get_impacts_by_chemical()[0]
 
 def get_material_GWP_breakdown():
-    LCA_stream.mass = sum(i.mass for i in LCA_streams)
-    chemical_GWP_dict = {ID: LCA_stream.imass[ID] * GWP_CF_stream.imass[ID] / AA.F_mass \
-                         for ID in feed_chem_IDs if not LCA_stream.imass[ID] * GWP_CF_stream.imass[ID] == 0.}
-    return chemical_GWP_dict
+    F_mass_AA = AA.F_mass
+    return {ID: GWP / F_mass_AA for ID, GWP in material_LCA.get_impact_breakdown('GWP').items()}
 
 def get_material_GWP_breakdown_fractional():
     chemical_GWP_dict = get_material_GWP_breakdown()
@@ -1527,31 +1528,24 @@ get_GWP_alternative = lambda: get_FGHTP_GWP() + get_material_GWP() +\
                     get_non_BT_direct_emissions_GWP() + get_heating_demand_GWP() + get_cooling_demand_GWP() +\
                         get_electricity_demand_non_cooling_GWP()
                         
-get_GWP_by_ID = lambda ID: LCA_stream.imass[ID] * GWP_CF_stream.imass[ID]/AA.F_mass
+get_GWP_by_ID = lambda ID: material_LCA.get_chemical_impact('GWP', ID)/AA.F_mass
 
 
 ############################## FEC #################################
 # Fossil energy consumption (FEC) from materials
 def get_material_FEC():
-    # chemical_FEC = LCA_stream.mass*CFs['FEC_CF_stream'].mass
     chemical_FEC = get_material_FEC_array()
     # feedstock_FEC = feedstock.F_mass*CFs['FEC_CFs']['Corn stover']
     # return chemical_FEC.sum()/AA.F_mass
     return sum(chemical_FEC)/AA.F_mass
 
 def get_material_FEC_array():
-    LCA_stream.mass = sum(i.mass for i in LCA_streams)
-    # chemical_FEC = LCA_stream.mass*CFs['FEC_CF_stream'].mass
-    chemical_FEC = [LCA_stream.imass[ID] * FEC_CF_stream.imass[ID] for ID in feed_chem_IDs]
-    # feedstock_FEC = feedstock.F_mass*CFs['FEC_CFs']['Corn stover']
-    # return chemical_FEC.sum()/AA.F_mass
-    return chemical_FEC
+    # FEC by chemical, in the order of feed_chem_IDs
+    return material_LCA.get_impacts_by_chemical()[1]
 
 def get_material_FEC_breakdown():
-    LCA_stream.mass = sum(i.mass for i in LCA_streams)
-    chemical_FEC_dict = {ID: LCA_stream.imass[ID] * FEC_CF_stream.imass[ID] / AA.F_mass \
-                         for ID in feed_chem_IDs if not LCA_stream.imass[ID] * FEC_CF_stream.imass[ID] == 0.}
-    return chemical_FEC_dict
+    F_mass_AA = AA.F_mass
+    return {ID: FEC / F_mass_AA for ID, FEC in material_LCA.get_impact_breakdown('FEC').items()}
 
 def get_material_FEC_breakdown_fractional():
     chemical_FEC_dict = get_material_FEC_breakdown()
@@ -1579,7 +1573,7 @@ get_feedstock_FEC = lambda: (feedstock.F_mass-feedstock.imass['Water'])\
     * CFs['FEC_CFs']['FGHTP %s'%feedstock_ID]/AA.F_mass
 # FEC from electricity
 
-get_FEC_by_ID = lambda ID: LCA_stream.imass[ID] * FEC_CF_stream.imass[ID]/AA.F_mass
+get_FEC_by_ID = lambda ID: material_LCA.get_chemical_impact('FEC', ID)/AA.F_mass
 
 get_ng_FEC = lambda: CFs['FEC_CFs']['CH4']*s.natural_gas.F_mass/AA.F_mass
 # Total FEC
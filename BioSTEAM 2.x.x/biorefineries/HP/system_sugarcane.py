@@ -291,6 +291,8 @@ def create_HP_sys(ins, outs):
                               
                               
     S404.vol_frac = 0.05
+    from biorefineries.utils.lle_service import LLEService
+    S404.lle_service = LLEService('S404')
     
     
     tolerable_loss_fraction = 0.001
@@ -419,9 +421,9 @@ def create_HP_sys(ins, outs):
         test_stream.imol[solute_chemicals] = process_stream.imol[solute_chemicals]
         test_stream.imol[carrier_chemicals] = process_stream.imol[carrier_chemicals]
         test_stream.imol[solvent_chemicals] = solvent_stream.imol[solvent_chemicals]
-        test_stream.lle(T=process_stream.T, top_chemical = 'Hexanol')
-        # test_stream.show()
-        Ks_new = (test_stream['L'].imol[IDs]/test_stream['L'].F_mol)/(test_stream['l'].imol[IDs]/test_stream['l'].F_mol)
+        lle_stream = lle_unit.lle_service(test_stream, T=process_stream.T, top_chemical = 'Hexanol')
+        # lle_stream.show()
+        Ks_new = (lle_stream['L'].imol[IDs]/lle_stream['L'].F_mol)/(lle_stream['l'].imol[IDs]/lle_stream['l'].F_mol)
         
         return Ks_new
     
@@ -41,19 +41,22 @@ from ._tea import *
 _system_loaded = False
 _chemicals_loaded = False
 
-def load():
+def load(cached=False):
     if not _chemicals_loaded: _load_chemicals()
-    _load_system()
+    _load_system(cached)
     dct = globals()
     dct.update(flowsheet.to_dict())
 
 def _load_chemicals():
-    global chemicals
-    chemicals = create_chemicals()    
+    from ..utils import load_chemicals
+    global chemicals, _chemicals_loaded
+    chemicals = load_chemicals(create_chemicals, _chemicals.definition_files)
+    _chemicals_loaded = True
 
-def _load_system():
+def _load_system(cached=False):
     import biosteam as bst
     from biosteam import main_flowsheet as F
+    from ..utils import load_snapshot, save_snapshot
     global LAOs_sys, LAOs_tea, specs, flowsheet, unit_groups, OSBL_unit_group
     global _system_loaded, products
     flowsheet = bst.Flowsheet('LAOs')
@@ -85,9 +88,13 @@ def _load_system():
     OSBL_unit_group = UnitGroup('OSBL', OSBL_units)
     bst.System.default_molar_tolerance = 0.1
     bst.System.default_converge_method = 'aitken'
-    specs.run_specifications() # Sets process specifications and simulates system
     products = (F('hexene'), F('octene'), F('decene'))
-    for i in range(2): set_LAOs_MPSP(get_LAOs_MPSP())
+    specs.load_specifications()
+    # Product prices are restored with the snapshot
+    if not (cached and load_snapshot(LAOs_sys, 'LAOs')):
+        LAOs_sys.simulate()
+        for i in range(2): set_LAOs_MPSP(get_LAOs_MPSP())
+        if cached: save_snapshot(LAOs_sys, 'LAOs')
     _system_loaded = True
 
 if PY37:
@@ -8,27 +8,40 @@ Created on Fri Jul 31 12:00:51 2020
 import biosteam as bst
 import flexsolve as flx
 import numpy as np
+from biorefineries.utils import SpecificationSweep, prepare_TRY_worker
 # from biosteam.process_tools.reactor_specification import evaluate_across_TRY
 _kg_per_ton = 907.18474
 def evaluate_across_specs(spec, system,
             spec_1, spec_2, metrics, spec_3):
+    spec.count += 1
     try:
         spec.load_specifications(spec_1=spec_1, spec_2=spec_2)
         for i in range(3):
             system.simulate()
-    except : # (ValueError, RuntimeError) (ValueError, AssertionError)
+    except Exception as e: # (ValueError, RuntimeError) (ValueError, AssertionError)
+        spec.count_exceptions += 1
+        spec.exceptions_dict[spec.count] = e
         return np.nan*np.ones([len(metrics), len(spec_3)])
     return spec.evaluate_across_productivity(metrics, spec_3)
+
+
+def setup_TRY_worker():
+    """
+    Return the process specification, system, and metrics (MPSP, sugar 
+    concentration, and inhibitor concentration) for TRY analysis. This function
+    is called once by each worker of 
+    ProcessSpecification.evaluate_across_specs_in_parallel.
     
-evaluate_across_specs = np.vectorize(
-    evaluate_across_specs, 
-    excluded=['spec', 'system', 'metrics', 'spec_3'],
-    signature='(),(),(),(),(m),(p)->(m,p)'
-)
+    """
+    from biorefineries.TAL.system import TAL_sys, TAL_tea, SA, R302, spec
+    effluent = R302.outs[0]
+    get_sugars_conc = lambda: sum(effluent.imass['Glucose', 'Xylose'])/effluent.F_vol
+    get_inhibitors_conc = lambda: 1000*sum(effluent.imass['AceticAcid', 'Furfural', 'HMF'])/effluent.F_vol
+    return prepare_TRY_worker(spec, TAL_sys, TAL_tea, SA, get_sugars_conc, get_inhibitors_conc)
 
 
 
-class ProcessSpecification(bst.process_tools.ReactorSpecification):
+class ProcessSpecification(SpecificationSweep, bst.process_tools.ReactorSpecification):
     
     __slots__ = ('reactor',
                  'substrates',
@@ -47,7 +60,11 @@ class ProcessSpecification(bst.process_tools.ReactorSpecification):
                  'load_spec_3',
                  'feedstock',
                  'dehydration_reactor', 
-                 'byproduct_streams')
+                 'byproduct_streams',
+                 'count',
+                 'count_exceptions',
+                 'total_iterations',
+                 'exceptions_dict')
     
     def __init__(self, evaporator, mixer, reactor, reaction_name, substrates, products,
                  spec_1, spec_2, spec_3, path, xylose_utilization_fraction,
@@ -67,6 +84,11 @@ class ProcessSpecification(bst.process_tools.ReactorSpecification):
         self.feedstock = feedstock
         self.dehydration_reactor = dehydration_reactor
         self.byproduct_streams = byproduct_streams
+        
+        self.count = 0
+        self.count_exceptions = 0
+        self.total_iterations = 0
+        self.exceptions_dict = {}
         # self.load_spec_1 = load_spec_1
         # self.load_spec_2 = load_spec_2
         # self.load_spec_3 = load_spec_3
@@ -123,44 +145,15 @@ class ProcessSpecification(bst.process_tools.ReactorSpecification):
             data[:, i] = [j() for j in metrics]
         return data
 
-    def evaluate_across_specs(self, system, 
-            spec_1, spec_2, metrics, spec_3):
-        
+    def evaluate_at_specs(self, system, spec_1, spec_2, metrics, spec_3):
         """
-        Evaluate metrics at given titer and yield across a set of 
-        productivities. Return an array with the all metric results.
-            
-        Parameters
-        ----------
-        titer : array_like[shape]
-            Titer to evaluate.
-        yield_ : array_like[shape]
-            Yield to evaluate.
-        metrics : Iterable[Callable; M elements]
-            Should return a number given no parameters.
-        productivities : array_like[P elements]
-            Productivities to evaluate.
-        
-        Returns
-        -------
-        results : array[shape x M x P]
-            All metric results at given titer/yield across productivities.
-        
-        Notes
-        -----
-        This method is vectorized along titer and yield. If, for example,
-        the parameters had the following dimensions:
-            
-        titer [Y x T], yield [Y x T], metrics [M], productivities [P]
-        
-        This method would return an array with the following dimensions:
-        
-        results [Y x T x M x P]
+        Evaluate metrics at a single titer and yield across a set of 
+        productivities. Return an array with the all metric results
+        (array[M x P]).
         
         """
-        return evaluate_across_specs(self, system, 
-                                   spec_1, spec_2, 
-                                   metrics, spec_3)
+        return evaluate_across_specs(self, system, spec_1, spec_2,
+                                     metrics, spec_3)
     
     @property
     def feed(self):
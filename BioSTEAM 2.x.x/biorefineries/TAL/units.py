@@ -22,8 +22,8 @@ All units are explicitly defined here for transparency and easy reference
 import numpy as np
 import thermosteam as tmo
 from math import exp
-from flexsolve import aitken_secant
 from biosteam import Unit
+from biorefineries.utils import SteamInjector
 from biosteam.units import Flash, HXutility, Mixer, MixTank, Pump, \
     SolidsSeparator, StorageTank, LiquidsSplitSettler
 from biosteam.units.decorators import cost
@@ -114,7 +114,7 @@ class PretreatmentMixer(Mixer):
         mixture_out.mix_from([mixture, water])
 
 # Steam mixer
-class SteamMixer(Unit):
+class SteamMixer(SteamInjector):
     """
     Parameters
     ----------
@@ -130,27 +130,7 @@ class SteamMixer(Unit):
     _N_outs = 1
     
     def __init__(self, ID='', ins=None, outs=(), *, P):
-        Unit.__init__(self, ID, ins, outs)
-        self.P = P
-        
-    @staticmethod
-    def P_at_flow(mol_water, P, steam, mixed, feed):
-        steam.imol['Water'] = mol_water
-        mixed.mol = steam.mol + feed.mol
-        mixed.H = feed.H + steam.H
-        P_new = mixed.chemicals.Water.Psat(mixed.T)
-        return P_new-P
-    
-    def _run(self):
-        feed, steam = self.ins
-        mixed = self.outs[0]
-
-        steam_mol = steam.F_mol
-        steam_mol = max(0, aitken_secant(f=self.P_at_flow,
-                                  x0=steam_mol, x1=steam_mol+0.1, 
-                                  xtol=1e-4, ytol=1e-4,
-                                  args=(self.P, steam, mixed, feed)))
-        mixed.P = self.P
+        SteamInjector.__init__(self, ID, ins, outs, P=P)
     
 # Pretreatment reactor
 @cost(basis='Dry flow rate', ID='Pretreatment reactor', units='kg/hr',
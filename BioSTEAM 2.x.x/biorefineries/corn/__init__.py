@@ -37,10 +37,10 @@ from ._tea import *
 _system_loaded = False
 _chemicals_loaded = False
 
-def load():
+def load(cached=False):
     if not _chemicals_loaded: _load_chemicals()
     try:
-        _load_system()
+        _load_system(cached)
     finally:
         dct = globals()
         dct.update(flowsheet.to_dict())
@@ -50,18 +50,24 @@ def _load_chemicals():
     chemicals = create_chemicals()
     _chemicals_loaded = True
 
-def _load_system():
+def _load_system(cached=False):
     import biosteam as bst
     from biosteam import main_flowsheet as F
+    from ..utils import load_snapshot, save_snapshot
     global corn_sys, corn_tea, flowsheet, all_areas, _system_loaded
     flowsheet = bst.Flowsheet('corn')
     F.set_flowsheet(flowsheet)
     bst.settings.set_thermo(chemicals)
     load_process_settings()
     corn_sys = create_system()
-    corn_sys.simulate()
+    snapshot = cached and load_snapshot(corn_sys, 'corn')
+    if not snapshot: corn_sys.simulate()
     corn_tea = create_tea(corn_sys)
-    corn_tea.IRR = corn_tea.solve_IRR()
+    if snapshot:
+        corn_tea.IRR = snapshot.results['IRR']
+    else:
+        corn_tea.IRR = corn_tea.solve_IRR()
+        if cached: save_snapshot(corn_sys, 'corn', IRR=corn_tea.IRR)
     all_areas = bst.process_tools.UnitGroup('All Areas', corn_sys.units)
     _system_loaded = True
 
@@ -44,9 +44,12 @@ Name: (Corn, Price [USD/kg]), dtype: float64
 
 """
 from biorefineries import corn as cn
+from biorefineries.utils import TEABatch, EconomicFastPathModel, ResponseSurface
+import numpy as np
 import biosteam as bst
 
-__all__ = ('ABM_TEA_model',)
+__all__ = ('ABM_TEA_model', 'ABM_TEA_batch',
+           'build_ABM_TEA_surrogate', 'load_ABM_TEA_surrogate')
 
 # %% Functional ABM TEA model for legacy purposes
 
@@ -69,7 +72,7 @@ def ABM_TEA_function(
     operating_days : float
         Number of operating days per year.
     plant_capacity : float
-        Plat capacity in kg/yr of feedstock.
+        Plant capacity in kg/yr of feedstock.
     price_corn : float
         Price of corn in USD/kg.
     price_DDGS : float
@@ -113,6 +116,79 @@ def ABM_TEA_function(
         'Production': hours * cn.ethanol.F_mass,
     }
 
+def ABM_TEA_batch(
+        operating_days=330,
+        plant_capacity=876072883.4242561, 
+        price_corn=0.13227735731092652, 
+        price_DDGS=0.12026, 
+        price_corn_oil=0.56,
+        price_ethanol=0.48547915353569393,
+        IRR=0.15,
+        start_year=2007,
+        end_year=2027,
+    ):
+    """
+    Return a dictionary of biorefinery metrics for the production of
+    ethanol from corn across a batch of economic scenarios. The system is
+    simulated once at the given operating days and plant capacity. Prices,
+    IRR, and start/end years may be arrays, which are evaluated at once
+    through the cash flow analysis.
+
+    Parameters
+    ----------
+    operating_days : float
+        Number of operating days per year.
+    plant_capacity : float
+        Plant capacity in kg/yr of feedstock.
+    price_corn : float or 1d array
+        Price of corn in USD/kg.
+    price_DDGS : float or 1d array
+        Price of DDGS in USD/kg.
+    price_corn_oil : float or 1d array
+        Price of corn oil in USD/kg.
+    price_ethanol : float or 1d array
+        Price of ethanol in USD/kg.
+    IRR : float or 1d array
+        Internal rate of return as a fraction (not percent!).
+    start_year : int or 1d array
+        Start year of operation.
+    end_year : int or 1d array
+        End year of operation.
+
+    Returns
+    -------
+    metrics: dict
+        Includes MESP [USD/kg], MFPP [USD/kg], IRR [-], NPV [USD], 
+        TCI [USD], FOC [USD/yr], VOC [USD/yr], Electricity consumption [MWhr/yr], 
+        Electricity production [MWhr/yr], and Production [kg/yr] as 1d arrays.
+    
+    """
+    hours = operating_days * 24 
+    cn.corn.F_mass = plant_capacity / hours
+    cn.corn_tea.operating_days = operating_days
+    cn.corn_sys.simulate()
+    batch = TEABatch(cn.corn_tea, (cn.corn, cn.DDGS, cn.crude_oil, cn.ethanol))
+    prices = {cn.corn: price_corn,
+              cn.DDGS: price_DDGS,
+              cn.crude_oil: price_corn_oil,
+              cn.ethanol: price_ethanol}
+    scenarios = dict(prices=prices, IRR=IRR, start_year=start_year, end_year=end_year)
+    NPV = batch.NPV(**scenarios)
+    full = lambda value: np.full(NPV.size, value)
+    unit_group = cn.all_areas
+    return {
+        'MESP': batch.solve_price(cn.ethanol, **scenarios),
+        'MFPP': batch.solve_price(cn.corn, **scenarios),
+        'IRR': batch.solve_IRR(**scenarios),
+        'NPV': NPV,
+        'TCI': full(cn.corn_tea.TCI),
+        'VOC': full(batch.VOC(prices)),
+        'FOC': full(cn.corn_tea.FOC),
+        'Electricity consumption [MWhr/yr]': full(hours * unit_group.get_electricity_consumption()), 
+        'Electricity production [MWhr/yr]': full(hours * unit_group.get_electricity_production()),
+        'Production': full(hours * cn.ethanol.F_mass),
+    }
+
 # %% ABM Model object
 
 metrics = [
@@ -128,7 +204,10 @@ metrics = [
     bst.Metric('Production', lambda:operating_hours * cn.ethanol.F_mass, 'kg/yr')
 ]
 
-ABM_TEA_model = bst.Model(cn.corn_sys, metrics)
+# Only parameters that change mass and energy balances are 'coupled';
+# samples that only change prices, IRR, or duration reuse the last
+# converged system
+ABM_TEA_model = EconomicFastPathModel(cn.corn_sys, metrics)
 
 @ABM_TEA_model.parameter(element='Corn', units='USD/kg')
 def set_corn_price(price):
@@ -147,7 +226,7 @@ def set_ethanol_price(price):
     cn.ethanol.price = price
 
 operating_hours = cn.corn_tea.operating_days * 24
-@ABM_TEA_model.parameter(units='day/yr')
+@ABM_TEA_model.parameter(units='day/yr', kind='coupled')
 def set_operating_days(operating_days):
     global operating_hours
     cn.corn_tea.operating_days = operating_days
@@ -165,6 +244,132 @@ def set_start_year(start_year):
 def set_end_year(end_year):
     cn.corn_tea.duration = (cn.corn_tea.duration[0], end_year)
 
-@ABM_TEA_model.parameter(units='kg/yr')
+@ABM_TEA_model.parameter(units='kg/yr', kind='coupled')
 def set_plant_capacity(plant_capacity):
     cn.corn.F_mass = plant_capacity / operating_hours
+
+# %% Surrogate model of ABM_TEA_function
+
+#: [dict] Bounds of ABM_TEA_function arguments sampled to fit surrogate models;
+#: the duration is given by the number of years of operation.
+surrogate_domain = {
+    'operating_days': (300., 360.),
+    'plant_capacity': (0.5 * 876072883.4242561, 2. * 876072883.4242561),
+    'price_corn': (0.08, 0.20),
+    'price_DDGS': (0.08, 0.20),
+    'price_corn_oil': (0.3, 0.8),
+    'price_ethanol': (0.3, 0.8),
+    'IRR': (0.05, 0.20),
+    'years': (15, 35),
+}
+
+#: tuple[str] Arguments that change mass and energy balances.
+physical_arguments = ('operating_days', 'plant_capacity')
+
+#: tuple[str] Keys of ABM_TEA_function results in the order of the model metrics.
+surrogate_outputs = ('MESP', 'MFPP', 'IRR', 'NPV', 'TCI', 'VOC', 'FOC',
+                     'Electricity consumption [MWhr/yr]', 
+                     'Electricity production [MWhr/yr]',
+                     'Production')
+
+def get_ABM_TEA_samples(arguments, start_year=2007.):
+    """
+    Return ABM_TEA_model samples (samples x parameters) from a dictionary
+    of surrogate arguments (1d arrays), with columns in the order of the 
+    model parameters.
+    
+    """
+    years = np.asarray(arguments['years'], dtype=float)
+    start_year = np.full(years.size, start_year)
+    values = {
+        set_corn_price: arguments['price_corn'],
+        set_DDGS_price: arguments['price_DDGS'],
+        set_corn_oil_price: arguments['price_corn_oil'],
+        set_ethanol_price: arguments['price_ethanol'],
+        set_operating_days: arguments['operating_days'],
+        set_IRR: arguments['IRR'],
+        set_start_year: start_year,
+        set_end_year: start_year + years,
+        set_plant_capacity: arguments['plant_capacity'],
+    }
+    return np.array([values[i] for i in ABM_TEA_model.get_parameters()], dtype=float).T
+
+def build_ABM_TEA_surrogate(file=None, N_physical=30, N_economic=40, degree=3,
+                            seed=3221, domain=None, min_R2=0.99):
+    """
+    Return a ResponseSurface object fitted to ABM_TEA_model results across
+    the surrogate domain, and save it to `file` if given. The system is
+    simulated once for each of the `N_physical` samples of physical
+    arguments, which are each evaluated at `N_economic` samples of prices,
+    IRR, and years of operation. A ValueError is raised if the coefficient
+    of determination of any output is less than `min_R2` (results remain
+    in the ABM_TEA_model table).
+    
+    """
+    domain = surrogate_domain if domain is None else domain
+    names = tuple(domain)
+    lower, upper = np.array([domain[i] for i in names], dtype=float).T
+    np.random.seed(seed)
+    N = N_physical * N_economic
+    X = lower + (upper - lower) * np.random.rand(N, len(names))
+    physical = [names.index(i) for i in physical_arguments]
+    X[:, physical] = np.repeat(X[:N_physical, physical], N_economic, axis=0)
+    years = names.index('years')
+    X[:, years] = np.round(X[:, years])
+    samples = get_ABM_TEA_samples(dict(zip(names, X.T)))
+    ABM_TEA_model.load_samples(samples)
+    ABM_TEA_model.evaluate()
+    Y = ABM_TEA_model.table[[i.index for i in ABM_TEA_model.metrics]].values
+    converged = ~np.isnan(Y).any(1)
+    surrogate = ResponseSurface.fit(X[converged], Y[converged], names, 
+                                    surrogate_outputs, degree, lower, upper,
+                                    min_R2)
+    if file: surrogate.save(file)
+    return surrogate
+
+def load_ABM_TEA_surrogate(surrogate):
+    """
+    Return a function with the same signature and results as ABM_TEA_function
+    that evaluates the surrogate model within its domain, and simulates the 
+    biorefinery otherwise.
+    
+    Parameters
+    ----------
+    surrogate : ResponseSurface or str
+        Surrogate model or the file it was saved to.
+    
+    """
+    if not isinstance(surrogate, ResponseSurface):
+        surrogate = ResponseSurface.load(surrogate)
+    inputs = surrogate.inputs
+    
+    def ABM_TEA_surrogate_function(
+            operating_days=330,
+            plant_capacity=876072883.4242561, 
+            price_corn=0.13227735731092652, 
+            price_DDGS=0.12026, 
+            price_corn_oil=0.56,
+            price_ethanol=0.48547915353569393,
+            IRR=0.15,
+            duration=(2007, 2027),
+        ):
+        arguments = dict(
+            operating_days=operating_days,
+            plant_capacity=plant_capacity,
+            price_corn=price_corn,
+            price_DDGS=price_DDGS,
+            price_corn_oil=price_corn_oil,
+            price_ethanol=price_ethanol,
+            IRR=IRR,
+            years=duration[1] - duration[0],
+        )
+        x = [arguments[i] for i in inputs]
+        if surrogate.in_domain(x):
+            return surrogate(x)
+        else:
+            del arguments['years']
+            return ABM_TEA_function(duration=duration, **arguments)
+    
+    ABM_TEA_surrogate_function.__doc__ = ABM_TEA_function.__doc__
+    ABM_TEA_surrogate_function.surrogate = surrogate
+    return ABM_TEA_surrogate_function
@@ -9,10 +9,10 @@
 """
 import biosteam as bst
 import thermosteam as tmo
-import flexsolve as flx
 from biosteam.units.decorators import cost, copy_algorithm
 from biosteam.units.design_tools import CEPCI_by_year, cylinder_diameter_from_volume, cylinder_area
 from biosteam import tank_factory
+from biorefineries.utils import SteamInjector
 import numpy as np
 
 __all__ = (
@@ -96,7 +96,7 @@ SlurryMixTank = tank_factory('SlurryMixTank', mixing=True,
 
 
 @cost('Flow rate', units='kg/hr', CE=CE2007, cost=14000, n=0.6, S=150347)
-class JetCooker(bst.Unit):
+class JetCooker(SteamInjector):
     """
     ins : stream sequence
     
@@ -113,27 +113,11 @@ class JetCooker(bst.Unit):
     _N_heat_utilities = 0
     
     def __init__(self, ID="", ins=None, outs=(), thermo=None, T=483.15):
-        super().__init__(ID, ins, outs, thermo)
-        self.T = T
-    
-    @staticmethod
-    def _T_objective_function(steam_mol, T, steam, effluent, feed):
-        steam.imol[CAS_water] = abs(steam_mol)
-        effluent.mol[:] = steam.mol + feed.mol
-        effluent.H = feed.H + steam.H
-        return effluent.T - T
+        super().__init__(ID, ins, outs, thermo, T=T)
     
     def _run(self):
-        feed, steam = self._ins
-        steam_mol = feed.F_mol / 100.
-        effluent, = self.outs
-        effluent.T = self.T
-        steam_mol = flx.aitken_secant(self._T_objective_function,
-                                      steam_mol, 1/8 * steam_mol + 1., 
-                                      1e-4, 1e-4,
-                                      args=(self.T, steam, effluent, feed),
-                                      checkroot=False)
-        effluent.P = steam.P / 2.
+        super()._run()
+        self.outs[0].P = self._ins[1].P / 2.
 
 CookedSlurrySurgeTank = tank_factory('CookedSlurrySurgeTank',
     CE=CE2007, cost=MF90 * 173700., S=14.16, tau=0.25, n=0.6, V_wf=0.90, V_max=100., V_units='m3',
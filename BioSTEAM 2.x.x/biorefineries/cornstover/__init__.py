@@ -45,20 +45,22 @@ _system_loaded = False
 _chemicals_loaded = False
 _include_blowdown_recycle = True
 
-def load():
+def load(cached=False):
     if not _chemicals_loaded: _load_chemicals()
-    _load_system()
+    _load_system(cached)
     dct = globals()
     dct.update(flowsheet.to_dict())
 
 def _load_chemicals():
+    from ..utils import load_chemicals
     global chemicals, _chemicals_loaded
-    chemicals = create_chemicals()
+    chemicals = load_chemicals(create_chemicals, _chemicals.definition_files)
     _chemicals_loaded = True
 
-def _load_system():
+def _load_system(cached=False):
     import biosteam as bst
     from biosteam import main_flowsheet as F
+    from ..utils import load_snapshot, save_snapshot
     global cornstover_sys, cornstover_tea, specs, flowsheet, _system_loaded
     global Area100, Area200, Area300, Area400, Area500, Area600, Area700, Area800
     global AllAreas, areas, ethanol_price_gal
@@ -67,14 +69,18 @@ def _load_system():
     bst.settings.set_thermo(chemicals)
     load_process_settings()
     cornstover_sys = create_system(include_blowdown_recycle=_include_blowdown_recycle)
-    cornstover_sys.simulate()
+    configuration = (_include_blowdown_recycle,)
+    snapshot = cached and load_snapshot(cornstover_sys, 'cornstover', *configuration)
+    if not snapshot: cornstover_sys.simulate()
     u = F.unit
     OSBL_units = (u.WWTC, u.CWP, u.CT, u.PWC, u.ADP,
                   u.T701, u.T702, u.P701, u.P702, u.M701, u.FT,
                   u.CSL_storage, u.DAP_storage, u.BT)
     cornstover_tea = create_tea(cornstover_sys, OSBL_units, [u.U101])
     ethanol = F.stream.ethanol
-    ethanol.price = cornstover_tea.solve_price(ethanol)
+    if not snapshot: # The ethanol price is restored with the snapshot
+        ethanol.price = cornstover_tea.solve_price(ethanol)
+        if cached: save_snapshot(cornstover_sys, 'cornstover', *configuration)
     ethanol_price_gal = ethanol.price * ethanol_density_kggal
     UnitGroup = bst.process_tools.UnitGroup
     Area100 = UnitGroup('Area 100', (u.U101,))
@@ -44,9 +44,12 @@ Name: (Corn stover, Price [USD/kg]), dtype: float64
 
 """
 from biorefineries import cornstover as cs
+from biorefineries.utils import TEABatch, EconomicFastPathModel, ResponseSurface
+import numpy as np
 import biosteam as bst
 
-__all__ = ('ABM_TEA_model',)
+__all__ = ('ABM_TEA_model', 'ABM_TEA_batch',
+           'build_ABM_TEA_surrogate', 'load_ABM_TEA_surrogate')
 
 # %% Composition utilities
 
@@ -90,6 +93,10 @@ others_composition /= others_composition.sum()
 miscanthus_dry_composition += (1. - miscanthus_dry_composition.sum()) * others_composition
 miscanthus_composition = 0.8 * miscanthus_dry_composition + cellulosic_moisture_content
 
+# Default prices [USD/kg]
+price_cornstover = 0.05159
+price_miscanthus = 0.08
+
 def set_mixed_cornstover_miscanthus_feedstock(x_cornstover):
     x_miscanthus = 1 - x_cornstover
     composition = (x_cornstover * cornstover_composition
@@ -117,11 +124,11 @@ def ABM_TEA_function(
     Parameters
     ----------
     cornstover_fraction : float
-        Fractino of cornstover in feedstock.
+        Fraction of cornstover in feedstock.
     operating_days : float
         Number of operating days per year.
     plant_capacity : float
-        Plat capacity in kg/yr of feedstock.
+        Plant capacity in kg/yr of feedstock.
     price_cornstover : float
         Price of cornstover in USD/kg.
     price_miscanthus : float
@@ -143,7 +150,7 @@ def ABM_TEA_function(
     """
     x_cornstover = cornstover_fraction
     if not 0. <= x_cornstover <= 1.:
-        raise ValueError('cornstover fraction must be between 0 to 1; {x_cornstover} given')
+        raise ValueError(f'cornstover fraction must be between 0 to 1; {x_cornstover} given')
     set_mixed_cornstover_miscanthus_feedstock(x_cornstover)
     cs.cornstover.price = (price_cornstover * x_cornstover 
                            + price_miscanthus * (1 - x_cornstover))
@@ -168,6 +175,84 @@ def ABM_TEA_function(
         'Production': cs.ethanol.F_mass * hours,
     }
 
+def ABM_TEA_batch(
+        cornstover_fraction=1.0,
+        operating_days=350.4,
+        plant_capacity=876072883.4242561, 
+        price_cornstover=0.05159, 
+        price_miscanthus=0.08, 
+        price_ethanol=0.80,
+        IRR=0.10,
+        start_year=2007,
+        end_year=2037,
+    ):
+    """
+    Return a dictionary of biorefinery metrics for the production of cellulosic
+    ethanol from mixed feedstocks across a batch of economic scenarios.
+    The system is simulated once at the given corn stover fraction, operating
+    days and plant capacity. Prices, IRR, and start/end years may be arrays,
+    which are evaluated at once through the cash flow analysis.
+
+    Parameters
+    ----------
+    cornstover_fraction : float
+        Fraction of cornstover in feedstock.
+    operating_days : float
+        Number of operating days per year.
+    plant_capacity : float
+        Plant capacity in kg/yr of feedstock.
+    price_cornstover : float or 1d array
+        Price of cornstover in USD/kg.
+    price_miscanthus : float or 1d array
+        Price of miscanthus in USD/kg.
+    price_ethanol : float or 1d array
+        Price of ethanol in USD/kg.
+    IRR : float or 1d array
+        Internal rate of return as a fraction (not percent!).
+    start_year : int or 1d array
+        Start year of operation.
+    end_year : int or 1d array
+        End year of operation.
+
+    Returns
+    -------
+    metrics: dict
+        Includes MESP [USD/kg], MFPP [USD/kg], IRR [-], NPV [USD], 
+        TCI [USD], FOC [USD/yr], VOC [USD/yr], Electricity consumption [MWhr/yr], 
+        Electricity production [MWhr/yr], and Production [kg/yr] as 1d arrays.
+    
+    """
+    x_cornstover = cornstover_fraction
+    if not 0. <= x_cornstover <= 1.:
+        raise ValueError(f'cornstover fraction must be between 0 to 1; {x_cornstover} given')
+    set_mixed_cornstover_miscanthus_feedstock(x_cornstover)
+    hours = operating_days * 24 
+    cs.cornstover.F_mass = plant_capacity / hours
+    cs.cornstover_tea.operating_days = operating_days
+    cs.cornstover_sys.simulate()
+    price_cornstover = (np.asarray(price_cornstover) * x_cornstover 
+                        + np.asarray(price_miscanthus) * (1 - x_cornstover))
+    batch = TEABatch(cs.cornstover_tea, (cs.cornstover, cs.ethanol))
+    scenarios = dict(
+        prices={cs.cornstover: price_cornstover, cs.ethanol: price_ethanol},
+        IRR=IRR, start_year=start_year, end_year=end_year,
+    )
+    NPV = batch.NPV(**scenarios)
+    full = lambda value: np.full(NPV.size, value)
+    unit_group = cs.AllAreas
+    return {
+        'MESP': batch.solve_price(cs.ethanol, **scenarios),
+        'MFPP': batch.solve_price(cs.cornstover, **scenarios),
+        'IRR': batch.solve_IRR(**scenarios),
+        'NPV': NPV,
+        'TCI': full(cs.cornstover_tea.TCI),
+        'VOC': full(batch.VOC(scenarios['prices'])),
+        'FOC': full(cs.cornstover_tea.FOC),
+        'Electricity consumption [MWhr/yr]': full(hours * unit_group.get_electricity_consumption()), 
+        'Electricity production [MWhr/yr]': full(hours * unit_group.get_electricity_production()),
+        'Production': full(cs.ethanol.F_mass * hours),
+    }
+
 # %% ABM Model object
 
 metrics = [
@@ -183,7 +268,10 @@ metrics = [
     bst.Metric('Production', lambda:operating_hours * cs.ethanol.F_mass, 'kg/yr')
 ]
 
-ABM_TEA_model = bst.Model(cs.cornstover_sys, metrics)
+# Only parameters that change mass and energy balances are 'coupled';
+# samples that only change prices, IRR, or duration reuse the last
+# converged system
+ABM_TEA_model = EconomicFastPathModel(cs.cornstover_sys, metrics)
 
 @ABM_TEA_model.parameter(element='Corn stover', units='USD/kg')
 def set_cornstover_price(price):
@@ -200,7 +288,7 @@ def set_ethanol_price(price):
     cs.ethanol.price = price
 
 operating_hours = cs.cornstover_tea.operating_days * 24
-@ABM_TEA_model.parameter(units='day/yr')
+@ABM_TEA_model.parameter(units='day/yr', kind='coupled')
 def set_operating_days(operating_days):
     global operating_hours
     cs.cornstover_tea.operating_days = operating_days
@@ -218,10 +306,138 @@ def set_start_year(start_year):
 def set_end_year(end_year):
     cs.cornstover_tea.duration = (cs.cornstover_tea.duration[0], end_year)
 
-@ABM_TEA_model.parameter(units='kg/yr')
+@ABM_TEA_model.parameter(units='kg/yr', kind='coupled')
 def set_plant_capacity(plant_capacity):
     cs.cornstover.F_mass = plant_capacity / operating_hours
 
-ABM_TEA_model.parameter(set_mixed_cornstover_miscanthus_feedstock,
-                        name='Corn stover fraction', units='by wt.')
+set_cornstover_fraction = ABM_TEA_model.parameter(
+    set_mixed_cornstover_miscanthus_feedstock,
+    name='Corn stover fraction', units='by wt.', kind='coupled'
+)
+
+
+# %% Surrogate model of ABM_TEA_function
+
+#: [dict] Bounds of ABM_TEA_function arguments sampled to fit surrogate models;
+#: the duration is given by the number of years of operation.
+surrogate_domain = {
+    'cornstover_fraction': (0., 1.),
+    'operating_days': (300., 360.),
+    'plant_capacity': (0.5 * 876072883.4242561, 2. * 876072883.4242561),
+    'price_cornstover': (0.03, 0.09),
+    'price_miscanthus': (0.05, 0.12),
+    'price_ethanol': (0.5, 1.2),
+    'IRR': (0.05, 0.20),
+    'years': (20, 40),
+}
+
+#: tuple[str] Arguments that change mass and energy balances.
+physical_arguments = ('cornstover_fraction', 'operating_days', 'plant_capacity')
+
+#: tuple[str] Keys of ABM_TEA_function results in the order of the model metrics.
+surrogate_outputs = ('MESP', 'MFPP', 'IRR', 'NPV', 'TCI', 'VOC', 'FOC',
+                     'Electricity consumption [MWhr/yr]', 
+                     'Electricity production [MWhr/yr]',
+                     'Production')
+
+def get_ABM_TEA_samples(arguments, start_year=2007.):
+    """
+    Return ABM_TEA_model samples (samples x parameters) from a dictionary
+    of surrogate arguments (1d arrays), with columns in the order of the 
+    model parameters.
+    
+    """
+    years = np.asarray(arguments['years'], dtype=float)
+    start_year = np.full(years.size, start_year)
+    values = {
+        set_cornstover_price: arguments['price_cornstover'],
+        set_miscanthus_price: arguments['price_miscanthus'],
+        set_ethanol_price: arguments['price_ethanol'],
+        set_operating_days: arguments['operating_days'],
+        set_IRR: arguments['IRR'],
+        set_start_year: start_year,
+        set_end_year: start_year + years,
+        set_plant_capacity: arguments['plant_capacity'],
+        set_cornstover_fraction: arguments['cornstover_fraction'],
+    }
+    return np.array([values[i] for i in ABM_TEA_model.get_parameters()], dtype=float).T
+
+def build_ABM_TEA_surrogate(file=None, N_physical=50, N_economic=40, degree=3,
+                            seed=3221, domain=None, min_R2=0.99):
+    """
+    Return a ResponseSurface object fitted to ABM_TEA_model results across
+    the surrogate domain, and save it to `file` if given. The system is
+    simulated once for each of the `N_physical` samples of physical
+    arguments, which are each evaluated at `N_economic` samples of prices,
+    IRR, and years of operation. A ValueError is raised if the coefficient
+    of determination of any output is less than `min_R2` (results remain
+    in the ABM_TEA_model table).
+    
+    """
+    domain = surrogate_domain if domain is None else domain
+    names = tuple(domain)
+    lower, upper = np.array([domain[i] for i in names], dtype=float).T
+    np.random.seed(seed)
+    N = N_physical * N_economic
+    X = lower + (upper - lower) * np.random.rand(N, len(names))
+    physical = [names.index(i) for i in physical_arguments]
+    X[:, physical] = np.repeat(X[:N_physical, physical], N_economic, axis=0)
+    years = names.index('years')
+    X[:, years] = np.round(X[:, years])
+    samples = get_ABM_TEA_samples(dict(zip(names, X.T)))
+    ABM_TEA_model.load_samples(samples)
+    ABM_TEA_model.evaluate()
+    Y = ABM_TEA_model.table[[i.index for i in ABM_TEA_model.metrics]].values
+    converged = ~np.isnan(Y).any(1)
+    surrogate = ResponseSurface.fit(X[converged], Y[converged], names, 
+                                    surrogate_outputs, degree, lower, upper,
+                                    min_R2)
+    if file: surrogate.save(file)
+    return surrogate
 
+def load_ABM_TEA_surrogate(surrogate):
+    """
+    Return a function with the same signature and results as ABM_TEA_function
+    that evaluates the surrogate model within its domain, and simulates the 
+    biorefinery otherwise.
+    
+    Parameters
+    ----------
+    surrogate : ResponseSurface or str
+        Surrogate model or the file it was saved to.
+    
+    """
+    if not isinstance(surrogate, ResponseSurface):
+        surrogate = ResponseSurface.load(surrogate)
+    inputs = surrogate.inputs
+    
+    def ABM_TEA_surrogate_function(
+            cornstover_fraction=1.0,
+            operating_days=350.4,
+            plant_capacity=876072883.4242561, 
+            price_cornstover=0.05159, 
+            price_miscanthus=0.08, 
+            price_ethanol=0.80,
+            IRR=0.10,
+            duration=(2007, 2037),
+        ):
+        arguments = dict(
+            cornstover_fraction=cornstover_fraction,
+            operating_days=operating_days,
+            plant_capacity=plant_capacity,
+            price_cornstover=price_cornstover,
+            price_miscanthus=price_miscanthus,
+            price_ethanol=price_ethanol,
+            IRR=IRR,
+            years=duration[1] - duration[0],
+        )
+        x = [arguments[i] for i in inputs]
+        if surrogate.in_domain(x):
+            return surrogate(x)
+        else:
+            del arguments['years']
+            return ABM_TEA_function(duration=duration, **arguments)
+    
+    ABM_TEA_surrogate_function.__doc__ = ABM_TEA_function.__doc__
+    ABM_TEA_surrogate_function.surrogate = surrogate
+    return ABM_TEA_surrogate_function
@@ -6,6 +6,7 @@ Created on Thu Dec 24 15:31:18 2020
 """
 import flexsolve as flx
 from biosteam.exceptions import InfeasibleRegion
+from biorefineries.utils import solve_with_local_model
 
 class TiterAndInhibitorSpecification:
     __slots__ = (
@@ -18,6 +19,7 @@ class TiterAndInhibitorSpecification:
         'inhibitors',
         'target_titer',
         'maximum_inhibitor_concentration',
+        'reduced_order',
     )
     
     max_sugar_concentration = 600 # g / L
@@ -26,7 +28,8 @@ class TiterAndInhibitorSpecification:
                  target_titer, product, products,
                  maximum_inhibitor_concentration=1.,
                  sugars= ('Glucose', 'Xylose'),
-                 inhibitors = ('AceticAcid', 'HMF', 'Furfural')):
+                 inhibitors = ('AceticAcid', 'HMF', 'Furfural'),
+                 reduced_order=True):
         self.evaporator = evaporator
         self.mixer = mixer
         self.reactor = reactor
@@ -36,6 +39,7 @@ class TiterAndInhibitorSpecification:
         self.inhibitors = inhibitors
         self.target_titer = target_titer
         self.maximum_inhibitor_concentration = maximum_inhibitor_concentration
+        self.reduced_order = reduced_order
         
     @property
     def feed(self):
@@ -64,7 +68,7 @@ class TiterAndInhibitorSpecification:
     
     def calculate_sugar_concentration(self): # g / L
         s = self.evaporated_sugar_solution
-        return s.imass[sugars].sum() / s.F_vol 
+        return s.imass[self.sugars].sum() / s.F_vol 
     
     def check_sugar_concentration(self):
         if self.calculate_sugar_concentration() > self.max_sugar_concentration:
@@ -89,8 +93,17 @@ class TiterAndInhibitorSpecification:
         x_titer = self.calculate_titer()
         V_min = 1e-6 
         if x_titer < self.target_titer: # Evaporate
-            self.evaporator.V = V_min = flx.IQ_interpolation(self.titer_objective_function,
-                                                             V_min, 1., ytol=1e-4, maxiter=100) 
+            if self.reduced_order:
+                # Assume evaporated water is proportional to volume removed
+                V_guess = 1. - x_titer / self.target_titer
+                self.evaporator.V = V_min = solve_with_local_model(
+                    self.titer_objective_function, self.target_titer,
+                    0., x_titer - self.target_titer, V_guess, V_min, 1.,
+                    ytol=1e-4, reciprocal=True, fallback_maxiter=100,
+                )
+            else:
+                self.evaporator.V = V_min = flx.IQ_interpolation(self.titer_objective_function,
+                                                                 V_min, 1., ytol=1e-4, maxiter=100) 
         elif x_titer > self.target_titer: # Dilute
             self.update_dilution_water(x_titer)
             self.mixer._run()
@@ -99,18 +112,27 @@ class TiterAndInhibitorSpecification:
         self.check_sugar_concentration()
         x_inhibitor = self.calculate_inhibitors()
         if x_inhibitor > self.maximum_inhibitor_concentration:
-            self.evaporator.V = flx.IQ_interpolation(self.inhibitor_objective_function,
-                                                     V_min, 1., ytol=1e-4, maxiter=100) 
+            if self.reduced_order:
+                obj_f = self.inhibitor_objective_function
+                self.evaporator.V = solve_with_local_model(
+                    obj_f, self.maximum_inhibitor_concentration,
+                    V_min, obj_f(V_min), 0.5 * (V_min + 1.), V_min, 1.,
+                    ytol=1e-4, reciprocal=False, fallback_maxiter=100,
+                )
+            else:
+                self.evaporator.V = flx.IQ_interpolation(self.inhibitor_objective_function,
+                                                         V_min, 1., ytol=1e-4, maxiter=100) 
         else:
             self.check_sugar_concentration()
     
     def update_dilution_water(self, x_titer=None):
         if x_titer is None: x_titer = self.calculate_titer()
         water = self.water_required_to_dilute_to_set_titer(x_titer)
+        product = self.product
         molar_volume = product.chemicals.Water.V(product.T, 101325) # m3 / mol
         self.dilution_water.imol['Water'] += water / molar_volume / 1000
         
     def water_required_to_dilute_to_set_titer(self, x_titer):
-        return (1./x_titer - 1./self.target_titer) * self.product.imass[self.products].sum()
+        return (1./self.target_titer - 1./x_titer) * self.product.imass[self.products].sum()
       
         
\ No newline at end of file
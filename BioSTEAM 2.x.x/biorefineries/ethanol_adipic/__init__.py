@@ -14,6 +14,7 @@
 
 
 import biosteam as bst
+from .. import PY37
 bst.speed_up()
 
 from . import (
@@ -44,7 +45,7 @@ def load_system(system_kind='acid', depot_kind='HMPP'):
 
     global flowsheet, groups, teas, funcs, biorefinery, tea
     
-    depot_dct = systems.depot_dct[depot_kind]
+    depot_dct = systems.get_depot(depot_kind)
     create_sys = getattr(systems, f'create_{system_kind}_biorefinery')
     
     flowsheet, groups, teas, funcs = create_sys(depot_dct['preprocessed'])
@@ -64,7 +65,13 @@ load_system('acid', 'HMPP')
 # Simulate system and get results
 # =============================================================================
 
-feedstock_GWPs = systems.feedstock_GWPs
+# Depot GWPs require all depot systems, so they are only created when needed
+if PY37:
+    def __getattr__(name):
+        if name == 'feedstock_GWPs': return systems.feedstock_GWPs
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+else:
+    feedstock_GWPs = systems.feedstock_GWPs
 
 def simulate_and_print(depot_for_GWP=None):
     system_kind = flowsheet.ID
@@ -76,7 +83,7 @@ def simulate_and_print(depot_for_GWP=None):
     print(f'GWP: {funcs["get_GWP"]():.3f} kg CO2-eq/gal ethanol without feedstock')
     if depot_for_GWP:
         GWP = funcs['get_GWP']()
-        GWP = funcs['get_GWP']() + (feedstock_GWPs[depot_for_GWP]*s.feedstock.F_mass) \
+        GWP = funcs['get_GWP']() + (systems.feedstock_GWPs[depot_for_GWP]*s.feedstock.F_mass) \
             / (s.ethanol.F_mass/systems._ethanol_kg_2_gal)
         print(f'GWP: {GWP:.3f} kg CO2-eq/gal ethanol with feedstock')
     print('--------------------------------------')
@@ -29,6 +29,7 @@ References
 '''
 
 import biosteam as bst
+from biorefineries import PY37
 from biorefineries.ethanol_adipic._chemicals import chems
 from biorefineries.ethanol_adipic._utils import _kg_per_ton, _ethanol_kg_2_gal
 from biorefineries.ethanol_adipic._settings import set_feedstock_price, \
@@ -54,39 +55,43 @@ bst.CE = 541.7 # year 2016
 # Different depot systems
 # =============================================================================
 
+#: tuple[str] Kinds of depot systems.
+depot_kinds = ('CPP', 'CPP_AFEX', 'HMPP', 'HMPP_AFEX')
+
+#: dict[str, dict] Flowsheet, cost, and preprocessed stream of the depot 
+#: systems created so far, by kind (use `get_depot` to create on demand).
 depot_dct = {}
 
-CPP_flowsheet, CPP_cost = create_preprocessing_process(kind='CPP', with_AFEX=False)
-CPP_preprocessed = CPP_flowsheet.stream.preprocessed
-depot_dct['CPP'] = {
-    'flowsheet': CPP_flowsheet,
-    'cost': CPP_cost,
-    'preprocessed': CPP_preprocessed,
-    }
-
-CPP_AFEX_flowsheet, CPP_AFEX_cost = create_preprocessing_process(kind='CPP', with_AFEX=True)
-CPP_AFEX_preprocessed = CPP_AFEX_flowsheet.stream.preprocessed
-depot_dct['CPP_AFEX'] = {
-    'flowsheet': CPP_AFEX_flowsheet,
-    'cost': CPP_AFEX_cost,
-    'preprocessed': CPP_AFEX_preprocessed,
-    }
-
-HMPP_flowsheet, HMPP_cost = create_preprocessing_process(kind='HMPP', with_AFEX=False)
-HMPP_preprocessed = HMPP_flowsheet.stream.preprocessed
-depot_dct['HMPP'] = {
-    'flowsheet': HMPP_flowsheet,
-    'cost': HMPP_cost,
-    'preprocessed': HMPP_preprocessed,
-    }
-
-HMPP_AFEX_flowsheet, HMPP_AFEX_cost = create_preprocessing_process(kind='HMPP', with_AFEX=True)
-HMPP_AFEX_preprocessed = HMPP_AFEX_flowsheet.stream.preprocessed
-depot_dct['HMPP_AFEX'] = {
-    'flowsheet': HMPP_AFEX_flowsheet,
-    'cost': HMPP_AFEX_cost,
-    'preprocessed': HMPP_AFEX_preprocessed,
-    }
+def get_depot(kind):
+    """
+    Return a dictionary with the flowsheet, cost, and preprocessed stream
+    of the depot system, which is created (and simulated) on first access.
+    
+    """
+    if kind in depot_dct: return depot_dct[kind]
+    if kind not in depot_kinds:
+        raise ValueError(f'depot kind can only be "CPP", "CPP_AFEX", "HMPP", '
+                         f'or "HMPP_AFEX", not {kind}.')
+    # Depots may be created after a biorefinery, so keep its flowsheet
+    main_flowsheet = bst.main_flowsheet.get_flowsheet()
+    thermo = bst.settings.get_thermo()
+    try:
+        flowsheet, cost = create_preprocessing_process(kind=kind.split('_')[0],
+                                                       with_AFEX=kind.endswith('AFEX'))
+    finally:
+        bst.main_flowsheet.set_flowsheet(main_flowsheet)
+        bst.settings.set_thermo(thermo)
+    preprocessed = flowsheet.stream.preprocessed
+    dct = globals()
+    dct[f'{kind}_flowsheet'] = flowsheet
+    dct[f'{kind}_cost'] = cost
+    dct[f'{kind}_preprocessed'] = preprocessed
+    depot_dct[kind] = depot = {
+        'flowsheet': flowsheet,
+        'cost': cost,
+        'preprocessed': preprocessed,
+        }
+    return depot
 
 
 def get_preprocessing_GWP():
@@ -95,12 +100,13 @@ def get_preprocessing_GWP():
     NH3_CF = CFs['GWP_CFs']['NH3']
     CH4_CF = CFs['GWP_CFs']['CH4']
     e_rates = {}
-    for depot, dct in depot_dct.items():
+    for depot in depot_kinds:
+        dct = get_depot(depot)
         sys = dct['flowsheet'].system.prep_sys
         e_rates[depot] = \
             sum(i.power_utility.rate for i in sys.units)/dct['preprocessed'].F_mass
     # Add electricity
-    for depot in depot_dct.keys():
+    for depot in depot_kinds:
         # 69.27 kg CO2-eq/U.S. ton from ref [3] for HMPP
         GWPs[depot] =  69.27/_kg_per_ton + (e_rates[depot]-e_rates['HMPP'])*e_CF
     for depot in ('CPP_AFEX', 'HMPP_AFEX'):
@@ -110,7 +116,21 @@ def get_preprocessing_GWP():
         GWPs[depot] += dct['flowsheet'].stream.natural_gas.F_mass*CH4_CF/feedstock_mass
     return GWPs
 
-feedstock_GWPs = get_preprocessing_GWP()
+# Depot systems and their GWPs are only created when first accessed (PEP 562)
+# as each configuration of the biorefinery only needs one depot
+if PY37:
+    def __getattr__(name):
+        global feedstock_GWPs
+        if name == 'feedstock_GWPs':
+            feedstock_GWPs = get_preprocessing_GWP()
+            return feedstock_GWPs
+        for kind in depot_kinds:
+            if name in (f'{kind}_flowsheet', f'{kind}_cost', f'{kind}_preprocessed'):
+                get_depot(kind)
+                return globals()[name]
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+else:
+    feedstock_GWPs = get_preprocessing_GWP()
 
 # # If want to use the default preprocessing price ($24.35/Mg)
 # set_feedstock_price(feedstock)
@@ -11,10 +11,14 @@ import os
 import thermosteam as tmo
 
 __all__ = ('create_chemicals',)
+
+chemical_data_path = os.path.join(os.path.dirname(__file__), 'chemicals.yaml') 
+
+#: tuple[str] Files with chemical definitions (cached chemicals are
+#: created again when any of these change).
+definition_files = (__file__, chemical_data_path)
     
 def create_chemicals():
     """Create chemicals for the production of fatty alcohols."""
-    filepath = os.path.dirname(__file__)
-    chemical_data_path = os.path.join(filepath, 'chemicals.yaml') 
     chemical_data = tmo.ThermoData.from_yaml(chemical_data_path)
     return chemical_data.create_chemicals()
\ No newline at end of file
@@ -13,7 +13,9 @@ __all__ = ('create_system',)
 
 def create_system(ID='fattyalcohol_sys'):
     import biorefineries.fattyalcohols as fa
-    chemicals = fa.create_chemicals()
+    from biorefineries.fattyalcohols import _chemicals
+    from biorefineries.utils import load_chemicals
+    chemicals = load_chemicals(_chemicals.create_chemicals, _chemicals.definition_files)
     bst.settings.set_thermo(chemicals)
     fattyalcohol_production_sys = fa.create_fattyalcohol_production_sys()
     # TODO: Add separation system
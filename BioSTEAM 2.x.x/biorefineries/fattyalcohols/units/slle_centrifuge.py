@@ -47,11 +47,15 @@ class SLLECentrifuge(bst.Unit):
         
         #: Moisture content of retentate
         self.moisture_content = moisture_content
+        
+        #: [LLEService] Liquid-liquid equilibrium reusing the last phase split.
+        from biorefineries.utils.lle_service import LLEService
+        self.lle_service = LLEService(self.ID)
         assert self._solids_isplit['7732-18-5'] == 0, 'cannot define water split, only moisture content'
 
     def _run(self):
         top, bottom, solids = self.outs
-        sep.lle(self.ins[0], top, bottom, self.top_chemical, self.efficiency)
+        self.lle_service.lle(self.ins[0], top, bottom, self.top_chemical, self.efficiency)
         sep.split(bottom, solids, bottom, self.solids_split)
         sep.adjust_moisture_content(solids, bottom, self.moisture_content)
 
@@ -60,7 +60,6 @@ Processes:
 # %% Setup
 
 import biosteam as bst
-from flexsolve import aitken_secant, IQ_interpolation
 from biosteam import Stream, System
 from biosteam.process_tools import UnitGroup
 from biorefineries.lactic import _units as units
@@ -71,6 +70,7 @@ from biorefineries.lactic._utils import baseline_feedflow, _kg_per_ton, set_yiel
 from biorefineries.lactic._chemicals import chems, sugars, soluble_organics, \
     solubles, insolubles, COD_chemicals, combustibles
 from biorefineries.lactic._tea import LacticTEA
+from biorefineries.utils import MaterialLCA, WarmStartSolver
 from biorefineries import BST222
 
 __all__ = (
@@ -266,23 +266,24 @@ def create_SSCF_conversion_process(flowsheet, groups, feed):
         seed_recycle._run()
         return R301.effluent_titer-R301.target_titer
     
+    # Start from the last solution, which moves little between simulations
+    water_solver = WarmStartSolver(titer_at_water, x_min=0, x_max=1e10,
+                                   xtol=0.1, ytol=0.01, maxiter=50, checkbounds=False)
+    yield_solver = WarmStartSolver(titer_at_yield, x_min=0, x_max=1,
+                                   xtol=0.001, ytol=0.01, maxiter=50, checkbounds=False)
+    
     def adjust_R301_water():
         water_R301.empty()
         set_yield(R301.target_yield, R301, R302)
         seed_recycle._run()
         if R301.effluent_titer > R301.target_titer:
             if R301.allow_dilution:
-                water_R301.imass['Water'] = IQ_interpolation(
-                    f=titer_at_water, x0=0, x1=1e10,
-                    xtol=0.1, ytol=0.01, maxiter=50,
-                    args=(), checkbounds=False)
+                water_R301.imass['Water'] = water_solver.solve()
             else:
-                lactic_yield = IQ_interpolation(
-                    f=titer_at_yield, x0=0, x1=R301.target_yield,
-                    xtol=0.001, ytol=0.01, maxiter=50,
-                    args=(), checkbounds=False)
+                lactic_yield = yield_solver.solve(x_max=R301.target_yield)
                 set_yield(lactic_yield, R301, R302)
             seed_recycle._run()
+    adjust_R301_water.solvers = (water_solver, yield_solver)
     
     PS301 = bst.units.ProcessSpecification('PS301', ins=R301-0,
                                             specification=adjust_R301_water)
@@ -426,6 +427,18 @@ def create_SHF_conversion_process(flowsheet, groups, feed,
         # highest from collected papers)
         return sugar_conc-220
     
+    # Start from the last solution, which moves little between simulations
+    equip_max_V_solver = WarmStartSolver(get_max_V, x_min=0, x_max=1,
+                                         xtol=0.001, ytol=0.1, maxiter=50, checkbounds=False)
+    microbe_max_V_solver = WarmStartSolver(sugar_at_V, x_min=0, x_max=1,
+                                           xtol=0.001, ytol=0.1, maxiter=50, checkbounds=False)
+    V_solver = WarmStartSolver(titer_at_V, x_min=0, x_max=1,
+                               xtol=0.001, ytol=0.1, maxiter=50, checkbounds=False)
+    water_solver = WarmStartSolver(titer_at_water, x_min=0, x_max=1e10,
+                                   xtol=0.1, ytol=0.01, maxiter=50, checkbounds=False)
+    yield_solver = WarmStartSolver(titer_at_yield, x_min=0, x_max=1,
+                                   xtol=0.001, ytol=0.01, maxiter=50, checkbounds=False)
+    
     def adjust_ferm_loop():
         water_R301.empty()
         #!!! This can be upadted using newer biosteam
@@ -436,29 +449,19 @@ def create_SHF_conversion_process(flowsheet, groups, feed,
         ferm_loop._run()
         if R301.effluent_titer < R301.target_titer:
             if R301.allow_concentration:
-                equip_max_V = IQ_interpolation(f=get_max_V, x0=0, x1=1,
-                                               xtol=0.001, ytol=0.1, maxiter=50, 
-                                               args=(), checkbounds=False)
-                microbe_max_V = IQ_interpolation(f=sugar_at_V, x0=0, x1=equip_max_V,
-                                                 xtol=0.001, ytol=0.1, maxiter=50, 
-                                                 args=(), checkbounds=False)
-                E301.V = IQ_interpolation(f=titer_at_V, x0=0, x1=microbe_max_V,
-                                          xtol=0.001, ytol=0.1, maxiter=50, 
-                                          args=(), checkbounds=False)
+                equip_max_V = equip_max_V_solver.solve()
+                microbe_max_V = microbe_max_V_solver.solve(x_max=equip_max_V)
+                E301.V = V_solver.solve(x_max=microbe_max_V)
                 
         elif R301.effluent_titer > R301.target_titer:
             if R301.allow_dilution:
-                water_R301.imass['Water'] = IQ_interpolation(
-                    f=titer_at_water, x0=0, x1=1e10,
-                    xtol=0.1, ytol=0.01, maxiter=50,
-                    args=(), checkbounds=False)
+                water_R301.imass['Water'] = water_solver.solve()
             else:
-                lactic_yield = IQ_interpolation(
-                    f=titer_at_yield, x0=0, x1=R301.target_yield,
-                    xtol=0.001, ytol=0.01, maxiter=50,
-                    args=(), checkbounds=False)
+                lactic_yield = yield_solver.solve(x_max=R301.target_yield)
                 set_yield(lactic_yield, R301, R302)
             seed_recycle._run()
+    adjust_ferm_loop.solvers = (equip_max_V_solver, microbe_max_V_solver,
+                                V_solver, water_solver, yield_solver)
             
     PS301 = bst.units.ProcessSpecification('PS301', ins=R301_P1-0,
                                             specification=adjust_ferm_loop)
@@ -644,15 +647,18 @@ def create_separation_process(flowsheet, groups, feed, insolubles=insolubles,
         purity = F402.outs[1].get_mass_composition('LacticAcid')
         return purity-0.88
     
+    # Start from the last solution, which moves little between simulations
+    F402_V_solver = WarmStartSolver(purity_at_V, x_min=0.001, x_max=0.999,
+                                    xtol=0.001, ytol=0.001, maxiter=50, checkbounds=False)
+    
     def adjust_F402_V():
         H2O_molfrac = D404_P.outs[0].get_molar_composition('H2O')
         V0 = H2O_molfrac
-        F402.V = aitken_secant(f=purity_at_V, x0=V0, x1=V0+0.001,
-                               xtol=0.001, ytol=0.001, maxiter=50,
-                               args=())
-        # F402.V = IQ_interpolation(f=purity_at_V, x0=0.001, x1=0.999,
-        #                           xtol=0.001, ytol=0.001, maxiter=50,
-        #                           args=(), checkbounds=False)
+        # F402.V = aitken_secant(f=purity_at_V, x0=V0, x1=V0+0.001,
+        #                        xtol=0.001, ytol=0.001, maxiter=50,
+        #                        args=())
+        F402.V = F402_V_solver.solve(x=V0)
+    adjust_F402_V.solvers = (F402_V_solver,)
     F402.specification = adjust_F402_V
     
     F402_H1 = bst.units.HXutility('F402_H1', ins=F402-0, outs=3-R403, V=0, rigorous=True)
@@ -989,21 +995,21 @@ def create_lactic_sys(flowsheet, groups, get_flow_tpd):
     def simulate_get_MPSP():
         s.lactic_acid.price = 0
         lactic_sys.simulate()
-        for i in range(3):
-            MPSP = s.lactic_acid.price = lactic_tea.solve_price(s.lactic_acid)
+        MPSP = lactic_tea.solve_MPSP(s.lactic_acid)
         return MPSP
     funcs = {'simulate_get_MPSP': simulate_get_MPSP}
     
     ######################## LCA ########################
     # 100-year global warming potential (GWP) from material flows
     LCA_streams = TEA_feeds.copy()
-    LCA_stream = Stream('LCA_stream', units='kg/hr')
+    # Characterization factors are precomputed as vectors; GWP and FEC
+    # are computed from the flow rates of LCA_streams at once
+    material_LCA = MaterialLCA(LCA_streams, {'GWP': CFs['GWP_CF_stream'],
+                                             'FEC': CFs['FEC_CF_stream']})
+    funcs['material_LCA'] = material_LCA
         
     def get_material_GWP():
-        LCA_stream.mass = sum(i.mass for i in LCA_streams)
-        chemical_GWP = LCA_stream.mass*CFs['GWP_CF_stream'].mass
-        # feedstock_GWP = s.feedstock.F_mass*CFs['GWP_CFs']['Corn stover']
-        return chemical_GWP.sum()/s.lactic_acid.F_mass
+        return material_LCA.get_impact('GWP')/s.lactic_acid.F_mass
     funcs['get_material_GWP'] = get_material_GWP
     
     # GWP from onsite emission (e.g., combustion) of non-biogenic carbons
@@ -1028,10 +1034,7 @@ def create_lactic_sys(flowsheet, groups, get_flow_tpd):
     
     # Fossil energy consumption (FEC) from materials
     def get_material_FEC():
-        LCA_stream.mass = sum(i.mass for i in LCA_streams)
-        chemical_FEC = LCA_stream.mass*CFs['FEC_CF_stream'].mass
-        # feedstock_FEC = feedstock.F_mass*CFs['FEC_CFs']['Corn stover']
-        return chemical_FEC.sum()/s.lactic_acid.F_mass
+        return material_LCA.get_impact('FEC')/s.lactic_acid.F_mass
     funcs['get_material_FEC'] = get_material_FEC
     
     # FEC from electricity
@@ -13,6 +13,7 @@
 
 # %%
 
+import flexsolve as flx
 from biorefineries.cornstover import CellulosicEthanolTEA
 
 __all__ = ('LacticTEA',)
@@ -23,6 +24,40 @@ class LacticTEA(CellulosicEthanolTEA):
     
     # For uncertainty analysis
     _TCI_ratio_cached = 1
+    
+    #: [int] Number of TEA evaluations used in the last `solve_MPSP` call
+    MPSP_evaluations = 0
+    
+    def solve_MPSP(self, stream, ytol=100., xtol=1e-6, maxiter=50):
+        '''
+        Return the minimum product selling price [$/kg] of the stream
+        (i.e., the price at NPV = 0) and set it as the price of the stream.
+        
+        The price from `solve_price` is checked against the NPV of the
+        cash flow with that price included in the sales, and only refined
+        with a secant search on the price when the NPV is off by more
+        than `ytol` [$]. The number of TEA evaluations (i.e., `solve_price`
+        and NPV calculations) is stored in `MPSP_evaluations`.
+        '''
+        evaluations = 1
+        price = stream.price = self.solve_price(stream)
+        
+        def NPV_at_price(price):
+            nonlocal evaluations
+            evaluations += 1
+            stream.price = price
+            return self.NPV
+        
+        try:
+            NPV = NPV_at_price(price)
+            if abs(NPV) > ytol:
+                price = flx.aitken_secant(NPV_at_price, price, 1.001*price+1e-6,
+                                          xtol=xtol, ytol=ytol, maxiter=maxiter,
+                                          checkiter=False)
+                stream.price = price
+        finally:
+            self.MPSP_evaluations = evaluations
+        return price
 
 
 
@@ -41,7 +41,7 @@ References
 import numpy as np
 import thermosteam as tmo
 from math import exp, pi, ceil
-from flexsolve import aitken_secant
+from scipy.integrate import solve_ivp
 from biosteam import Stream, Unit
 from biosteam.exceptions import DesignError
 from biosteam.units import Flash, HXutility, Mixer, MixTank, Pump, \
@@ -50,6 +50,7 @@ from biosteam.units.design_tools import PressureVessel
 from biosteam.units.design_tools import pressure_vessel_material_factors as factors
 from biosteam.units.decorators import cost
 from thermosteam import separations
+from biorefineries.utils import SteamInjector
 from biorefineries.lactic._settings import price, auom
 from biorefineries.lactic._chemicals import sugars, COD_chemicals, solubles, insolubles
 from biorefineries.lactic._utils import CEPCI, baseline_feedflow, compute_lactic_titer, \
@@ -152,32 +153,12 @@ class PretreatmentMixer(Mixer):
         mixture_out.mix_from([mixture, water])
 
 # Mix steams for pretreatment reactor heating
-class SteamMixer(Unit):
+class SteamMixer(SteamInjector):
     _N_ins = 2
     _N_outs = 1
     
     def __init__(self, ID='', ins=None, outs=(), *, P):
-        Unit.__init__(self, ID, ins, outs)
-        self.P = P
-        
-    @staticmethod
-    def P_at_flow(mol_water, P, steam, mixed, feed):
-        steam.imol['Water'] = mol_water
-        mixed.mol = steam.mol + feed.mol
-        mixed.H = feed.H + steam.H
-        P_new = mixed.chemicals.Water.Psat(mixed.T)
-        return P_new-P
-    
-    def _run(self):
-        feed, steam = self.ins
-        mixed = self.outs[0]
-
-        steam_mol = steam.F_mol
-        steam_mol = aitken_secant(f=self.P_at_flow,
-                                  x0=steam_mol, x1=steam_mol+0.1, 
-                                  xtol=1e-4, ytol=1e-4,
-                                  args=(self.P, steam, mixed, feed))
-        mixed.P = self.P
+        SteamInjector.__init__(self, ID, ins, outs, P=P)
 
 @cost(basis='Dry flow rate', ID='Pretreatment reactor', units='kg/hr',
       kW=5120, cost=19812400, S=83333, CE=CEPCI[2009], n=0.6, BM=1.5)
@@ -1208,6 +1189,11 @@ class Esterification(Reactor):
         Ethanol feed to total acid molar ratio.
     T : float
         Operating temperature (K).
+    integrator : str
+        Method to integrate the esterification kinetics when X1 and tau
+        are not given. 'Euler' steps the rate law at fixed time steps of
+        1 min. Other methods (e.g., 'LSODA', 'BDF', 'Radau') are passed as
+        the `method` of scipy.integrate.solve_ivp. Defaults to 'Euler'.
     """
     _N_ins = 5
     _N_outs = 2
@@ -1227,19 +1213,26 @@ class Esterification(Reactor):
     reactives = ('LacticAcid', 'Ethanol', 'H2O', 'EthylLactate',
                  'AceticAcid', 'EthylAcetate', 'SuccinicAcid', 'EthylSuccinate')
     
+    _kinetic_model = None
+    
+    #: [tuple] Residence time [hr] and lactic acid conversion arrays
+    #: from the last kinetic integration
+    trajectory = None
+    
     def __init__(self, ID='', ins=None, outs=(), thermo=None, *, 
                  T=351.15, P=101325, tau=None, tau_max=15, 
                  V_wf=0.8, length_to_diameter=2, mixing_intensity=None, kW_per_m3=1.97,
                  X1=None, X2=None, assumeX2equalsX1=True, allow_higher_T=False,
                  wall_thickness_factor=1,
                  vessel_material='Stainless steel 316',
-                 vessel_type='Vertical'):
+                 vessel_type='Vertical', integrator='Euler'):
         
         Unit.__init__(self, ID, ins, outs)
         
         self.T = T
         self.P = P
         self.tau_max = tau_max
+        self.integrator = integrator
         self.V_wf = V_wf
         self.length_to_diameter = length_to_diameter
         self.mixing_intensity = mixing_intensity
@@ -1259,65 +1252,135 @@ class Esterification(Reactor):
         KEt = self.KEt = 1.22 * exp(359.63/T)
         return K, kc, KW, KEt
     
-    def compute_r(self, flow, reactives, T):
-        lle_chemicals = self.chemicals.lle_chemicals
+    def _get_kinetic_model(self):
+        # Reuse one activity-coefficient model and the index arrays
+        # for as long as the chemicals stay the same
+        chemicals = self.chemicals
+        cache = self._kinetic_model
+        if cache and cache[0] is chemicals: return cache[1:]
+        lle_chemicals = chemicals.lle_chemicals
         lle_IDs = tuple([i.ID for i in lle_chemicals])
         f_gamma = tmo.equilibrium.DortmundActivityCoefficients(lle_chemicals)
-        gammas = f_gamma(flow.get_normalized_mol(lle_IDs), T)
-        gammas_reactives = np.array([gammas[lle_IDs.index(ID)] 
-                                     for ID in reactives])
-        normalized_mol = flow.get_normalized_mol(lle_IDs)
-        curr_conc = np.array([normalized_mol[lle_IDs.index(ID)] 
-                              for ID in reactives])
-        activities = gammas_reactives * curr_conc
+        lle_index = np.array(chemicals.get_index(lle_IDs), dtype=int)
+        reactive_index = np.array([lle_IDs.index(ID) for ID in self.reactives[0:4]])
+        self._kinetic_model = (chemicals, f_gamma, lle_IDs, lle_index, reactive_index)
+        return f_gamma, lle_IDs, lle_index, reactive_index
+    
+    def _compute_r(self, lle_mol, reactive_index, T):
+        # r is in mol g-1 min-1
+        f_gamma = self._kinetic_model[1]
+        x = lle_mol / lle_mol.sum()
+        gammas = f_gamma(x, T)
+        activities = gammas[reactive_index] * x[reactive_index]
         r_numerator = self.kc * (activities[1]*activities[0]-
                                  (activities[3]*activities[2]/self.K))
         r_denominator = (1+self.KEt*activities[3]+self.KW*activities[2])**2
-        r = r_numerator / r_denominator
-        return r
+        return r_numerator / r_denominator
+    
+    def compute_r(self, flow, reactives, T):
+        f_gamma, lle_IDs, lle_index, reactive_index = self._get_kinetic_model()
+        if tuple(reactives) != self.reactives[0:4]:
+            reactive_index = np.array([lle_IDs.index(ID) for ID in reactives])
+        return self._compute_r(flow.mol[lle_index], reactive_index, T)
 
     def compute_X1_and_tau(self, mixed_stream, time_step):
         T = self.T
         cat_load = self.cat_load
-        reactives = self.reactives[0:4]
-        compute_r = self.compute_r
         time_max = self.tau_max * 60 # tau_max in hr
         K, kc, KW, KEt = self.compute_coefficients(T)
-        
-        temp_flow = mixed_stream.copy()
-        self.mcat = mcat = cat_load * temp_flow.F_mass
-        r = compute_r(temp_flow, reactives, T)
+        f_gamma, lle_IDs, lle_index, reactive_index = self._get_kinetic_model()
+        
+        self.mcat = mcat = cat_load * mixed_stream.F_mass
+        lle_mol = mixed_stream.mol[lle_index].astype(float)
+        LA_initial = lle_mol[reactive_index[0]]
+        # Stoichiometry of LA + ethanol -> water + EtLA
+        nu = np.zeros_like(lle_mol)
+        nu[reactive_index] = (-1., -1., 1., 1.)
+        
+        if self.integrator == 'Euler':
+            time, X = self._integrate_Euler(lle_mol, nu, reactive_index, T,
+                                            mcat, LA_initial, time_step, time_max)
+        else:
+            time, X = self._integrate_adaptive(lle_mol, nu, reactive_index, T,
+                                               mcat, LA_initial, time_step, time_max)
+        # Conversion-time profile, with time in hr
+        self.trajectory = (time / 60, X)
+        X1 = X[-1]
+        tau = time[-1] / 60 # convert min to hr
+        return X1, tau
+    
+    def _integrate_Euler(self, lle_mol, nu, reactive_index, T, mcat,
+                         LA_initial, time_step, time_max):
+        compute_r = self._compute_r
+        iLA, iEt = reactive_index[0:2]
+        mol = lle_mol.copy()
+        r = compute_r(mol, reactive_index, T)
         dX = r * time_step * mcat / 1000 # r is in mol g-1 min-1
         
-        curr_flow = temp_flow.get_flow('kmol/hr', reactives)
-        new_flows = [1, 1, 1, 1]
-        LA_initial = temp_flow.imol['LacticAcid']
-        
         tau_min = time_step # tau in min
-        while dX/LA_initial>1e-4:            
-            if curr_flow[0]<dX or curr_flow[1]<dX:
-                dX = min(curr_flow[0], curr_flow[1])
-                
-            new_flows = [curr_flow[0]-dX, # LA
-                         curr_flow[1]-dX, # ethanol
-                         curr_flow[2]+dX, # water
-                         curr_flow[3]+dX] # EtLA
+        times = [0.]
+        converted = [0.]
+        while dX/LA_initial>1e-4:
+            if mol[iLA]<dX or mol[iEt]<dX:
+                dX = min(mol[iLA], mol[iEt])
             
-            temp_flow.set_flow(new_flows, 'kmol/hr', reactives)
+            mol += nu * dX
+            times.append(tau_min)
+            converted.append(LA_initial - mol[iLA])
             
             # Zhao et al. 2008 reported 96% conversion of NH4LA -> BuLA in 6h
-            if new_flows[0]<=0 or new_flows[1]<=0 or tau_min>time_max-time_step: 
+            if mol[iLA]<=0 or mol[iEt]<=0 or tau_min>time_max-time_step: 
                 break
 
-            r = compute_r(temp_flow, reactives, T)
+            r = compute_r(mol, reactive_index, T)
             dX = r * time_step * mcat / 1000  # r is in mol g-1 min-1
-            curr_flow = temp_flow.get_flow('kmol/hr', reactives)
             tau_min += time_step
         
-        LA_in_feeds = mixed_stream.imol['LacticAcid']
-        X1 = (LA_in_feeds-temp_flow.imol['LacticAcid']) / LA_in_feeds
-        tau = tau_min / 60 # convert min to hr
-        return X1, tau
+        if tau_min > times[-1]:
+            times.append(tau_min)
+            converted.append(converted[-1])
+        return np.array(times), np.array(converted) / LA_initial
+    
+    def _integrate_adaptive(self, lle_mol, nu, reactive_index, T, mcat,
+                            LA_initial, time_step, time_max):
+        compute_r = self._compute_r
+        iLA, iEt = reactive_index[0:2]
+        factor = mcat / 1000
+        
+        def dxi_dt(t, xi): # xi is the extent of reaction [kmol/hr]
+            mol = lle_mol + nu * xi[0]
+            if mol[iLA] <= 0 or mol[iEt] <= 0: return (0.,)
+            return (compute_r(mol, reactive_index, T) * factor,)
+        
+        # Same stopping criteria as the Euler loop: the conversion in one
+        # time step falls below 1e-4 of the initial lactic acid or a
+        # reactant runs out
+        min_rate = 1e-4 / time_step
+        def slow_rate(t, xi): return dxi_dt(t, xi)[0] / LA_initial - min_rate
+        slow_rate.terminal = True
+        slow_rate.direction = -1
+        
+        def exhausted(t, xi): return min(lle_mol[iLA], lle_mol[iEt]) - xi[0]
+        exhausted.terminal = True
+        
+        if slow_rate(0., (0.,)) <= 0.:
+            # No reaction; report one time step as the Euler loop does
+            return np.array([0., time_step]), np.zeros(2)
+        
+        sol = solve_ivp(dxi_dt, (0., time_max), (0.,), method=self.integrator,
+                        events=(slow_rate, exhausted), rtol=1e-6, atol=1e-9*LA_initial)
+        if not sol.success:
+            raise RuntimeError(f'{repr(self)} kinetic integration failed: {sol.message}')
+        xi = np.clip(sol.y[0], 0., min(lle_mol[iLA], lle_mol[iEt]))
+        return sol.t, xi / LA_initial
+    
+    def X1_at(self, tau):
+        """
+        Return the lactic acid conversion at residence time `tau` [hr]
+        interpolated from the last computed conversion-time trajectory.
+        """
+        time, X = self.trajectory
+        return np.interp(tau, time, X)
 
     @property
     def tau(self):
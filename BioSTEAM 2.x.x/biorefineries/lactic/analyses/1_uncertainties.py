@@ -22,9 +22,9 @@ import pandas as pd
 import biosteam as bst
 from biosteam.utils import TicToc
 from biosteam.plots import plot_montecarlo_across_coordinate
-from biorefineries.lactic.systems import \
-    SSCF_flowsheet, SSCF_funcs, SHF_flowsheet, SHF_funcs
-from biorefineries.lactic.analyses import create_model
+from biorefineries.lactic import systems
+from biorefineries.lactic.analyses.models import create_model, load_model
+from biorefineries.utils import evaluate_model_in_parallel, ResultSink
 
 
 # %%
@@ -32,15 +32,14 @@ from biorefineries.lactic.analyses import create_model
 def evaluate_uncertainties(kind='SSCF', seed=None, N_simulation=1000,
                            sampling_rule='L',
                            percentiles = [0, 0.05, 0.25, 0.5, 0.75, 0.95, 1],
-                           if_plot=True, report_name='1_full_evaluation.xlsx'):
-    if 'SSCF' in str(kind).upper():
-        flowsheet = SSCF_flowsheet
-        funcs = SSCF_funcs
-    elif 'SHF' in str(kind).upper():
-        flowsheet = SHF_flowsheet
-        funcs = SHF_funcs
-    else:
-        raise ValueError(f'kind can only be "SSCF" or "SHF", not {kind}.')
+                           if_plot=True, report_name='1_full_evaluation.xlsx',
+                           N_workers=1, sink_path=None):
+    # N_workers: number of worker processes to evaluate samples,
+    # None to use all CPUs (results saved in the same order as in series)
+    # sink_path: directory to append results to as samples are evaluated,
+    # so partial results can be read and interrupted runs are resumed
+    # (the directory is keyed on the samples and model configuration)
+    flowsheet, groups, teas, funcs = systems.load(kind)
     
     simulate_get_MPSP = funcs['simulate_get_MPSP']
     simulate_get_MPSP()
@@ -65,7 +64,8 @@ def evaluate_uncertainties(kind='SSCF', seed=None, N_simulation=1000,
     baseline = pd.DataFrame(data=np.array([[i for i in baseline_initial.values],]), 
                             columns=baseline_initial.keys())
     
-    model.evaluate()
+    sink = ResultSink.from_model(sink_path, model, keyed=True) if sink_path else None
+    evaluate_model_in_parallel(model, load_model, (kind,), N_workers, sink=sink)
     
     # Baseline results
     baseline_end = model.metrics_at_baseline()
@@ -22,8 +22,8 @@ import pandas as pd
 import biosteam as bst
 from warnings import warn
 from biosteam.utils import TicToc
-from biorefineries.lactic.systems import simulate_and_print, \
-    SSCF_flowsheet, SSCF_funcs, SHF_flowsheet, SHF_funcs
+from biorefineries.lactic import systems
+from biorefineries.lactic.systems import simulate_and_print
 from biorefineries.lactic._chemicals import sugars
 from biorefineries.lactic._utils import set_yield
 
@@ -66,8 +66,7 @@ def compute_sugar_conc(stream):
 
 def solve_TEA(lactic_acid, lactic_tea):
     lactic_acid.price = 0
-    for i in range(3):
-        MPSP = lactic_acid.price = lactic_tea.solve_price(lactic_acid)
+    MPSP = lactic_tea.solve_MPSP(lactic_acid)
     return MPSP
 
 def update_productivity(R301, R302, productivity):
@@ -78,12 +77,7 @@ def update_productivity(R301, R302, productivity):
         unit._cost()
 
 def simulate_log_results(kind):
-    if 'SSCF' in str(kind).upper():
-        flowsheet = SSCF_flowsheet
-        funcs = SSCF_funcs
-    elif 'SHF' in str(kind).upper():
-        flowsheet = SHF_flowsheet
-        funcs = SHF_funcs
+    flowsheet, groups, teas, funcs = systems.load(kind)
     bst.main_flowsheet.set_flowsheet(flowsheet)
     
     R301 = flowsheet.unit.R301
@@ -148,10 +142,7 @@ def save_data_clear():
 
 def run_TRY(yield_range, kind, mode, feed_freq, if_resistant, titer_range):
     bst.speed_up()
-    if 'SSCF' in str(kind).upper():
-        flowsheet = SSCF_flowsheet
-    elif 'SHF' in str(kind).upper():
-        flowsheet = SHF_flowsheet
+    flowsheet = systems.load(kind)[0]
     bst.main_flowsheet.set_flowsheet(flowsheet)
 
     u = flowsheet.unit
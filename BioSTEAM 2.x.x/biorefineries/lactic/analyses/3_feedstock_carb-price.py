@@ -96,8 +96,7 @@ for i in carb_contents1:
         TEA_prices.append(j)
         feedstock.price = j / _feedstock_factor
         lactic_acid.price = 0
-        for m in range(3):
-            MPSP = lactic_acid.price = lactic_tea.solve_price(lactic_acid)
+        MPSP = lactic_tea.solve_MPSP(lactic_acid)
         MPSPs.append(MPSP)
         NPVs.append(lactic_tea.NPV)
 
@@ -127,8 +126,7 @@ for i in carb_contents2:
         TEA_prices.append(j)
         feedstock.price = j / _feedstock_factor
         lactic_acid.price = 0
-        for m in range(3):
-            MPSP = lactic_acid.price = lactic_tea.solve_price(lactic_acid)
+        MPSP = lactic_tea.solve_MPSP(lactic_acid)
         MPSPs.append(MPSP)
         NPVs.append(lactic_tea.NPV)
 
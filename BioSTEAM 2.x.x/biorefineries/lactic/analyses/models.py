@@ -23,9 +23,8 @@ from biosteam.evaluation import Model, Metric
 from chaospy import distributions as shape
 from biorefineries.lactic._settings import CFs
 from biorefineries.lactic._utils import set_yield, _feedstock_factor
-from biorefineries.lactic.systems import simulate_and_print, \
-    SSCF_flowsheet, SSCF_groups, SSCF_teas, SSCF_funcs, \
-    SHF_flowsheet, SHF_groups, SHF_teas, SHF_funcs
+from biorefineries.lactic import systems
+from biorefineries.lactic.systems import simulate_and_print
 
 
 # %% 
@@ -35,18 +34,8 @@ from biorefineries.lactic.systems import simulate_and_print, \
 # =============================================================================
 
 def create_model(kind='SSCF'):
-    if 'SSCF' in str(kind).upper():
-        flowsheet = SSCF_flowsheet
-        groups = SSCF_groups
-        teas = SSCF_teas
-        funcs = SSCF_funcs
-    elif 'SHF' in str(kind).upper():
-        flowsheet = SHF_flowsheet
-        groups = SHF_groups
-        teas = SHF_teas
-        funcs = SHF_funcs
-    else:
-        raise ValueError(f'kind can only be "SSCF" or "SHF", not {kind}.')
+    # Only the system of this kind is created
+    flowsheet, groups, teas, funcs = systems.load(kind)
 
     bst.main_flowsheet.set_flowsheet(flowsheet)
     s = flowsheet.stream
@@ -63,8 +52,7 @@ def create_model(kind='SSCF'):
     lactic_tea = teas['lactic_tea']
     def get_MPSP():
         lactic_acid.price = 0
-        for i in range(3):
-            MPSP = lactic_acid.price = lactic_tea.solve_price(lactic_acid)
+        MPSP = lactic_tea.solve_MPSP(lactic_acid)
         return MPSP
     
     feedstock = s.feedstock
@@ -577,5 +565,9 @@ def create_model(kind='SSCF'):
     
     return model_dct
 
+def load_model(kind='SSCF'):
+    """Return the model of the biorefinery (e.g., to evaluate in parallel)."""
+    return create_model(kind)['model']
+
 
 
@@ -14,6 +14,7 @@
 # %%
 
 import biosteam as bst
+from biorefineries import PY37
 from biorefineries.lactic._chemicals import chems
 from biorefineries.lactic._processes import (
     update_settings,
@@ -31,13 +32,16 @@ bst.speed_up()
 update_settings(chems)
 
 __all__ = (
-    'create_SSCF_sys', 'create_SHF_sys',
-    'SSCF_flowsheet', 'SSCF_groups', 'SSCF_teas', 'SSCF_funcs',
-    'SHF_flowsheet', 'SHF_groups', 'SHF_teas', 'SHF_funcs',
-    'simulate_and_print', 'simulate_separation_improvement',
+    'create_SSCF_sys', 'create_SHF_sys', 'load',
+    'simulate_and_print', 'simulate_fermentation_improvement',
     'simulate_separation_improvement', 'simulate_operating_improvement'
     )
 
+#: tuple[str] Module attributes of the systems, which are created on first
+#: access (not included in `__all__`, so star imports do not create them).
+lazy_names = tuple([f'{kind}_{i}' for kind in ('SSCF', 'SHF')
+                    for i in ('flowsheet', 'groups', 'teas', 'funcs')])
+
 
 # %%
 
@@ -121,8 +125,46 @@ def create_SHF_sys():
 
     return flowsheet, groups, teas, funcs
 
-SSCF_flowsheet, SSCF_groups, SSCF_teas, SSCF_funcs = create_SSCF_sys()
-SHF_flowsheet, SHF_groups, SHF_teas, SHF_funcs  = create_SHF_sys()
+#: dict[str, bool] Whether the system of each kind has been created.
+_system_loaded = {'SSCF': False, 'SHF': False}
+
+def load(kind='SSCF'):
+    """
+    Create the SSCF or SHF system (if not yet created) and set the 
+    `<kind>_flowsheet`, `<kind>_groups`, `<kind>_teas`, and `<kind>_funcs`
+    module attributes. Return the flowsheet, groups, TEAs, and functions.
+    
+    """
+    kind = _get_kind(kind)
+    dct = globals()
+    if not _system_loaded[kind]:
+        create_sys = create_SSCF_sys if kind == 'SSCF' else create_SHF_sys
+        results = create_sys()
+        for name, value in zip(('flowsheet', 'groups', 'teas', 'funcs'), results):
+            dct[f'{kind}_{name}'] = value
+        _system_loaded[kind] = True
+    return tuple([dct[f'{kind}_{i}'] for i in ('flowsheet', 'groups', 'teas', 'funcs')])
+
+def _get_kind(kind):
+    KIND = str(kind).upper()
+    if 'SSCF' in KIND: return 'SSCF'
+    elif 'SHF' in KIND: return 'SHF'
+    else: raise ValueError(f'kind can only be "SSCF" or "SHF", not {kind}.')
+
+# Systems are only created when first accessed (PEP 562), so that
+# importing this module only pays for the requested system
+if PY37:
+    def __getattr__(name):
+        if name in lazy_names:
+            load(name.split('_', 1)[0])
+            return globals()[name]
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    
+    def __dir__():
+        return sorted({*globals(), *lazy_names})
+else:
+    load('SSCF')
+    load('SHF')
 
 
 # %%
@@ -133,14 +175,7 @@ SHF_flowsheet, SHF_groups, SHF_teas, SHF_funcs  = create_SHF_sys()
 # =============================================================================
 
 def simulate_and_print(system='SSCF'):
-    if 'SSCF' in str(system).upper():
-        flowsheet = SSCF_flowsheet
-        funcs = SSCF_funcs
-    elif 'SHF' in str(system).upper():
-        flowsheet = SHF_flowsheet
-        funcs = SHF_funcs
-    else:
-        raise ValueError(f'system can only be "SSCF" or "SHF", not {system}.')
+    flowsheet, groups, teas, funcs = load(system)
     bst.main_flowsheet.set_flowsheet(flowsheet)
     
     print('\n---------- Simulation Results ----------')
@@ -151,12 +186,7 @@ def simulate_and_print(system='SSCF'):
 
 
 def simulate_fermentation_improvement(kind='SSCF'):
-    if 'SSCF' in str(kind).upper():
-        flowsheet = SSCF_flowsheet
-    elif 'SHF' in str(kind).upper():
-        flowsheet = SHF_flowsheet
-    else:
-        raise ValueError(f'kind can only be "SSCF" or "SHF", not {kind}.')
+    flowsheet, groups, teas, funcs = load(kind)
     bst.main_flowsheet.set_flowsheet(flowsheet)
     u = flowsheet.unit
     flowsheet.system.lactic_sys.simulate()
@@ -170,14 +200,9 @@ def simulate_fermentation_improvement(kind='SSCF'):
     simulate_and_print(kind)
 
 def simulate_separation_improvement(kind='SSCF'):
-    if 'SSCF' in str(kind).upper():
-        flowsheet = SSCF_flowsheet
-    elif 'SHF' in str(kind).upper():
-        flowsheet = SHF_flowsheet
-    else:
-        raise ValueError(f'kind can only be "SSCF" or "SHF", not {kind}.')
+    flowsheet, groups, teas, funcs = load(kind)
     bst.main_flowsheet.set_flowsheet(flowsheet)
-    u = SHF_flowsheet.unit
+    u = flowsheet.unit
     flowsheet.system.lactic_sys.simulate()
     
     u.R402.X_factor = 0.9/u.R402.esterification_rxns.X[0]
@@ -185,14 +210,7 @@ def simulate_separation_improvement(kind='SSCF'):
     simulate_and_print(kind)
 
 def simulate_operating_improvement(kind='SSCF'):
-    if 'SSCF' in str(kind).upper():
-        flowsheet = SSCF_flowsheet
-        funcs = SSCF_funcs
-    elif 'SHF' in str(kind).upper():
-        flowsheet = SHF_flowsheet
-        funcs = SHF_funcs
-    else:
-        raise ValueError(f'kind can only be "SSCF" or "SHF", not {kind}.')
+    flowsheet, groups, teas, funcs = load(kind)
     bst.main_flowsheet.set_flowsheet(flowsheet)
     s = flowsheet.stream
     u = flowsheet.unit
@@ -5,8 +5,11 @@ Created on Tue Mar 26 14:50:35 2019
 @author: yoelr
 """
 from . import composition
+from . import feedstock_grid
 
-__all__ = (*composition.__all__,)
+__all__ = (*composition.__all__,
+           *feedstock_grid.__all__)
 
 from .composition import *
+from .feedstock_grid import *
 
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+This module defines the evaluate_feedstock_grid function, which evaluates
+feedstock metrics of the lipid cane biorefinery across a grid of lipid
+content, plant size, and operating days. The system is only simulated once
+for each distinct lipid content; all other points are evaluated by
+rescaling the converged system to the plant size. Converged states can be
+cached on disk, so that contour plots may be regenerated without simulating.
+
+"""
+import os
+import pickle
+import numpy as np
+from multiprocessing import Pool
+from biorefineries.utils import SystemState, rescale_system, get_source_hash
+
+__all__ = ('evaluate_feedstock_grid',)
+
+#: tuple[str] Names of feedstock metrics.
+feedstock_metrics = ('Feedstock price [USD/ton]',
+                     'Water consumption [MMGal/yr]',
+                     'Installed equipment cost [10^6 USD]')
+
+kg_per_ton = 907.18474
+
+def _evaluate_lipid_content(args):
+    from biorefineries import lipidcane as lc
+    lipid_content, plant_size, operating_days, IRR, state = args
+    system = lc.lipidcane_sys
+    tea = lc.lipidcane_tea
+    lipidcane = lc.lipidcane
+    makeup_water = lc.makeup_water
+    tea.IRR = IRR
+    if state:
+        state.restore(system)
+    else:
+        lc.set_lipid_fraction(lipid_content, lipidcane)
+        lipidcane.F_mass = plant_size[0] / 24. / operating_days[0] * kg_per_ton
+        system.simulate()
+        state = SystemState(system)
+    F_mass = lipidcane.F_mass
+    metrics = np.zeros([plant_size.size, len(feedstock_metrics)])
+    for i, (size, days) in enumerate(zip(plant_size, operating_days)):
+        if i: state.restore(system)
+        rescale_system(system, size / 24. / days * kg_per_ton / F_mass)
+        tea.operating_days = days
+        metrics[i] = (
+            tea.solve_price(lipidcane) * kg_per_ton, # USD / ton
+            makeup_water.get_total_flow('gal/day') * days / 1e6, # MMGal / yr
+            tea.installed_equipment_cost / 1e6, # million USD
+        )
+    return metrics, state
+
+def evaluate_feedstock_grid(lipid_content, plant_size, operating_days, IRR=0.10,
+                            N_workers=None, cache=None):
+    """
+    Return an array of feedstock metrics (feedstock price [USD/ton], water
+    consumption [MMGal/yr], and installed equipment cost [10^6 USD]) at
+    each point of the grid. The last dimension of the array is the metric.
+
+    Parameters
+    ----------
+    lipid_content : array
+        Lipid content [dry wt. fraction].
+    plant_size : array
+        Plant size [ton/yr].
+    operating_days : array
+        Operating days [day/yr].
+    IRR : float, optional
+        Internal rate of return. Defaults to 0.10.
+    N_workers : int, optional
+        Number of worker processes, each evaluating a distinct lipid content.
+        Defaults to the number of CPUs. If 1, all points are evaluated in
+        this process.
+    cache : str, optional
+        Pickle file of converged system states by lipid content. States
+        are loaded from this file (if it exists) to skip simulation and
+        new states are added to it. The file name is suffixed with a hash
+        of the source and data files of the lipid cane biorefinery and the
+        Python, thermosteam, and biosteam versions, so that states are never
+        loaded from a different version of the biorefinery.
+
+    Notes
+    -----
+    The lipid cane biorefinery is simulated once for each distinct lipid
+    content. All other points are evaluated by rescaling flow rates of the
+    converged system, which assumes mass and energy balances are linear
+    in the feed rate; unit designs and costs are re-evaluated at each point.
+
+    """
+    lipid_content, plant_size, operating_days = np.broadcast_arrays(
+        lipid_content, plant_size, operating_days
+    )
+    shape = lipid_content.shape
+    lipid_content = lipid_content.flatten()
+    plant_size = plant_size.flatten()
+    operating_days = operating_days.flatten()
+    if cache:
+        name, ext = os.path.splitext(cache)
+        cache = f"{name}_{get_source_hash('lipidcane')}{ext or '.pkl'}"
+    if cache and os.path.exists(cache):
+        with open(cache, 'rb') as f: states = pickle.load(f)
+    else:
+        states = {}
+    lipid_contents = np.unique(lipid_content)
+    indices = [np.where(lipid_content == i)[0] for i in lipid_contents]
+    tasks = [(i, plant_size[index], operating_days[index], IRR, states.get(float(i)))
+             for i, index in zip(lipid_contents, indices)]
+    if N_workers == 1:
+        results = [_evaluate_lipid_content(i) for i in tasks]
+    else:
+        with Pool(N_workers) as pool:
+            results = pool.map(_evaluate_lipid_content, tasks)
+    data = np.zeros([lipid_content.size, len(feedstock_metrics)])
+    for i, index, (metrics, state) in zip(lipid_contents, indices, results):
+        data[index] = metrics
+        states[float(i)] = state
+    if cache:
+        with open(cache, 'wb') as f: pickle.dump(states, f)
+    return data.reshape([*shape, len(feedstock_metrics)])
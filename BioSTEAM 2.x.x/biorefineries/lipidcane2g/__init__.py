@@ -44,9 +44,17 @@ def load_chemicals():
     chemicals = create_chemicals()
     _chemicals_loaded = True
 
-def load(name, agile=False):
+def load(name, agile=False, cached=False):
+    """
+    Load the lipid cane biorefinery configuration by name (or number).
+    If `cached` is True, the converged flowsheet is restored from an on-disk
+    snapshot (if available for the current source files and configuration)
+    instead of simulating; agile configurations are always simulated.
+    
+    """
     import biosteam as bst
     from biosteam import main_flowsheet as F, UnitGroup
+    from ..utils import load_snapshot, save_snapshot
     global lipidcane_sys, lipidcane_tea, specs, flowsheet, _system_loaded
     global lipid_extraction_specification
     global unit_groups
@@ -194,7 +202,9 @@ def load(name, agile=False):
     lipidcane_tea = create_tea(lipidcane_sys)
     lipidcane_tea.operating_days = 200
     try: 
-        lipidcane_sys.simulate()
+        if not (cached and load_snapshot(lipidcane_sys, 'lipidcane2g', name)):
+            lipidcane_sys.simulate()
+            if cached: save_snapshot(lipidcane_sys, 'lipidcane2g', name)
     except Exception as e:
         raise e
     else:
@@ -7,7 +7,7 @@ Created on Thu Dec 21 11:05:24 2017
 """
 import numpy as np
 import biosteam as bst
-import flexsolve as flx
+from biorefineries.utils import WarmStartSolver
 from biosteam import units, SystemFactory
 from biosteam import main_flowsheet as f
 
@@ -540,17 +540,19 @@ def create_sucrose_fermentation_system(ins, outs):
         current = get_sugar_concentration()
         return (1./target - 1./current) * sum([i.imass['Glucose', 'Sucrose'].sum() for i in M301.ins])
     
+    # Start from the last solution, which moves little between simulations
+    V_solver = WarmStartSolver(sugar_concentration_at_fraction_evaporated,
+                               x_min=0., x_max=1., ytol=1e-5)
+    
     @M301.add_specification(run=False)
     def adjust_glucose_concentration():
         V_guess = F301.V
         dilution_water = get_dilution_water()
         if dilution_water < 0:
-            F301.V = flx.IQ_interpolation(
-                sugar_concentration_at_fraction_evaporated,
-                0., 1., x=V_guess, ytol=1e-5
-            )
+            F301.V = V_solver.solve(x=V_guess)
         else:
             M301.ins[2].imass['Water'] = dilution_water
+    adjust_glucose_concentration.solvers = (V_solver,)
             
     F301.sugar_concentration = 0.23 # wt. % sugar
     
@@ -9,11 +9,44 @@
 """
 from . import test_biorefineries
 from .test_biorefineries import *
+from . import test_economic_model
+from .test_economic_model import *
+from . import test_esterification
+from .test_esterification import *
 from . import run_readmes
 from .run_readmes import *
+from . import test_flowsheet_snapshot
+from .test_flowsheet_snapshot import *
+from . import test_incremental_hxn
+from .test_incremental_hxn import *
+from . import test_lle_service
+from .test_lle_service import *
+from . import test_parallel_model
+from .test_parallel_model import *
+from . import test_result_sink
+from .test_result_sink import *
+from . import test_solvents_barrage
+from .test_solvents_barrage import *
+from . import test_surrogate
+from .test_surrogate import *
+from . import test_tea_batch
+from .test_tea_batch import *
+from . import test_warm_start_solver
+from .test_warm_start_solver import *
 
 __all__ = (
     *test_biorefineries.__all__,
-    *run_readmes.__all__
+    *test_economic_model.__all__,
+    *test_esterification.__all__,
+    *run_readmes.__all__,
+    *test_flowsheet_snapshot.__all__,
+    *test_incremental_hxn.__all__,
+    *test_lle_service.__all__,
+    *test_parallel_model.__all__,
+    *test_result_sink.__all__,
+    *test_solvents_barrage.__all__,
+    *test_surrogate.__all__,
+    *test_tea_batch.__all__,
+    *test_warm_start_solver.__all__,
 )
 
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+Simulation benchmarks of all biorefineries in the test registry. For each
+biorefinery, the time to import the module, load the system, simulate from
+empty recycles, re-simulate from the converged state, solve the product price,
+and evaluate a small Monte Carlo are recorded, along with the number of
+recycle iterations and the final recycle error of each simulation. Results
+are appended to a JSON history file (benchmark_history.json next to this
+script, the file given by the BIOREFINERIES_BENCHMARK_HISTORY environment
+variable, or the path given when running this script) and compared against
+previous runs, so regressions fail like any other test::
+
+    pytest biorefineries/tests/benchmark_biorefineries.py
+    python biorefineries/tests/benchmark_biorefineries.py [history_file]
+
+Note that thermosteam/biosteam functions are JIT compiled by numba on first
+call (speed_up is a no-op), so the first simulation includes compilation time.
+
+"""
+import os
+import sys
+import json
+import time
+import subprocess
+import numpy as np
+import biosteam as bst
+import pytest
+from datetime import datetime
+from importlib import import_module
+from chaospy import distributions as shape
+from biorefineries.tests.test_biorefineries import (
+    feedstocks_by_module,
+    products_by_module,
+    configurations,
+    marked_slow,
+)
+
+__all__ = (
+    'benchmark',
+    'benchmark_all',
+    'record_benchmark',
+    'check_benchmark',
+)
+
+#: tuple[str] Names of timings [s] in benchmark results.
+timings = ('import', 'load', 'first simulate', 'warm simulate',
+           'solve price', 'Monte Carlo')
+
+def get_history_file():
+    """Return the default file with the history of benchmark results.
+    Defaults to benchmark_history.json next to this script and may be set
+    with the BIOREFINERIES_BENCHMARK_HISTORY environment variable."""
+    return (os.environ.get('BIOREFINERIES_BENCHMARK_HISTORY')
+            or os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            'benchmark_history.json'))
+
+def time_import(module_name):
+    """Return the time [s] to import a biorefinery in a fresh interpreter
+    (after importing biosteam)."""
+    code = ("import time, biosteam; t = time.perf_counter(); "
+           f"import biorefineries.{module_name}; "
+            "print(time.perf_counter() - t)")
+    output = subprocess.run([sys.executable, '-c', code], check=True,
+                            capture_output=True, text=True).stdout
+    return float(output.split()[-1])
+
+def get_element(module, name):
+    try: return getattr(module, name)
+    except AttributeError: return module.flowsheet(name)
+
+def get_tea(module, module_name, feedstock_name, product_name):
+    for name in (f'{module_name}_tea', f'{feedstock_name}_tea',
+                 f'{product_name}_tea', 'tea'):
+        try: return getattr(module, name)
+        except AttributeError: pass
+    raise AttributeError(f"no TEA object found in {module_name} module")
+
+def create_model(system, tea, feedstock, product):
+    """Return a Model object with the feedstock flow rate (coupled)
+    and price as parameters and the product price as the metric."""
+    model = bst.Model(system, [bst.Metric('Price', lambda: tea.solve_price(product), 'USD/kg')])
+    F_mass = feedstock.F_mass
+    price = feedstock.price
+    @model.parameter(element=feedstock, kind='coupled', units='kg/hr',
+                     distribution=shape.Uniform(0.9 * F_mass, 1.1 * F_mass))
+    def set_feedstock_flow_rate(F_mass):
+        feedstock.F_mass = F_mass
+    if price:
+        @model.parameter(element=feedstock, kind='isolated', units='USD/kg',
+                         distribution=shape.Uniform(0.8 * price, 1.2 * price))
+        def set_feedstock_price(price):
+            feedstock.price = price
+    return model
+
+def time_simulation(system, results, name):
+    """Simulate the system and add the time [s], number of recycle
+    iterations, and final recycle error [kmol/hr] to the results."""
+    t = time.perf_counter()
+    system.simulate()
+    results[name] = time.perf_counter() - t
+    results[name + ' iterations'] = int(system._iter)
+    results[name + ' error'] = float(system._mol_error)
+
+def benchmark(module_name, configuration=None, N_samples=20, seed=3221):
+    """
+    Return a dictionary of timings [s] of a biorefinery in the test registry,
+    and the number of recycle iterations and final recycle error [kmol/hr]
+    of the system in each simulation.
+
+    Parameters
+    ----------
+    module_name : str
+        Name of biorefinery module (e.g., 'cornstover').
+    configuration : str, optional
+        Configuration passed to the `load` function of the module.
+    N_samples : int, optional
+        Number of Monte Carlo samples. Defaults to 20.
+    seed : int, optional
+        Random seed of the Monte Carlo samples. Defaults to 3221.
+
+    """
+    feedstock_name = feedstocks_by_module[module_name]
+    product_name = products_by_module[module_name]
+    bst.process_tools.default()
+    results = {'import': time_import(module_name)}
+    module = import_module('biorefineries.' + module_name)
+    load = getattr(module, 'load', None) or getattr(module, 'load_system')
+    args = (configuration,) if configuration else ()
+    t = time.perf_counter()
+    load(*args)
+    results['load'] = time.perf_counter() - t
+    feedstock = get_element(module, feedstock_name)
+    product = get_element(module, product_name)
+    tea = get_tea(module, module_name, feedstock_name, product_name)
+    system = tea.system
+    system.empty_recycles()
+    time_simulation(system, results, 'first simulate')
+    time_simulation(system, results, 'warm simulate')
+    t = time.perf_counter()
+    tea.solve_price(product)
+    results['solve price'] = time.perf_counter() - t
+    F_mass = feedstock.F_mass
+    price = feedstock.price
+    model = create_model(system, tea, feedstock, product)
+    np.random.seed(seed)
+    model.load_samples(model.sample(N_samples, 'L'))
+    try:
+        t = time.perf_counter()
+        model.evaluate()
+        results['Monte Carlo'] = time.perf_counter() - t
+        results['Monte Carlo failures'] = int(model.table.iloc[:, -1].isna().sum())
+    finally:
+        feedstock.F_mass = F_mass
+        feedstock.price = price
+        system.simulate()
+        bst.process_tools.default()
+    return results
+
+def benchmark_all(N_samples=20, seed=3221, slow=True):
+    """Return a dictionary of benchmark results of all biorefineries in the
+    test registry by name (and configuration)."""
+    all_results = {}
+    for module_name in feedstocks_by_module:
+        if not slow and module_name in marked_slow: continue
+        for configuration in configurations.get(module_name, (None,)):
+            name = f'{module_name}_{configuration}' if configuration else module_name
+            all_results[name] = benchmark(module_name, configuration, N_samples, seed)
+    return all_results
+
+def load_history(file=None):
+    """Return a list of all previous benchmark entries."""
+    file = file or get_history_file()
+    if not os.path.exists(file): return []
+    with open(file) as f: return json.load(f)
+
+def record_benchmark(name, results, file=None):
+    """Append benchmark results to the JSON history file."""
+    file = file or get_history_file()
+    history = load_history(file)
+    history.append({
+        'name': name,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'biosteam': bst.__version__,
+        'python': sys.version.split()[0],
+        'results': results,
+    })
+    with open(file, 'w') as f: json.dump(history, f, indent=1)
+
+def check_benchmark(name, results, file=None, rtol=0.5, last=5):
+    """
+    Return a list of regressions of benchmark results with respect to the
+    history file (empty if none).
+
+    Parameters
+    ----------
+    name : str
+        Name of benchmark.
+    results : dict
+        Benchmark results.
+    file : str, optional
+        JSON history file.
+    rtol : float, optional
+        Maximum relative increase in timings with respect to the fastest
+        of the last entries. Defaults to 0.5 (timings are noisy).
+    last : int, optional
+        Number of previous entries to compare against. Defaults to 5.
+
+    """
+    history = [i['results'] for i in load_history(file) if i['name'] == name][-last:]
+    if not history: return []
+    regressions = []
+    for key in timings:
+        previous = [i[key] for i in history if key in i]
+        if not previous or key not in results: continue
+        best = min(previous)
+        if results[key] > (1. + rtol) * best:
+            regressions.append(f"{name} {key} time increased from "
+                               f"{best:.3g} to {results[key]:.3g} s")
+    return regressions
+
+registry = [(i, j) for i in feedstocks_by_module
+            for j in configurations.get(i, (None,))]
+
+@pytest.mark.slow
+@pytest.mark.parametrize('module_name, configuration', registry)
+def test_benchmark(module_name, configuration):
+    name = f'{module_name}_{configuration}' if configuration else module_name
+    results = benchmark(module_name, configuration)
+    regressions = check_benchmark(name, results)
+    record_benchmark(name, results)
+    assert not regressions, '; '.join(regressions)
+
+
+if __name__ == '__main__':
+    from warnings import filterwarnings
+    filterwarnings('ignore')
+    file = sys.argv[1] if len(sys.argv) > 1 else None
+    for name, results in benchmark_all().items():
+        regressions = check_benchmark(name, results, file)
+        record_benchmark(name, results, file)
+        print(name, results)
+        for i in regressions: print('REGRESSION:', i)
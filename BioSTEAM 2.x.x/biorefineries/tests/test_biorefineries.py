@@ -7,6 +7,8 @@
 # for license details.
 """
 """
+import sys
+import subprocess
 import numpy as np
 import biosteam as bst
 import thermosteam as tmo
@@ -24,6 +26,7 @@ __all__ = (
     'test_ethanol_adipic',
     'test_wheatstraw',
     'test_animal_bedding',
+    'test_lazy_systems',
     'generate_all_code',
     'generate_code',
     'print_results',
@@ -311,6 +314,45 @@ def test_ethanol_adipic():
     module.biorefinery.simulate()
     bst.process_tools.default()
     
+# Configurations other than the default are only created on first access, 
+# so importing a biorefinery must stay within budget [s] (measured in a
+# fresh interpreter after importing biosteam)
+import_time_budgets = {
+    'lactic': 60.,
+    'ethanol_adipic': 60.,
+}
+lazy_attributes = {
+    'lactic': ('SHF_flowsheet', 'SHF_teas'),
+    'ethanol_adipic': ('CPP_flowsheet', 'CPP_AFEX_flowsheet', 
+                       'HMPP_AFEX_flowsheet', 'feedstock_GWPs'),
+}
+lazy_import_code = """
+import time, biosteam
+t = time.perf_counter()
+import biorefineries.{0}
+t = time.perf_counter() - t
+systems = biorefineries.{0}.systems
+print(t, *[i in vars(systems) for i in {1}])
+from biorefineries.{0}.systems import *
+print(*[i in vars(systems) for i in {1}])
+"""
+
+@pytest.mark.parametrize('module_name', tuple(import_time_budgets))
+def test_lazy_systems(module_name):
+    names = lazy_attributes[module_name]
+    code = lazy_import_code.format(module_name, names)
+    output = subprocess.run([sys.executable, '-c', code], check=True,
+                            capture_output=True, text=True).stdout
+    *_, imported, star_imported = output.strip().split('\n')
+    time, *created = imported.split()
+    assert float(time) < import_time_budgets[module_name]
+    assert created == ['False'] * len(names) # Not created on import
+    assert star_imported.split() == ['False'] * len(names) # Nor by star imports
+    systems = import_module(f'biorefineries.{module_name}.systems')
+    for i in names: 
+        assert getattr(systems, i) is not None # Created on access
+        assert i in vars(systems)
+    
 @pytest.mark.slow
 def test_wheatstraw():
     bst.process_tools.default()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+import biosteam as bst
+import thermosteam as tmo
+
+__all__ = (
+    'test_economic_fast_path',
+    'test_economic_fast_path_after_failure',
+)
+
+def create_model(cls):
+    bst.main_flowsheet.set_flowsheet('economic_model_test_' + cls.__name__)
+    tmo.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+    feed = bst.Stream('feed', Water=100., Ethanol=10., units='kmol/hr', price=0.01)
+    H1 = bst.units.HXutility('H1', ins=feed, T=340.)
+    system = bst.main_flowsheet.create_system('economic_model_sys')
+    metrics = [bst.Metric('Duty', lambda: H1.heat_utilities[0].duty, 'kJ/hr'),
+               bst.Metric('Feed cost', lambda: feed.price * feed.F_mass, 'USD/hr')]
+    model = cls(system, metrics)
+
+    @model.parameter(element=feed, units='kg/hr', kind='coupled')
+    def set_feed_flow(F_mass):
+        feed.F_mass = F_mass
+
+    @model.parameter(element=feed, units='USD/kg')
+    def set_feed_price(price):
+        feed.price = price
+
+    return model
+
+def test_economic_fast_path():
+    from biorefineries.utils import EconomicFastPathModel
+    bst.process_tools.default()
+    flows = [1000., 2000.]
+    prices = [0.01, 0.02, 0.03]
+    samples = np.array([(i, j) for j in prices for i in flows]) # Alternate flows
+    model = create_model(EconomicFastPathModel)
+    model.load_samples(samples)
+    model.evaluate()
+    assert model.simulations == len(flows) # Only simulated when the flow changes
+    model.load_samples(samples)
+    model.evaluate()
+    assert model.simulations == 2 * len(flows) # The system may have changed in between
+
+    # Same results as simulating every sample
+    reference = create_model(bst.Model)
+    reference.load_samples(samples)
+    reference.evaluate()
+    assert np.allclose(model.table.values, reference.table.values)
+    duty = model.table[model.metrics[0].index].values
+    assert np.allclose(duty[0::2], duty[0]) and np.allclose(duty[1::2], duty[1])
+    assert not np.allclose(duty[0], duty[1])
+    bst.process_tools.default()
+
+def test_economic_fast_path_after_failure():
+    from biorefineries.utils import EconomicFastPathModel
+    bst.process_tools.default()
+    samples = np.array([(1000., 0.01), (1000., 0.02), (1000., 0.03)])
+    model = create_model(EconomicFastPathModel)
+    feed = bst.main_flowsheet.stream.feed
+    def cost():
+        if feed.price == 0.02: raise RuntimeError('failed evaluation')
+        return feed.price * feed.F_mass
+    model.metrics = (*model.metrics, bst.Metric('Cost', cost, 'USD/hr'))
+    model.exception_hook = 'ignore'
+    model.load_samples(samples)
+    model.evaluate()
+    # The system is reset after the failure, so the
+    # price-only sample that follows is simulated
+    assert model.simulations == 2
+    values = model.table[[i.index for i in model.metrics]].values
+    assert np.isnan(values[1]).all()
+    assert not np.isnan(values[[0, 2]]).any()
+    assert np.isclose(values[2, 2], 0.03 * 1000.)
+    bst.process_tools.default()
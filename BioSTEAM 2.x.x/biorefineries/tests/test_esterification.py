@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import biosteam as bst
+import thermosteam as tmo
+import pytest
+
+__all__ = (
+    'test_esterification_integrators',
+)
+
+def test_esterification_integrators():
+    from biorefineries.lactic._chemicals import chems
+    from biorefineries.lactic._units import Esterification
+    bst.process_tools.default()
+    bst.main_flowsheet.set_flowsheet('esterification_test')
+    tmo.settings.set_thermo(chems)
+    feed = tmo.Stream(None, LacticAcid=100., Ethanol=150., H2O=200.,
+                      AceticAcid=2., SuccinicAcid=1., units='kmol/hr', T=351.15)
+    results = {}
+    for time_step in (1., 2.):
+        for integrator in ('Euler', 'LSODA'):
+            R402 = Esterification('R402_' + integrator, integrator=integrator)
+            results[time_step, integrator] = R402.compute_X1_and_tau(feed, time_step)
+        X1_Euler, tau_Euler = results[time_step, 'Euler']
+        X1_adaptive, tau_adaptive = results[time_step, 'LSODA']
+        assert 0. < X1_Euler < 1.
+        assert X1_adaptive == pytest.approx(X1_Euler, abs=0.01)
+        assert tau_adaptive == pytest.approx(tau_Euler, rel=0.1)
+    # The threshold on the rate scales with the time step, so a longer
+    # time step stops the integration at a lower rate
+    assert results[2., 'LSODA'][1] > results[1., 'LSODA'][1]
+    bst.process_tools.default()
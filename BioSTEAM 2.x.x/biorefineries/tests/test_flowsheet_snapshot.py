@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+import biosteam as bst
+import thermosteam as tmo
+import pytest
+
+__all__ = (
+    'test_snapshot_round_trip',
+    'test_snapshot_key',
+)
+
+def create_system():
+    bst.main_flowsheet.set_flowsheet('snapshot_test')
+    tmo.settings.set_thermo(['Water', 'Ethanol'])
+    feed = bst.Stream('feed', Water=100., Ethanol=10., units='kmol/hr')
+    H1 = bst.units.HXutility('H1', ins=feed, T=340.)
+    system = bst.main_flowsheet.create_system('snapshot_sys')
+    return system, feed, H1
+
+def test_snapshot_round_trip(tmp_path, monkeypatch):
+    from biorefineries.utils import load_snapshot, save_snapshot
+    from biorefineries.utils.flowsheet_snapshot import get_snapshot_file
+    bst.process_tools.default()
+    monkeypatch.setenv('BIOREFINERIES_CACHE', str(tmp_path))
+    system, feed, H1 = create_system()
+    assert load_snapshot(system, 'sugarcane', 'test') is None # Not saved yet
+    system.simulate()
+    mol = H1.outs[0].mol.copy()
+    purchase_cost = H1.purchase_cost
+    duty = H1.heat_utilities[0].duty
+    save_snapshot(system, 'sugarcane', 'test')
+
+    # Load
+    feed.imol['Water'] = 50.
+    H1.outs[0].empty()
+    H1.purchase_costs.clear()
+    assert load_snapshot(system, 'sugarcane', 'test') is not None
+    assert np.allclose(feed.imol['Water'], 100.)
+    assert np.allclose(H1.outs[0].mol, mol)
+    assert np.allclose(H1.purchase_cost, purchase_cost)
+    assert np.allclose(H1.heat_utilities[0].duty, duty)
+
+    # Invalidate: other configurations have other snapshots
+    assert load_snapshot(system, 'sugarcane', 'other') is None
+
+    # Unreadable snapshots are ignored with a warning
+    with open(get_snapshot_file('sugarcane', 'test'), 'wb') as f: f.write(b'not a pickle')
+    with pytest.warns(RuntimeWarning):
+        assert load_snapshot(system, 'sugarcane', 'test') is None
+    bst.process_tools.default()
+
+def test_snapshot_key(tmp_path):
+    from biorefineries.utils import get_package_files, get_source_hash
+    def write(file, text):
+        path = tmp_path.joinpath(file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    write('__init__.py', '')
+    write('a/__init__.py', 'from ..b import x\n')
+    write('a/data.csv', '1,2\n')
+    write('b/__init__.py', 'x = 1\n')
+    write('c/__init__.py', 'y = 1\n')
+    files = get_package_files('a', str(tmp_path))
+    packages = {tmp_path.joinpath(i).relative_to(tmp_path).parts[0] for i in files}
+    assert packages == {'__init__.py', 'a', 'b'}
+    key = get_source_hash('a', root=str(tmp_path))
+    assert get_source_hash('a', 'other', root=str(tmp_path)) != key
+    write('c/__init__.py', 'y = 2\n') # Not imported
+    assert get_source_hash('a', root=str(tmp_path)) == key
+    write('b/__init__.py', 'x = 2\n') # Imported package
+    assert get_source_hash('a', root=str(tmp_path)) != key
+    key = get_source_hash('a', root=str(tmp_path))
+    write('a/data.csv', '1,3\n') # Data file
+    assert get_source_hash('a', root=str(tmp_path)) != key
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import biosteam as bst
+import thermosteam as tmo
+import pytest
+
+__all__ = (
+    'test_incremental_hxn',
+)
+
+def create_system(HXN_cls, ID):
+    bst.main_flowsheet.set_flowsheet(ID)
+    tmo.settings.set_thermo(['Water'], cache=True)
+    hot = bst.Stream('hot', Water=600., units='kmol/hr', T=360.)
+    cold = bst.Stream('cold', Water=1000., units='kmol/hr', T=300.)
+    bst.units.HXutility('H1', ins=hot, T=300.)
+    bst.units.HXutility('H2', ins=cold, T=350.)
+    HXN = HXN_cls('HXN', T_min_app=5.)
+    system = bst.main_flowsheet.create_system(ID + '_sys')
+    return system, cold, HXN
+
+def get_utilities(HXN):
+    return {i.agent.ID: (i.duty, i.cost) for i in HXN.heat_utilities}
+
+def test_incremental_hxn():
+    from biorefineries.utils.incremental_hxn import IncrementalHeatExchangerNetwork
+    bst.process_tools.default()
+    system, cold, HXN = create_system(IncrementalHeatExchangerNetwork, 'incremental_hxn_test')
+    system.simulate()
+    cold.F_mol *= 1.05
+    system.simulate()
+    assert HXN.N_syntheses == 1 and HXN.N_reuses == 1 # Network was re-rated
+    utilities = get_utilities(HXN)
+
+    # Same results as a full synthesis
+    reference_system, cold, reference_HXN = create_system(bst.facilities.HeatExchangerNetwork,
+                                                          'incremental_hxn_reference')
+    cold.F_mol *= 1.05
+    reference_system.simulate()
+    reference_utilities = get_utilities(reference_HXN)
+    assert utilities.keys() == reference_utilities.keys()
+    for agent, (duty, cost) in reference_utilities.items():
+        assert utilities[agent] == pytest.approx((duty, cost), rel=1e-3)
+    assert HXN.installed_cost == pytest.approx(reference_HXN.installed_cost, rel=1e-3)
+    bst.process_tools.default()
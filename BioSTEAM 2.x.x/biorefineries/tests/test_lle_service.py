@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+import biosteam as bst
+import thermosteam as tmo
+
+__all__ = (
+    'test_lle_service',
+)
+
+def test_lle_service():
+    from biorefineries.utils.lle_service import LLEService, get_lle_report
+    bst.process_tools.default()
+    tmo.settings.set_thermo(['Water', 'Octanol'], cache=True)
+    lle = LLEService('test')
+    feed = tmo.Stream(None, Water=100., Octanol=10., T=298.15)
+    ms = lle(feed)
+    assert (lle.N_calls, lle.N_solves, lle.N_hits) == (1, 1, 0)
+    assert ms.imol['l'].any() and ms.imol['L'].any()
+    assert np.allclose(ms.mol, feed.mol)
+    mol_l = ms.imol['l'].copy()
+
+    # Same feed and temperature reuse the last phase split
+    ms = lle(feed)
+    assert (lle.N_calls, lle.N_solves, lle.N_hits) == (2, 1, 1)
+    assert np.array_equal(ms.imol['l'], mol_l)
+
+    # Same composition at a larger flow rate scales the phase split
+    double_feed = feed.copy()
+    double_feed.mol *= 2.
+    ms = lle(double_feed)
+    assert lle.N_hits == 2
+    assert np.allclose(ms.imol['l'], 2. * mol_l)
+
+    # Phases of a MultiStream feed are mixed
+    multi_stream = tmo.MultiStream(None, l=[('Water', 100.)], L=[('Octanol', 10.)], T=298.15)
+    ms = lle(multi_stream)
+    assert lle.N_hits == 3
+    assert np.allclose(ms.mol, feed.mol)
+    assert np.allclose(ms.imol['l'], mol_l)
+
+    # Changes in composition or temperature beyond tolerance are solved
+    feed.imol['Octanol'] += 1e-3
+    lle(feed)
+    assert (lle.N_solves, lle.N_hits) == (2, 3)
+    lle(feed, T=318.15)
+    assert (lle.N_solves, lle.N_hits) == (3, 3)
+    assert lle.N_warm_starts <= 2
+    report = get_lle_report([lle], N_simulations=2)
+    assert report.loc['test', 'Hits'] == 3
+    assert report.loc['test', 'Saved solves per simulation'] == 1.5
+
+    # Reset forgets the last solution
+    lle.reset()
+    lle(feed)
+    assert (lle.N_calls, lle.N_solves, lle.N_hits) == (1, 1, 0)
+    bst.process_tools.default()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+import biosteam as bst
+import thermosteam as tmo
+
+__all__ = (
+    'test_evaluate_model_in_parallel',
+)
+
+def create_model():
+    bst.main_flowsheet.set_flowsheet('parallel_model_test')
+    tmo.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+    feed = bst.Stream('feed', Water=100., Ethanol=10., units='kmol/hr')
+    recycle = bst.Stream('recycle')
+    M1 = bst.units.Mixer('M1', ins=(feed, recycle))
+    H1 = bst.units.HXutility('H1', ins=M1-0, T=340.)
+    S1 = bst.units.Splitter('S1', ins=H1-0, outs=(recycle, 'product'), split=0.5)
+    system = bst.main_flowsheet.create_system('parallel_model_sys')
+    product = S1.outs[1]
+    metrics = [bst.Metric('Duty', lambda: H1.heat_utilities[0].duty, 'kJ/hr'),
+               bst.Metric('Ethanol', lambda: product.imol['Ethanol'], 'kmol/hr')]
+    model = bst.Model(system, metrics)
+
+    @model.parameter(element=feed, units='kmol/hr', kind='coupled')
+    def set_ethanol_flow(ethanol):
+        feed.imol['Ethanol'] = ethanol
+
+    @model.parameter(element=S1, kind='coupled')
+    def set_split(split):
+        S1.split[:] = split
+
+    return model
+
+def test_evaluate_model_in_parallel():
+    from biorefineries.utils import evaluate_model_in_parallel
+    bst.process_tools.default()
+    np.random.seed(0)
+    samples = np.array([5., 0.3]) + np.random.rand(20, 2) * np.array([10., 0.4])
+    tables = []
+    for N_workers in (1, 2, 3):
+        model = create_model()
+        model.load_samples(samples)
+        evaluate_model_in_parallel(model, create_model, N_workers=N_workers, chunk_size=3)
+        tables.append(model.table.values.copy())
+    assert not np.isnan(tables[0]).any()
+    for table in tables[1:]: assert np.array_equal(tables[0], table)
+    bst.process_tools.default()
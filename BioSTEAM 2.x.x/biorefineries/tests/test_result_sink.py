@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from types import SimpleNamespace
+
+__all__ = (
+    'test_result_sink_resume',
+    'test_result_sink_validation',
+)
+
+columns = [('Parameter', 'x'), ('Parameter', 'y'), ('Biorefinery', 'z')]
+
+def create_model(samples):
+    parameters = [SimpleNamespace(baseline=0., distribution='Uniform(0, 1)')
+                  for i in range(2)]
+    return SimpleNamespace(
+        _samples=samples,
+        table=pd.DataFrame(columns=pd.MultiIndex.from_tuples(columns)),
+        get_parameters=lambda: parameters,
+    )
+
+def test_result_sink_resume(tmp_path):
+    pytest.importorskip('pyarrow')
+    from biorefineries.utils import ResultSink
+    from biorefineries.utils.result_sink import check_completed_samples
+    samples = np.arange(10, dtype=float).reshape([5, 2])
+    model = create_model(samples)
+    path = str(tmp_path / 'sink')
+    with ResultSink(path, columns, batch_size=2) as sink:
+        for i in (0, 1, 3):
+            x, y = samples[i]
+            sink.append(i, [x, y, x + y])
+        assert sink.read().index.tolist() == [0, 1] # Last row is buffered
+
+    # Resume
+    sink = ResultSink(path, columns, batch_size=2)
+    assert sorted(sink.completed()) == [0, 1, 3]
+    completed = check_completed_samples(model, sink)
+    assert completed.tolist() == [True, True, False, True, False]
+    df = sink.read()
+    assert df.index.tolist() == [0, 1, 3]
+    assert np.allclose(df[('Biorefinery', 'z')], samples[[0, 1, 3]].sum(1))
+    assert np.allclose(sink.read([('Parameter', 'y')]).values[:, 0], samples[[0, 1, 3], 1])
+
+def test_result_sink_validation(tmp_path):
+    pytest.importorskip('pyarrow')
+    from biorefineries.utils import ResultSink, get_model_key
+    from biorefineries.utils.result_sink import check_completed_samples
+    samples = np.arange(10, dtype=float).reshape([5, 2])
+    path = str(tmp_path / 'sink')
+    with ResultSink(path, columns) as sink:
+        sink.append(0, [*samples[0], 1.])
+
+    # Columns must match
+    with pytest.raises(ValueError):
+        ResultSink(path, columns[:2])
+
+    # Samples must match
+    other_samples = samples + 1.
+    with pytest.raises(ValueError):
+        check_completed_samples(create_model(other_samples), ResultSink(path, columns))
+
+    # Keyed sinks are only resumed for the same samples
+    model = create_model(samples)
+    assert get_model_key(model) == get_model_key(create_model(samples.copy()))
+    assert get_model_key(model) != get_model_key(create_model(other_samples))
+    sink = ResultSink.from_model(str(tmp_path / 'keyed'), model, keyed=True)
+    assert sink.path.endswith(get_model_key(model))
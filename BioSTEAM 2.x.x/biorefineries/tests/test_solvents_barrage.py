@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import os
+import sys
+import numpy as np
+import thermosteam as tmo
+import pytest
+from importlib import util
+
+__all__ = (
+    'test_solvents_barrage',
+)
+
+solvents = ('Octanol', 'Hexanol')
+
+def import_solvents_barrage():
+    # Load the module from its file so that the HP package
+    # (i.e., its chemicals, units, and settings) is not imported
+    name = 'biorefineries.HP.solvents_barrage'
+    if name in sys.modules: return sys.modules[name]
+    import biorefineries
+    file = os.path.join(os.path.dirname(biorefineries.__file__), 'HP', 'solvents_barrage.py')
+    spec = util.spec_from_file_location(name, file)
+    module = util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+def create_process_stream():
+    tmo.settings.set_thermo(['Water', 'Furfural', *solvents], cache=True)
+    return tmo.Stream(None, Water=1000., Furfural=10., units='kmol/hr', T=300.)
+
+def create_barrage(**kwargs):
+    SolventsBarrage = import_solvents_barrage().SolventsBarrage
+    return SolventsBarrage(create_process_stream, 'Furfural', solvents,
+                           T_range=(300., 320.), **kwargs)
+
+def test_solvents_barrage(tmp_path, monkeypatch):
+    solvents_barrage = import_solvents_barrage()
+    thermo = tmo.Thermo(['Water', 'Ethanol'], cache=True)
+    tmo.settings.set_thermo(thermo)
+    serial = create_barrage(N_workers=1).run().sort_index()
+    assert serial.shape[0] == 4 # 2 solvents x 2 temperatures
+    assert tmo.settings.get_thermo() is thermo # Setup does not replace the thermo
+    parallel = create_barrage(N_workers=2).run().sort_index()
+    assert (serial.index == parallel.index).all()
+    assert np.allclose(serial.values.astype(float), parallel.values.astype(float),
+                       equal_nan=True)
+
+    # Resume from a sink without evaluating any points
+    pytest.importorskip('pyarrow')
+    from biorefineries.utils import ResultSink
+    path = str(tmp_path / 'sink')
+    create_barrage(N_workers=1, sink=ResultSink(path, solvents_barrage.metric_names)).run()
+    def evaluate_point(*args, **kwargs): raise RuntimeError('point was evaluated again')
+    monkeypatch.setattr(solvents_barrage, 'evaluate_point', evaluate_point)
+    barrage = create_barrage(N_workers=1, sink=ResultSink(path, solvents_barrage.metric_names))
+    resumed = barrage.run().sort_index()
+    assert np.allclose(serial.values.astype(float), resumed.values.astype(float),
+                       equal_nan=True)
+
+    # The grid must match the results in the sink
+    barrage = create_barrage(N_workers=1, ratios=(0.5,),
+                             sink=ResultSink(path, solvents_barrage.metric_names))
+    with pytest.raises(ValueError):
+        barrage.run()
+    tmo.settings.set_thermo(thermo)
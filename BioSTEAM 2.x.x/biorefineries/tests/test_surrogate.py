@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+import pytest
+
+__all__ = (
+    'test_response_surface',
+)
+
+def test_response_surface(tmp_path):
+    from biorefineries.utils import ResponseSurface
+    np.random.seed(0)
+    X = np.random.rand(50, 2)
+    x, y = X.T
+    Y = np.array([1. + x * y - 2. * x**3, np.full(50, 3.)]).T
+    surrogate = ResponseSurface.fit(X, Y, ('x', 'y'), ('a', 'b'), degree=3, min_R2=0.999)
+    assert np.allclose(surrogate.R2, 1.)
+    assert surrogate.in_domain([0.5, 0.5]) and not surrogate.in_domain([0.5, 2.])
+    assert surrogate([0.5, 0.5]) == pytest.approx({'a': 1., 'b': 3.})
+    file = str(tmp_path / 'surrogate.npz')
+    surrogate.save(file)
+    loaded = ResponseSurface.load(file)
+    assert loaded.inputs == surrogate.inputs and loaded.outputs == surrogate.outputs
+    assert np.allclose(loaded.predict(X), Y)
+    assert np.allclose(loaded.R2, surrogate.R2)
+    
+    # Poor fits
+    Y = np.sin(10. * x)
+    surrogate = ResponseSurface.fit(X, Y, ('x', 'y'), ('a',), degree=1)
+    assert surrogate.R2[0] < 0.9
+    with pytest.raises(ValueError):
+        ResponseSurface.fit(X, Y, ('x', 'y'), ('a',), degree=1, min_R2=0.9)
+    with pytest.raises(ValueError): # Not enough samples
+        ResponseSurface.fit(X[:5], Y[:5], ('x', 'y'), ('a',), degree=3)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+import biosteam as bst
+import thermosteam as tmo
+import pytest
+
+__all__ = (
+    'test_tea_batch',
+)
+
+class SimpleTEA(bst.TEA):
+
+    def _FCI(self, TDC):
+        return TDC
+
+    def _FOC(self, FCI):
+        return 0.05 * FCI
+
+def create_tea():
+    bst.main_flowsheet.set_flowsheet('tea_batch_test')
+    tmo.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+    feed = bst.Stream('feed', Water=100., Ethanol=10., units='kmol/hr', price=0.01)
+    H1 = bst.units.HXutility('H1', ins=feed, outs='product', T=340.)
+    product = H1.outs[0]
+    system = bst.main_flowsheet.create_system('tea_batch_sys')
+    system.simulate()
+    tea = SimpleTEA(system, IRR=0.10, duration=(2018, 2038),
+                    depreciation='MACRS7', income_tax=0.35,
+                    operating_days=330., lang_factor=4.,
+                    construction_schedule=(0.4, 0.6), startup_months=0.,
+                    startup_FOCfrac=0., startup_VOCfrac=0.,
+                    startup_salesfrac=0., WC_over_FCI=0.05,
+                    finance_interest=0., finance_years=0, finance_fraction=0.)
+    product.price = 1.5 * tea.solve_price(product) # Profitable at baseline
+    return tea, feed, product
+
+def test_tea_batch():
+    from biorefineries.utils import TEABatch
+    bst.process_tools.default()
+    tea, feed, product = create_tea()
+    batch = TEABatch(tea, (feed, product))
+    feed_price = np.array([0.01, 0.02, 0.01, 0.03])
+    product_price = product.price * np.array([1., 1.2, 0.9, 1.5])
+    IRR = np.array([0.10, 0.15, 0.05, 0.10])
+    start_year = 2018
+    end_year = np.array([2038, 2038, 2048, 2048])
+    scenarios = dict(prices={feed: feed_price, product: product_price},
+                     IRR=IRR, start_year=start_year, end_year=end_year)
+    NPV = batch.NPV(**scenarios)
+    MPSP = batch.solve_price(product, **scenarios)
+    IRR_solved = batch.solve_IRR(**scenarios)
+    VOC = batch.VOC(scenarios['prices'])
+    assert NPV.shape == MPSP.shape == IRR_solved.shape == VOC.shape == (4,)
+
+    # Each scenario matches the TEA
+    baseline = (feed.price, product.price, tea.IRR, tea.duration)
+    for i in range(4):
+        feed.price = feed_price[i]
+        product.price = product_price[i]
+        tea.IRR = IRR[i]
+        tea.duration = (start_year, end_year[i])
+        assert NPV[i] == pytest.approx(tea.NPV, rel=1e-6)
+        assert VOC[i] == pytest.approx(tea.VOC, rel=1e-6)
+        assert MPSP[i] == pytest.approx(tea.solve_price(product), rel=1e-4)
+        assert IRR_solved[i] == pytest.approx(tea.solve_IRR(), rel=1e-4)
+    feed.price, product.price, tea.IRR, tea.duration = baseline
+
+    # Scalars apply to all scenarios and prices of other streams cannot change
+    assert batch.NPV().shape == (1,)
+    assert batch.NPV()[0] == pytest.approx(tea.NPV, rel=1e-6)
+    assert batch.NPV(IRR=IRR)[[0, 3]] == pytest.approx(tea.NPV, rel=1e-6)
+    with pytest.raises(ValueError):
+        TEABatch(tea, (feed,)).NPV(prices={product: product.price})
+    bst.process_tools.default()
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import pytest
+
+__all__ = (
+    'test_warm_start_solver',
+    'test_warm_start_solver_bounds',
+)
+
+def test_warm_start_solver():
+    from biorefineries.utils import WarmStartSolver
+    def f(x, target): return x * x - target
+    solver = WarmStartSolver(f, 0., 10., ytol=1e-9)
+    assert solver.solve(4.) == pytest.approx(2.)
+    assert (solver.N_hits, solver.N_misses) == (0, 1)
+    N_evaluations = solver.N_evaluations
+    assert solver.solve(4.01) == pytest.approx(4.01 ** 0.5)
+    assert (solver.N_hits, solver.N_misses) == (1, 1)
+    assert solver.N_evaluations - N_evaluations < N_evaluations
+    solver.reset()
+    assert solver.x is None and solver.N_evaluations == 0
+
+def test_warm_start_solver_bounds():
+    from biorefineries.utils import WarmStartSolver
+    def f(x): return (x - 0.3) * (x - 0.7)
+    solver = WarmStartSolver(f, 0., 1., xtol=1e-6)
+    with pytest.raises(ValueError): # Same sign at both bounds
+        solver.solve()
+    solver = WarmStartSolver(f, 0., 1., xtol=1e-6, checkbounds=False)
+    assert abs(f(solver.solve())) < 1e-6
+    def f(x): return x + 1.
+    solver = WarmStartSolver(f, -2., 2.)
+    assert solver.solve() == pytest.approx(-1.)
+    with pytest.raises(ValueError): # Bounds of this solve
+        solver.solve(x_min=0.)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+Tools shared across biorefineries for evaluating and analyzing systems.
+
+Modules that depend on biosteam/thermosteam internals (i.e.,
+`incremental_hxn` and `lle_service`) are not imported here; import them
+directly where they are used.
+
+"""
+from . import specification_sweep
+from . import tea_batch
+from . import economic_model
+from . import surrogate
+from . import system_state
+from . import chemicals_cache
+from . import flowsheet_snapshot
+from . import result_sink
+from . import parallel_model
+from . import convergence_profiler
+from . import steam_injection
+from . import lca
+from . import reduced_order_solver
+from . import warm_start_solver
+from . import recovery_policy
+
+__all__ = (*specification_sweep.__all__,
+           *tea_batch.__all__,
+           *economic_model.__all__,
+           *surrogate.__all__,
+           *system_state.__all__,
+           *chemicals_cache.__all__,
+           *flowsheet_snapshot.__all__,
+           *result_sink.__all__,
+           *parallel_model.__all__,
+           *convergence_profiler.__all__,
+           *steam_injection.__all__,
+           *lca.__all__,
+           *reduced_order_solver.__all__,
+           *warm_start_solver.__all__,
+           *recovery_policy.__all__)
+
+from .specification_sweep import *
+from .tea_batch import *
+from .economic_model import *
+from .surrogate import *
+from .system_state import *
+from .chemicals_cache import *
+from .flowsheet_snapshot import *
+from .result_sink import *
+from .parallel_model import *
+from .convergence_profiler import *
+from .steam_injection import *
+from .lca import *
+from .reduced_order_solver import *
+from .warm_start_solver import *
+from .recovery_policy import *
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+This module defines the load_chemicals function, which loads the compiled
+chemicals of a biorefinery from an on-disk cache instead of creating them
+from scratch (i.e., database lookups, model fitting, and compilation).
+The cache is keyed by a hash of the files with the chemical definitions and
+the thermosteam and Python versions, so it is rebuilt whenever any of
+these change.
+
+"""
+import os
+import sys
+import pickle
+import hashlib
+import tempfile
+import thermosteam as tmo
+from warnings import warn
+
+__all__ = ('load_chemicals', 'clear_chemicals_cache')
+
+def get_cache_dir():
+    """Return the directory of the compiled chemicals cache. Defaults to
+    ~/.cache/biorefineries and may be set with the BIOREFINERIES_CACHE
+    environment variable."""
+    return os.environ.get('BIOREFINERIES_CACHE') or os.path.join(
+        os.path.expanduser('~'), '.cache', 'biorefineries'
+    )
+
+def get_cache_key(files):
+    """Return the hash of the files, thermosteam version, and Python version."""
+    key = hashlib.sha256()
+    key.update(tmo.__version__.encode())
+    key.update(sys.version.split()[0].encode())
+    for file in files:
+        with open(file, 'rb') as f: key.update(f.read())
+    return key.hexdigest()[:16]
+
+def load_chemicals(create_chemicals, files=None, cache_dir=None):
+    """
+    Return compiled chemicals from the on-disk cache. If not cached (or if
+    the chemical definitions changed), create and cache them.
+
+    Parameters
+    ----------
+    create_chemicals : function
+        Should return compiled chemicals.
+    files : Iterable[str], optional
+        Files with the chemical definitions (e.g., Python modules and
+        YAML files). Defaults to the module of `create_chemicals`.
+    cache_dir : str, optional
+        Directory of cached chemicals. Defaults to ~/.cache/biorefineries
+        (or the BIOREFINERIES_CACHE environment variable).
+
+    Examples
+    --------
+    >>> from biorefineries.utils import load_chemicals
+    >>> from biorefineries.LAOs import _chemicals
+    >>> chemicals = load_chemicals(_chemicals.create_chemicals, _chemicals.definition_files)
+
+    Notes
+    -----
+    Chemicals must be picklable, so property models must not be lambda or
+    nested functions (define them at module level instead); a TypeError is
+    raised otherwise. If the cache cannot be written, a warning is issued
+    and chemicals are created every time.
+
+    """
+    files = files or (create_chemicals.__code__.co_filename,)
+    cache_dir = cache_dir or get_cache_dir()
+    name = create_chemicals.__module__.replace('.', '_')
+    file = os.path.join(cache_dir, f'{name}_{get_cache_key(files)}.pkl')
+    if os.path.exists(file):
+        try:
+            with open(file, 'rb') as f: chemicals, aliases = pickle.load(f)
+        except Exception as error:
+            warn(f'could not load cached chemicals ({error}); '
+                  'chemicals will be created', RuntimeWarning)
+        else:
+            # Aliases that were dropped on compilation are set again
+            for ID, alias in aliases:
+                if alias not in chemicals._index: chemicals.set_synonym(ID, alias)
+            return chemicals
+    chemicals = create_chemicals()
+    chemicals_tuple = chemicals.tuple
+    aliases = [(chemicals_tuple[i].ID, alias) for alias, i in chemicals._index.items()
+               if alias not in (chemicals_tuple[i].ID, chemicals_tuple[i].CAS)]
+    try:
+        data = pickle.dumps((chemicals, aliases))
+    except Exception as error:
+        raise TypeError(
+            f'chemicals created by {create_chemicals.__module__}.'
+            f'{create_chemicals.__name__} cannot be pickled ({error}); '
+             'property models must be defined at module level'
+        ) from error
+    temporary_file = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temporary file first, as other processes may be loading
+        fd, temporary_file = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f: f.write(data)
+        os.replace(temporary_file, file)
+    except Exception as error:
+        warn(f'could not cache chemicals ({error})', RuntimeWarning)
+        if temporary_file and os.path.exists(temporary_file): 
+            os.remove(temporary_file)
+    return chemicals
+
+def clear_chemicals_cache(cache_dir=None):
+    """Remove all cached chemicals."""
+    cache_dir = cache_dir or get_cache_dir()
+    if not os.path.exists(cache_dir): return
+    for i in os.listdir(cache_dir):
+        if i.endswith('.pkl'): os.remove(os.path.join(cache_dir, i))
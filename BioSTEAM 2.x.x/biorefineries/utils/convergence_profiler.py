@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+This module defines the ConvergenceProfiler class, which records the
+number of iterations, wall time, and residual history of each recycle
+system, and the time of each unit operation (mass and energy balances,
+specifications, design, and cost), while a system is simulated. Recycle
+systems and units are ranked by time, so that the loops that dominate
+simulation time can be targeted.
+
+"""
+import time
+import pandas as pd
+import biosteam as bst
+
+__all__ = ('ConvergenceProfiler',)
+
+#: tuple[str] Unit methods that are timed.
+unit_methods = ('run', '_run', '_design', '_cost')
+
+def get_recycle_systems(system):
+    """Return a list of the system, its subsystems, and its facility systems
+    (recursively) that have a recycle."""
+    systems = [system] if system.recycle else []
+    for i in (*system.subsystems, *system.facilities):
+        if isinstance(i, bst.System): systems.extend(get_recycle_systems(i))
+    return systems
+
+def get_first_unit(system):
+    """Return the first unit run in the path of the system, if any."""
+    for i in system.path:
+        if isinstance(i, bst.Unit): return i
+        elif isinstance(i, bst.System):
+            unit = get_first_unit(i)
+            if unit: return unit
+
+class ConvergenceProfiler:
+    """
+    Create a ConvergenceProfiler object that instruments a system (and all
+    its subsystems and units) while it is simulated.
+
+    Parameters
+    ----------
+    system : System
+        System to profile.
+
+    Examples
+    --------
+    >>> from biorefineries import wheatstraw as ws
+    >>> from biorefineries.utils import ConvergenceProfiler
+    >>> profiler = ConvergenceProfiler(ws.wheatstraw_sys)
+    >>> profiler.simulate()
+    >>> profiler.show() # Ranked recycle systems and units
+    >>> profiler.residual_history('LP_dist_sys') # Errors at each iteration
+
+    Notes
+    -----
+    Only the profiled system is instrumented: the convergence method of each
+    of its recycle systems and the methods of its units are wrapped while
+    simulating (the System class is left as is). Iterations and errors are
+    read from the counters that biosteam keeps for each system, at the
+    start of each iteration (when the first unit of the recycle system runs)
+    and after convergence. Profiling adds a small overhead to each iteration
+    and unit method call.
+
+    """
+    __slots__ = ('system', 'simulation_time', 'system_records',
+                 'unit_records', 'residuals', '_stack', '_iterations')
+
+    def __init__(self, system):
+        #: [System] System to profile.
+        self.system = system
+        #: [float] Total wall time of profiled simulations [s].
+        self.simulation_time = 0.
+        #: dict[System, list] Number of calls, iterations, total time [s],
+        #: and time in subsystems [s] by system.
+        self.system_records = {}
+        #: dict[Unit, dict[str, list]] Number of calls and total time [s]
+        #: of unit methods by unit.
+        self.unit_records = {}
+        #: dict[System, list[tuple]] Call number, iteration, molar flow rate
+        #: error [kmol/hr], relative molar flow rate error, temperature error [K],
+        #: and time of iteration [s] by system.
+        self.residuals = {}
+        self._stack = []
+        self._iterations = {}
+
+    def reset(self):
+        """Remove all records."""
+        self.simulation_time = 0.
+        self.system_records.clear()
+        self.unit_records.clear()
+        self.residuals.clear()
+        self._stack.clear()
+        self._iterations.clear()
+
+    def _get_system_record(self, system):
+        records = self.system_records
+        if system not in records: records[system] = [0, 0, 0., 0.]
+        return records[system]
+
+    def _record_iterations(self, system):
+        # Record the errors of each iteration the system completed since the
+        # last record, as counted by biosteam
+        iteration = system._iter
+        call, last_iteration, t = self._iterations[system]
+        if iteration <= last_iteration: return
+        now = time.perf_counter()
+        self._get_system_record(system)[1] += iteration - last_iteration
+        self.residuals.setdefault(system, []).append(
+            (call, iteration, system._mol_error,
+             system._rmol_error, system._T_error, now - t)
+        )
+        self._iterations[system] = (call, iteration, now)
+
+    def _patch_systems(self):
+        stack = self._stack
+        get_record = self._get_system_record
+        record_iterations = self._record_iterations
+        iterations = self._iterations
+        originals = {}
+        first_units = {}
+        for system in get_recycle_systems(self.system):
+            converge = system._converge_method
+            originals[system] = converge
+            def converge_method(system=system, converge=converge):
+                record = get_record(system)
+                record[0] += 1
+                stack.append(system)
+                t = time.perf_counter()
+                iterations[system] = (record[0], 0, t)
+                try:
+                    converge()
+                finally:
+                    record_iterations(system)
+                    del iterations[system]
+                    elapsed = time.perf_counter() - t
+                    stack.pop()
+                    record[2] += elapsed
+                    if stack: get_record(stack[-1])[3] += elapsed
+            converge_method.__name__ = converge.__name__
+            system._converge_method = converge_method
+            unit = get_first_unit(system)
+            if unit: first_units.setdefault(unit, []).append(system)
+        # Each iteration of a recycle system starts by running its first unit
+        for unit, systems in first_units.items():
+            run = unit.run
+            def run_iteration(run=run, systems=systems):
+                for i in systems:
+                    if i in iterations: record_iterations(i)
+                return run()
+            run_iteration.__name__ = run.__name__
+            run_iteration.__doc__ = run.__doc__
+            unit.run = run_iteration
+        return originals
+
+    def _unpatch_systems(self, originals):
+        for system, converge in originals.items():
+            system._converge_method = converge
+
+    def _patch_units(self):
+        originals = {}
+        for unit in self.system.units:
+            dct = unit.__dict__
+            records = self.unit_records.get(unit) or {i: [0, 0.] for i in unit_methods}
+            self.unit_records[unit] = records
+            originals[unit] = {i: dct[i] for i in unit_methods if i in dct}
+            for name in unit_methods:
+                setattr(unit, name, self._timed(getattr(unit, name), records[name]))
+        return originals
+
+    def _unpatch_units(self, originals):
+        for unit, methods in originals.items():
+            dct = unit.__dict__
+            for name in unit_methods:
+                if name in methods: dct[name] = methods[name]
+                else: del dct[name]
+
+    @staticmethod
+    def _timed(f, record):
+        def g(*args, **kwargs):
+            t = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                record[0] += 1
+                record[1] += time.perf_counter() - t
+        g.__name__ = f.__name__
+        g.__doc__ = f.__doc__
+        return g
+
+    def simulate(self):
+        """Simulate the system while recording convergence and unit times."""
+        unit_originals = self._patch_units()
+        try:
+            system_originals = self._patch_systems()
+            try:
+                t = time.perf_counter()
+                self.system.simulate()
+                self.simulation_time += time.perf_counter() - t
+            finally:
+                self._unpatch_systems(system_originals)
+        finally:
+            self._unpatch_units(unit_originals)
+
+    @staticmethod
+    def _get_ID(system):
+        return system.ID or repr(system)
+
+    def _get_system(self, ID):
+        for system in self.system_records:
+            if self._get_ID(system) == ID: return system
+        raise ValueError(f"no system with ID '{ID}' was profiled")
+
+    def system_report(self):
+        """Return a DataFrame of recycle systems ranked by time."""
+        simulation_time = self.simulation_time or 1.
+        data = []
+        index = []
+        residuals = self.residuals
+        for system, (calls, iterations, total, nested) in self.system_records.items():
+            history = residuals.get(system)
+            if history:
+                *_, mol_error, rmol_error, T_error, _ = history[-1]
+            else:
+                mol_error = rmol_error = T_error = 0.
+            index.append(self._get_ID(system))
+            data.append((
+                calls, iterations, iterations / calls if calls else 0.,
+                total, total - nested, 1000. * total / iterations if iterations else 0.,
+                100. * total / simulation_time, mol_error, rmol_error, T_error,
+            ))
+        df = pd.DataFrame(data, index=index, columns=(
+            'Calls', 'Iterations', 'Iterations per call', 'Time [s]',
+            'Time excluding subsystems [s]', 'Time per iteration [ms]',
+            'Simulation time [%]', 'Last mol error [kmol/hr]',
+            'Last rmol error', 'Last T error [K]',
+        ))
+        df.index.name = 'System'
+        return df.sort_values('Time excluding subsystems [s]', ascending=False)
+
+    def unit_report(self):
+        """Return a DataFrame of units ranked by total time."""
+        simulation_time = self.simulation_time or 1.
+        data = []
+        index = []
+        for unit, records in self.unit_records.items():
+            calls, run_time = records['run']
+            _, _run_time = records['_run']
+            _, design_time = records['_design']
+            _, cost_time = records['_cost']
+            total = run_time + design_time + cost_time
+            index.append(unit.ID)
+            data.append((
+                unit.line, calls, _run_time, run_time - _run_time,
+                design_time, cost_time, total, 100. * total / simulation_time,
+            ))
+        df = pd.DataFrame(data, index=index, columns=(
+            'Unit operation', 'Runs', 'Mass and energy balance [s]',
+            'Specification [s]', 'Design [s]', 'Cost [s]', 'Time [s]',
+            'Simulation time [%]',
+        ))
+        df.index.name = 'Unit'
+        return df.sort_values('Time [s]', ascending=False)
+
+    def residual_history(self, system):
+        """Return a DataFrame of convergence errors at each iteration of a
+        recycle system (or system ID)."""
+        if isinstance(system, str): system = self._get_system(system)
+        return pd.DataFrame(self.residuals.get(system, []), columns=(
+            'Call', 'Iteration', 'Mol error [kmol/hr]', 'Rmol error',
+            'T error [K]', 'Time [s]',
+        ))
+
+    def show(self, N=10):
+        """Print the top `N` recycle systems and units ranked by time."""
+        print(f"{type(self).__name__}: {self._get_ID(self.system)} "
+              f"simulated in {self.simulation_time:.3g} s")
+        with pd.option_context('display.max_columns', None, 'display.width', 200):
+            print('\nRecycle systems:')
+            print(self.system_report().head(N))
+            print('\nUnits:')
+            print(self.unit_report().head(N))
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self._get_ID(self.system)}>"
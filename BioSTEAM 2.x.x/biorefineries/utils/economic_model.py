@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+This module defines the EconomicFastPathModel class, a biosteam.Model that
+only simulates the system when a parameter that changes the mass and energy
+balances (i.e., a 'coupled' parameter) changes.
+
+"""
+import numpy as np
+import biosteam as bst
+
+__all__ = ('EconomicFastPathModel',)
+
+class EconomicFastPathModel(bst.Model):
+    """
+    Create an EconomicFastPathModel object that reuses the last converged
+    system for samples that only change economic parameters. Parameters
+    that change the mass and energy balances must be defined with
+    kind='coupled'; all other parameters (e.g., prices, IRR, duration) are
+    set without simulating the system. Samples are evaluated in an order
+    that groups rows with the same coupled parameter values, so each group
+    is simulated once.
+
+    Parameters
+    ----------
+    system : System
+    metrics : Iterable[Metric], optional
+        Metrics to be evaluated by model.
+    specification=None : Function, optional
+        Loads specifications once all parameters are set.
+    parameters=None : Iterable[Parameter], optional
+        Parameters to sample from.
+    exception_hook='warn' : callable(exception, sample), optional
+        Function called after a failed evaluation.
+
+    Notes
+    -----
+    All parameter setters are called for every sample (they are assumed to
+    be cheap), so setters that depend on each other stay consistent. After
+    a failed evaluation, the system is reset and the next sample is
+    simulated. The number of system simulations is kept in the
+    `simulations` attribute.
+
+    """
+    __slots__ = ('simulations',)
+
+    def __init__(self, system, metrics=None, specification=None,
+                 parameters=None, exception_hook='warn'):
+        super().__init__(system, metrics, specification, parameters, exception_hook)
+        self.simulations = 0
+
+    def load_samples(self, samples):
+        super().load_samples(samples)
+        # The system may have changed since the last evaluation
+        self._sample_cache = None
+
+    def _reset_system(self):
+        # The last converged system is lost, so the next sample is simulated
+        self._sample_cache = None
+        super()._reset_system()
+
+    def _load_sample_order(self, samples, parameters):
+        # Coupled parameters are the primary sorting keys,
+        # but np.lexsort uses the last key as the primary key
+        coupled = [i for i, p in enumerate(parameters) if p.kind == 'coupled']
+        others = [i for i, p in enumerate(parameters) if p.kind != 'coupled']
+        keys = samples[:, others[::-1] + coupled[::-1]].T
+        self._index = list(np.lexsort(keys)) if keys.size else list(range(samples.shape[0]))
+
+    def _update_state(self, sample, thorough=True):
+        parameters = self._parameters
+        cache = self._sample_cache
+        try:
+            for p, x in zip(parameters, sample): p.setter(x)
+            if cache is None:
+                changed = parameters
+            else:
+                changed = [p for p, x, y in zip(parameters, sample, cache) if x != y]
+            if any([p.kind == 'coupled' for p in changed]):
+                self._specification() if self._specification else self._system.simulate()
+                self.simulations += 1
+            else:
+                for p in changed:
+                    if p.kind in ('design', 'cost'): p.simulate()
+            self._sample_cache = sample.copy()
+        except Exception as Error:
+            self._sample_cache = None
+            raise Error
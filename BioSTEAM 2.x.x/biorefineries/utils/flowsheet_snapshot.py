@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+This module defines the FlowsheetSnapshot class, which holds the stream
+states (including recycles), stream prices, and unit design, cost, and
+utility results of a converged system, so that the baseline of a
+biorefinery can be restored without simulating. Snapshots are saved on disk
+under a key that hashes the source and data files of the biorefinery (and of
+the biorefineries it imports), the configuration, and the
+biosteam/thermosteam versions; any change in these forces a new simulation.
+
+"""
+import os
+import sys
+import ast
+import pickle
+import hashlib
+import biosteam as bst
+import thermosteam as tmo
+from copy import deepcopy
+from warnings import warn
+from .system_state import SystemState
+from .chemicals_cache import get_cache_dir
+
+__all__ = ('FlowsheetSnapshot', 'load_snapshot', 'save_snapshot',
+           'get_package_files', 'get_source_hash')
+
+#: tuple[str] Extensions of source and data files of biorefineries.
+source_extensions = ('.py', '.yaml', '.yml', '.xlsx', '.xls', '.csv', '.tsv', '.json', '.txt')
+
+def get_utility_stream_data(heat_utility):
+    inlet = heat_utility.inlet_utility_stream
+    outlet = heat_utility.outlet_utility_stream
+    return inlet.mol.copy(), outlet.phase, outlet.T, outlet.P
+
+def set_utility_stream_data(heat_utility, data):
+    mol, phase, T, P = data
+    heat_utility.inlet_utility_stream.mol[:] = mol
+    # The outlet shares flow rate data with the inlet
+    outlet = heat_utility.outlet_utility_stream
+    outlet.phase = phase
+    outlet.T = T
+    outlet.P = P
+
+class FlowsheetSnapshot(SystemState):
+    """
+    Create a FlowsheetSnapshot object from a converged system.
+
+    Parameters
+    ----------
+    system : System
+        Converged system.
+    **results
+        Other results to save along with the system (e.g., IRR).
+
+    Examples
+    --------
+    >>> from biorefineries import corn as cn
+    >>> from biorefineries.utils import FlowsheetSnapshot
+    >>> snapshot = FlowsheetSnapshot(cn.corn_sys, IRR=cn.corn_tea.IRR)
+    >>> snapshot.restore(cn.corn_sys)
+
+    """
+    __slots__ = ('prices', 'unit_IDs', 'unit_data', 'results')
+
+    def __init__(self, system, **results):
+        super().__init__(system)
+        streams = self._get_streams(system)
+        #: list[float] Prices of streams [USD/kg].
+        self.prices = [i.price for i in streams]
+        units = self._get_units(system)
+        #: tuple[str] IDs of units.
+        self.unit_IDs = tuple([i.ID for i in units])
+        #: list[tuple] Design, cost, and utility results of units.
+        self.unit_data = [self._get_unit_data(i) for i in units]
+        #: dict Other results.
+        self.results = results
+
+    @staticmethod
+    def _get_units(system):
+        return sorted(system.units, key=lambda i: str(i.ID))
+
+    @staticmethod
+    def _get_unit_data(unit):
+        heat_utilities = [
+            (i.ID, get_utility_stream_data(i) if i.agent else None, i.flow, i.duty, i.unit_duty, i.cost, i.heat_transfer_efficiency,
+             i.T_pinch, i.iscooling)
+            for i in unit.heat_utilities
+        ]
+        power_utility = unit.power_utility
+        return (deepcopy(unit.design_results),
+                deepcopy(unit.baseline_purchase_costs),
+                deepcopy(unit.purchase_costs),
+                deepcopy(unit.installed_costs),
+                heat_utilities,
+                (power_utility.consumption, power_utility.production))
+
+    @staticmethod
+    def _set_unit_data(unit, data):
+        (design_results, baseline_purchase_costs, purchase_costs,
+         installed_costs, heat_utilities, power_utility) = data
+        unit.design_results = deepcopy(design_results)
+        unit.baseline_purchase_costs = deepcopy(baseline_purchase_costs)
+        unit.purchase_costs = deepcopy(purchase_costs)
+        unit.installed_costs = deepcopy(installed_costs)
+        if len(unit.heat_utilities) != len(heat_utilities):
+            unit.heat_utilities = tuple([bst.HeatUtility() for i in heat_utilities])
+        HeatUtility = bst.HeatUtility
+        for hu, (ID, streams, flow, duty, unit_duty, cost, heat_transfer_efficiency,
+                 T_pinch, iscooling) in zip(unit.heat_utilities, heat_utilities):
+            if ID:
+                # Agents are not pickled with the snapshot; use the current ones
+                hu.load_agent(HeatUtility.get_agent(ID))
+                set_utility_stream_data(hu, streams)
+            else:
+                hu.empty()
+            hu.flow = flow
+            hu.duty = duty
+            hu.unit_duty = unit_duty
+            hu.cost = cost
+            hu.heat_transfer_efficiency = heat_transfer_efficiency
+            hu.T_pinch = T_pinch
+            hu.iscooling = iscooling
+        unit.power_utility.consumption, unit.power_utility.production = power_utility
+
+    def restore(self, system):
+        """Set the streams and unit results of the system to this snapshot."""
+        units = self._get_units(system)
+        if tuple([i.ID for i in units]) != self.unit_IDs:
+            raise RuntimeError('system units do not match the snapshot; '
+                               'cannot restore snapshot')
+        super().restore(system)
+        for stream, price in zip(self._get_streams(system), self.prices):
+            stream.price = price
+        for unit, data in zip(units, self.unit_data):
+            self._set_unit_data(unit, data)
+
+    def __getstate__(self):
+        return (self.IDs, self.data, self.prices,
+                self.unit_IDs, self.unit_data, self.results)
+
+    def __setstate__(self, state):
+        (self.IDs, self.data, self.prices,
+         self.unit_IDs, self.unit_data, self.results) = state
+
+    def __repr__(self):
+        return (f'<{type(self).__name__}: {len(self.IDs)} streams, '
+                f'{len(self.unit_IDs)} units>')
+
+
+def get_root_directory():
+    """Return the directory of the biorefineries package."""
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def get_imported_packages(file, parts):
+    """
+    Return the names of packages imported by a source file (top level
+    names within biorefineries). `parts` are the names of the packages the
+    file is in, relative to the biorefineries directory.
+
+    """
+    with open(file, 'rb') as f:
+        try: tree = ast.parse(f.read())
+        except (SyntaxError, ValueError): return set()
+    packages = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for i in node.names:
+                names = i.name.split('.')
+                if len(names) > 1 and names[0] == 'biorefineries': packages.add(names[1])
+        elif isinstance(node, ast.ImportFrom):
+            module = node.module.split('.') if node.module else []
+            if node.level:
+                up = node.level - 1
+                if up > len(parts): continue
+                module = [*parts[:len(parts) - up], *module]
+            elif module and module[0] == 'biorefineries':
+                module = module[1:]
+            else:
+                continue
+            if module: packages.add(module[0])
+            else: packages.update([i.name for i in node.names])
+    return packages
+
+def get_package_files(package, root=None):
+    """
+    Return the source and data files (see `source_extensions`) of a
+    biorefinery package and of all biorefineries packages it imports
+    (recursively), including biorefineries/__init__.py.
+
+    """
+    root = root or get_root_directory()
+    files = []
+    file = os.path.join(root, '__init__.py')
+    if os.path.exists(file): files.append(file)
+    packages = [package]
+    visited = set()
+    while packages:
+        name = packages.pop()
+        if name in visited: continue
+        visited.add(name)
+        for path, folders, filenames in os.walk(os.path.join(root, name)):
+            folders[:] = sorted([i for i in folders if i != '__pycache__' and not i.startswith('.')])
+            parts = os.path.relpath(path, root).split(os.sep)
+            for filename in sorted(filenames):
+                if not filename.endswith(source_extensions): continue
+                file = os.path.join(path, filename)
+                files.append(file)
+                if not filename.endswith('.py'): continue
+                for i in get_imported_packages(file, parts):
+                    if i not in visited and os.path.exists(os.path.join(root, i, '__init__.py')):
+                        packages.append(i)
+    return sorted(files)
+
+def get_source_hash(package, *configuration, root=None):
+    """
+    Return a hash of all source and data files of a biorefinery package
+    (and of the biorefineries packages it imports), the configuration, and
+    the Python, thermosteam, and biosteam versions.
+
+    """
+    root = root or get_root_directory()
+    key = hashlib.sha256()
+    for i in (sys.version.split()[0], tmo.__version__, bst.__version__, repr(configuration)):
+        key.update(i.encode())
+    for file in get_package_files(package, root):
+        key.update(os.path.relpath(file, root).encode())
+        with open(file, 'rb') as f: key.update(f.read())
+    return key.hexdigest()[:16]
+
+def get_snapshot_file(package, *configuration):
+    """Return the file of the snapshot of a biorefinery, named by the hash of
+    its source and data files, configuration, and versions."""
+    return os.path.join(get_cache_dir(),
+                        f'{package}_snapshot_{get_source_hash(package, *configuration)}.pkl')
+
+def load_snapshot(system, package, *configuration):
+    """
+    Restore the system from the snapshot of the biorefinery and return the
+    snapshot. Return None if there is no snapshot for the current source
+    files, configuration, and versions. If the snapshot cannot be loaded or
+    does not match the system, a warning is issued and None is returned.
+
+    """
+    file = get_snapshot_file(package, *configuration)
+    if not os.path.exists(file): return None
+    try:
+        snapshot = FlowsheetSnapshot.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as error:
+        warn(f'could not load snapshot {file!r} ({error}); system will be simulated',
+             RuntimeWarning)
+        return None
+    if not isinstance(snapshot, FlowsheetSnapshot):
+        warn(f'{file!r} is not a snapshot; system will be simulated', RuntimeWarning)
+        return None
+    try:
+        snapshot.restore(system)
+    except RuntimeError as error:
+        warn(f'could not restore snapshot {file!r} ({error}); system will be simulated',
+             RuntimeWarning)
+        return None
+    return snapshot
+
+def save_snapshot(system, package, *configuration, **results):
+    """Save a snapshot of the converged system of the biorefinery and return it."""
+    snapshot = FlowsheetSnapshot(system, **results)
+    file = get_snapshot_file(package, *configuration)
+    os.makedirs(os.path.dirname(file), exist_ok=True)
+    temporary_file = file + f'.{os.getpid()}.tmp'
+    snapshot.save(temporary_file)
+    os.replace(temporary_file, file)
+    return snapshot
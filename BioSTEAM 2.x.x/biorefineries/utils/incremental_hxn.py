@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+This module defines the IncrementalHeatExchangerNetwork class, a heat
+exchanger network that keeps the stream matches of its last synthesis and,
+while the hot/cold streams, their temperature ordering, and the pinch are
+unchanged (e.g., between neighbouring points of a sweep), only re-rates the
+heat exchangers and utilities of the network.
+
+Stream matches are taken from the stream life cycles of the last synthesis,
+so this class depends on the results of HeatExchangerNetwork._cost in
+biosteam 2.28 (see the pin in setup.py).
+
+"""
+import numpy as np
+import biosteam as bst
+from warnings import catch_warnings, simplefilter
+from biosteam.units.facilities.hxn.hxn_synthesis import temperature_interval_pinch_analysis
+
+__all__ = ('IncrementalHeatExchangerNetwork',)
+
+class TopologyChanged(RuntimeError):
+    """RuntimeError regarding a network that cannot be re-rated."""
+
+
+def _get_topology(hxs, T_in_arr, T_out_arr, pinch_T_arr, N_cold, T_min_app):
+    # Ordering of shifted temperatures (as in the temperature interval pinch
+    # analysis) and position of each stream relative to the pinch
+    adj_T_in_arr = np.array(T_in_arr, dtype=float)
+    adj_T_out_arr = np.array(T_out_arr, dtype=float)
+    adj_T_in_arr[:N_cold] -= T_min_app
+    adj_T_out_arr[:N_cold] -= T_min_app
+    Ts = np.concatenate([adj_T_in_arr, adj_T_out_arr])
+    order = tuple(np.argsort(-Ts, kind='stable'))
+    sides = []
+    pinch = None
+    for i, T_pinch in enumerate(pinch_T_arr):
+        if abs(T_pinch - T_in_arr[i]) < 1e-6: sides.append(0)
+        elif abs(T_pinch - T_out_arr[i]) < 1e-6: sides.append(1)
+        else:
+            # Pinch temperatures of cold streams are already shifted
+            sides.append(2)
+            pinch = T_pinch if i < N_cold else T_pinch - T_min_app
+    rank = None if pinch is None else int((Ts > pinch + 1e-6).sum())
+    return tuple(hxs), T_min_app, order, (tuple(sides), rank)
+
+def _get_topology_change(old, new):
+    hxs_old, T_min_app_old, order_old, pinch_old = old
+    hxs_new, T_min_app_new, order_new, pinch_new = new
+    if T_min_app_old != T_min_app_new: return 'minimum approach temperature changed'
+    if len(hxs_old) != len(hxs_new) or any([i is not j for i, j in zip(hxs_old, hxs_new)]):
+        return 'hot/cold stream set changed'
+    if order_old != order_new: return 'temperature ordering changed'
+    if pinch_old != pinch_new: return 'pinch shifted'
+
+
+
+def _reversed(hx, cold):
+    s_in = hx.ins[0]
+    dH = hx.outs[0].H - s_in.H
+    tol = 1e-6 * abs(s_in.H) + 1.
+    return dH < -tol if cold else dH > tol
+
+
+class IncrementalHeatExchangerNetwork(bst.facilities.HeatExchangerNetwork):
+    """
+    Create an IncrementalHeatExchangerNetwork object that performs a pinch
+    analysis on the entire system's heating and cooling utility objects,
+    reusing the stream matches of the last synthesis when possible.
+
+    Parameters
+    ----------
+    ID : str
+        Unique name for the facility.
+    T_min_app : float
+        Minimum approach temperature observed during synthesis of heat exchanger network.
+    units : Iterable[Unit], optional
+        All unit operations available to the heat exchanger network. Defaults
+        to all unit operations in the system.
+    ignored : Iterable[Unit], optional
+        Unit operations ignored by the heat exchanger network.
+    incremental : bool, optional
+        Whether to reuse the stream matches of the last synthesis.
+        Defaults to True.
+    verbose : bool, optional
+        Whether to print the reason of each full synthesis after the first.
+        Defaults to False.
+
+    Examples
+    --------
+    >>> from biorefineries.utils.incremental_hxn import IncrementalHeatExchangerNetwork
+    >>> HXN = IncrementalHeatExchangerNetwork('HXN')
+    >>> # ... simulate system across a sweep ...
+    >>> HXN.N_syntheses, HXN.N_reuses
+    (3, 47)
+    >>> HXN.fallback_reasons
+    {'pinch shifted': 2}
+
+    Notes
+    -----
+    The temperature interval pinch analysis is always performed, as it
+    detects changes in the pinch. A full synthesis is performed if the heat
+    exchangers with utilities (i.e., hot and cold streams), the minimum
+    approach temperature, the ordering of shifted inlet and outlet
+    temperatures, or the position of the pinch changed. Otherwise, the inlets
+    of the network are updated and the heat exchangers of the last synthesis
+    are resimulated with the new outlet enthalpies and pinch temperature
+    limits. A full synthesis is also performed if re-rating fails, if a heat
+    exchanger or utility reverses its direction, or if the energy balance is
+    off by more than `tolerable_energy_balance_percent_error`.
+
+    """
+    #: [float] Maximum absolute percent error of the energy balance of a
+    #: re-rated network.
+    tolerable_energy_balance_percent_error = 2.
+
+    def __init__(self, ID='', T_min_app=5., units=None, ignored=None,
+                 incremental=True, verbose=False):
+        super().__init__(ID, T_min_app, units, ignored)
+        #: [bool] Whether to reuse the stream matches of the last synthesis.
+        self.incremental = incremental
+        #: [bool] Whether to print the reason of each full synthesis.
+        self.verbose = verbose
+        self.reset()
+
+    def reset(self):
+        """Forget the last synthesis and reset statistics."""
+        self._topology = None
+        self._first_stages = None
+        self._matches = None
+        self._utilities = None
+        self._network_system = None
+        #: [int] Number of full syntheses.
+        self.N_syntheses = 0
+        #: [int] Number of costings that re-rated the last network.
+        self.N_reuses = 0
+        #: dict[str, int] Number of full syntheses by reason (excluding the first).
+        self.fallback_reasons = {}
+        #: [str] Reason of the last full synthesis.
+        self.last_fallback_reason = None
+
+    def _cost(self):
+        if self.incremental and self._topology is not None:
+            try:
+                self._rerate()
+            except Exception as e:
+                reason = str(e) if isinstance(e, TopologyChanged) else f"re-rating failed ({type(e).__name__}: {e})"
+            else:
+                self.N_reuses += 1
+                return
+            self.last_fallback_reason = reason
+            self.fallback_reasons[reason] = self.fallback_reasons.get(reason, 0) + 1
+            if self.verbose: print(f"{self.ID}: full synthesis; {reason}")
+        self._topology = None
+        super()._cost()
+        self.N_syntheses += 1
+        self._load_network()
+
+    def _get_heat_utilities(self):
+        units = self.units or self.system.units
+        if self.ignored:
+            units = list(units)
+            for i in self.ignored:
+                if i in units: units.remove(i)
+        hx_utils = bst.process_tools.heat_exchanger_utilities_from_units(units)
+        hx_utils = [i for i in hx_utils if i.duty]
+        hx_utils.sort(key = lambda x: x.duty)
+        return hx_utils
+
+    def _load_network(self):
+        hxs = [i.heat_exchanger for i in self.original_heat_utils]
+        self._topology = _get_topology(hxs, self.inlet_Ts, self.outlet_Ts, self.pinch_Ts,
+                                       len(self.cold_indices), self.T_min_app)
+        # Inlets of the network are either the original streams or the
+        # streams at the pinch temperature (if not matched on both sides);
+        # stream indices of each unit are those of the life cycles it is in
+        first_stages = []
+        stream_indices = {}
+        for life_cycle, stream in zip(self.stream_life_cycles, self.streams):
+            stages = life_cycle.life_cycle
+            stage = stages[0]
+            s_in = stage.unit.ins[stage.index]
+            first_stages.append((stage.unit, stage.index, abs(s_in.T - stream.T) > 1e-3))
+            for stage in stages:
+                indices = stream_indices.setdefault(id(stage.unit), [None, None])
+                indices[stage.index] = life_cycle.index
+        self._first_stages = first_stages
+        self._matches = [(hx, *stream_indices[id(hx)]) for hx in self.new_HXs]
+        self._utilities = [(hx, stream_indices[id(hx)][0]) for hx in self.new_HX_utils]
+        self._network_system = bst.System.from_units(None, [*self.new_HXs, *self.new_HX_utils])
+
+    def _rerate(self):
+        T_min_app = self.T_min_app
+        hx_utils = self._get_heat_utilities()
+        pinch_T_arr, hot_util_load, cold_util_load, T_in_arr, T_out_arr,\
+        T_hot_side_arr, T_cold_side_arr, hus_heating, hus_cooling, hxs_heating,\
+        hxs_cooling, hxs, hot_indices, cold_indices, streams, hx_utils_rearranged, \
+        H_out_arr, streams_quenched = temperature_interval_pinch_analysis(hx_utils, T_min_app=T_min_app)
+        topology = _get_topology(hxs, T_in_arr, T_out_arr, pinch_T_arr,
+                                 len(cold_indices), T_min_app)
+        reason = _get_topology_change(self._topology, topology)
+        if reason: raise TopologyChanged(reason)
+        for (unit, index, at_pinch), stream, T_pinch in zip(self._first_stages, streams, pinch_T_arr):
+            s_in = unit.ins[index]
+            s_in.copy_like(stream)
+            if at_pinch: s_in.vle(T=T_pinch, P=s_in.P)
+        for hx, a, b in self._matches:
+            hx.H_lim0 = H_out_arr[a]
+            hx.T_lim1 = pinch_T_arr[b]
+            hx.dT = T_min_app
+        for hx, a in self._utilities:
+            hx.H = H_out_arr[a]
+        with catch_warnings():
+            simplefilter('ignore', RuntimeWarning)
+            self._network_system.simulate()
+        cold_indices = set(cold_indices)
+        for hx, a, b in self._matches:
+            if _reversed(hx, a in cold_indices): raise TopologyChanged(f'{hx.ID} reversed direction')
+        for hx, a in self._utilities:
+            if _reversed(hx, a in cold_indices): raise TopologyChanged(f'{hx.ID} reversed duty')
+        self.pinch_Ts = pinch_T_arr
+        self.inlet_Ts = T_in_arr
+        self.outlet_Ts = T_out_arr
+        self._load_costs(hx_utils, hxs, hx_utils_rearranged)
+        error = self.energy_balance_percent_error
+        if abs(error) > self.tolerable_energy_balance_percent_error:
+            raise TopologyChanged(f'energy balance off by {error:.2f} %')
+
+    def _load_costs(self, hx_utils, hxs, hx_utils_rearranged):
+        # Same accounting as a full synthesis
+        new_HXs = [i[0] for i in self._matches]
+        new_HX_utils = [i[0] for i in self._utilities]
+        original_purchase_costs = [hx.purchase_cost for hx in hxs]
+        original_installed_costs = [hx.installed_cost for hx in hxs]
+        new_purchase_costs_HXp = [hx.purchase_cost for hx in new_HXs]
+        new_purchase_costs_HXu = [hx.purchase_cost for hx in new_HX_utils]
+        new_installed_costs_HXp = [hx.installed_cost for hx in new_HXs]
+        new_installed_costs_HXu = [hx.installed_cost for hx in new_HX_utils]
+        hu_sums1 = bst.HeatUtility.sum_by_agent(hx_utils_rearranged)
+        new_heat_utils = sum([hx.heat_utilities for hx in new_HX_utils], ())
+        hu_sums2 = bst.HeatUtility.sum_by_agent(new_heat_utils)
+        for hu in hu_sums1: hu.reverse()
+        hus_final = tuple(bst.HeatUtility.sum_by_agent(hu_sums1 + hu_sums2))
+        Q_bal = (
+            (2.*sum([abs(i.Q) for i in new_HXs])
+             + sum([abs(i.duty * i.agent.heat_transfer_efficiency) for i in hu_sums2]))
+            / sum([abs(i.duty * i.agent.heat_transfer_efficiency) for i in hu_sums1])
+        )
+        self.installed_costs['Heat exchangers'] = (
+            sum(new_installed_costs_HXp)
+            + sum(new_installed_costs_HXu)
+            - sum(original_installed_costs)
+        )
+        self.purchase_costs['Heat exchangers'] = self.baseline_purchase_costs['Heat exchangers'] = (
+            sum(new_purchase_costs_HXp)
+            + sum(new_purchase_costs_HXu)
+            - sum(original_purchase_costs)
+        )
+        self.heat_utilities = hus_final
+        self.energy_balance_percent_error = 100*(Q_bal - 1)
+        self.original_heat_utils = hx_utils_rearranged
+        self.original_purchase_costs = original_purchase_costs
+        self.original_utility_costs = hu_sums1
+        self.new_purchase_costs_HXp = new_purchase_costs_HXp
+        self.new_purchase_costs_HXu = new_purchase_costs_HXu
+        self.new_utility_costs = hu_sums2
+        new_hus = bst.process_tools.heat_exchanger_utilities_from_units(new_HX_utils)
+        self.original_heat_util_load = sum([hu.duty for hu in hx_utils if hu.duty > 0])
+        self.original_cool_util_load = sum([abs(hu.duty) for hu in hx_utils if hu.duty < 0])
+        self.actual_heat_util_load = sum([hu.duty for hu in new_hus if hu.duty > 0])
+        self.actual_cool_util_load = sum([abs(hu.duty) for hu in new_hus if hu.duty < 0])
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+This module defines the MaterialLCA class, which computes life cycle impacts
+(e.g., GWP and FEC) of material flows with characterization factors
+precomputed as vectors aligned with the chemicals index. All impact
+categories, and breakdowns by chemical and by stream, are computed from
+one matrix of stream flow rates; batches of flow rates (e.g., one per
+Monte Carlo sample) are evaluated at once.
+
+"""
+import numpy as np
+
+__all__ = ('MaterialLCA',)
+
+class MaterialLCA:
+    """
+    Create a MaterialLCA object that computes life cycle impacts of material
+    flows (e.g., feeds of a biorefinery).
+
+    Parameters
+    ----------
+    streams : Iterable[Stream]
+        Streams with life cycle impacts.
+    CF_streams : dict[str, Stream]
+        Streams of characterization factors (impact per kg as "kg/hr" flow
+        rates) by impact category (e.g., {'GWP': GWP_CF_stream}).
+
+    Examples
+    --------
+    >>> from biorefineries.utils import MaterialLCA
+    >>> LCA = MaterialLCA(LCA_streams, {'GWP': CFs['GWP_CF_stream'],
+    ...                                 'FEC': CFs['FEC_CF_stream']})
+    >>> GWP, FEC = LCA.get_impacts() # Impact per hour
+    >>> LCA.get_impact_breakdown('GWP') # Impact per hour by chemical ID
+
+    """
+    __slots__ = ('streams', 'categories', 'chemicals', 'CF_matrix')
+
+    def __init__(self, streams, CF_streams):
+        #: tuple[Stream] Streams with life cycle impacts.
+        self.streams = tuple(streams)
+        #: tuple[str] Impact categories.
+        self.categories = tuple(CF_streams)
+        CF_streams = tuple(CF_streams.values())
+        chemicals = CF_streams[0].chemicals
+        for i in (*self.streams, *CF_streams):
+            if i.chemicals is not chemicals:
+                raise ValueError('all streams must share the same chemicals')
+        #: CompiledChemicals Chemicals of streams.
+        self.chemicals = chemicals
+        MW = chemicals.MW
+        #: array[categories x chemicals] Characterization factors per kmol.
+        self.CF_matrix = np.array([i.mol * MW * MW for i in CF_streams])
+
+    def _get_category_index(self, category):
+        try:
+            return self.categories.index(category)
+        except ValueError:
+            raise ValueError(f"no impact category '{category}'; "
+                             f"categories are {self.categories}") from None
+
+    def get_flow_matrix(self):
+        """Return an array of the molar flow rates of all streams
+        (streams x chemicals) [kmol/hr]."""
+        return np.array([i.mol for i in self.streams])
+
+    def get_flows(self):
+        """Return the total molar flow rate of all streams by chemical [kmol/hr],
+        e.g., to save a snapshot of each Monte Carlo sample."""
+        return self.get_flow_matrix().sum(0)
+
+    def get_impacts(self, flows=None):
+        """Return an array of impacts per hour by category. Flows may be
+        given as a 1d array of molar flow rates or a 2d array of one
+        snapshot per row (in which case a 2d array is returned)."""
+        if flows is None: flows = self.get_flows()
+        return np.asarray(flows) @ self.CF_matrix.T
+
+    def get_impact(self, category, flows=None):
+        """Return the impact per hour of a category."""
+        if flows is None: flows = self.get_flows()
+        return np.asarray(flows) @ self.CF_matrix[self._get_category_index(category)]
+
+    def get_impacts_by_chemical(self, flows=None):
+        """Return an array of impacts per hour (categories x chemicals)."""
+        if flows is None: flows = self.get_flows()
+        return self.CF_matrix * flows
+
+    def get_impacts_by_stream(self):
+        """Return an array of impacts per hour (streams x categories)."""
+        return self.get_flow_matrix() @ self.CF_matrix.T
+
+    def get_impact_breakdown(self, category, flows=None):
+        """Return a dictionary of nonzero impacts per hour of a category
+        by chemical ID."""
+        if flows is None: flows = self.get_flows()
+        impacts = self.CF_matrix[self._get_category_index(category)] * flows
+        IDs = self.chemicals.IDs
+        return {IDs[i]: impacts[i] for i in np.flatnonzero(impacts)}
+
+    def get_chemical_impact(self, category, ID, flows=None):
+        """Return the impact per hour of a category due to a chemical."""
+        index = self.chemicals.index(ID)
+        if flows is None:
+            flow = sum([i.mol[index] for i in self.streams])
+        else:
+            flow = np.asarray(flows)[..., index]
+        return self.CF_matrix[self._get_category_index(category), index] * flow
+
+    def __repr__(self):
+        return (f"<{type(self).__name__}: {', '.join(self.categories)}; "
+                f"{len(self.streams)} streams>")
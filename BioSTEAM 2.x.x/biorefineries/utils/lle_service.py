@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+This module defines the LLEService class, which performs liquid-liquid
+equilibrium for one unit operation (or specification) and remembers the
+last phase split. The solve is skipped when the feed composition and
+temperature are within tolerance of the last solution; otherwise, the
+minimization of the Gibbs free energy starts from the last phase split.
+Skipped solves are counted to gauge the benefit.
+
+"""
+import inspect
+import numpy as np
+import pandas as pd
+import thermosteam as tmo
+from scipy.optimize import differential_evolution
+from thermosteam.equilibrium.lle import lle_objective_function
+
+__all__ = ('LLEService', 'get_lle_report')
+
+#: [bool] Whether differential evolution accepts an initial guess.
+accepts_initial_guess = 'x0' in inspect.signature(differential_evolution).parameters
+
+class LLEService:
+    """
+    Create an LLEService object that performs liquid-liquid equilibrium,
+    reusing the last solution.
+
+    Parameters
+    ----------
+    ID : str, optional
+        Name of service in reports (e.g., ID of the unit operation).
+    composition_tolerance : float, optional
+        Maximum absolute difference in molar fractions of the feed to reuse
+        the last phase split. Defaults to 1e-6 (as thermosteam's LLE cache).
+    temperature_tolerance : float, optional
+        Maximum absolute difference in temperature to reuse the last phase
+        split [K]. Defaults to 0.1.
+    warm_start : bool, optional
+        Whether to start the minimization of the Gibbs free energy from the
+        last phase split. Defaults to True.
+
+    Examples
+    --------
+    >>> from biorefineries.utils.lle_service import LLEService
+    >>> lle = LLEService('S404')
+    >>> ms = lle(feed, top_chemical='Hexanol') # MultiStream at equilibrium
+    >>> lle.lle(feed, top, bottom, top_chemical='Hexanol') # As in thermosteam.separations.lle
+    >>> lle # Hits are calls that skipped the solve
+    <LLEService: S404, 12 hits, 3 solves (2 warm starts)>
+
+    Notes
+    -----
+    A hit reuses the fraction of each chemical in each phase from the last
+    solution, so the mass balance is always closed. Activity coefficient
+    objects (with their group interaction parameters) are kept while the
+    chemicals in equilibrium do not change.
+
+    """
+    __slots__ = ('ID', 'composition_tolerance', 'temperature_tolerance',
+                 'warm_start', 'multi_stream', 'N_calls', 'N_hits', 'N_solves',
+                 'N_warm_starts', '_lle_chemicals', '_gamma', '_top_chemical',
+                 '_z_mol', '_T', '_split')
+
+    #: dict Options of differential evolution.
+    differential_evolution_options = {'seed': 0,
+                                      'popsize': 12,
+                                      'tol': 0.002}
+
+    def __init__(self, ID='', composition_tolerance=1e-6, temperature_tolerance=0.1,
+                 warm_start=True):
+        #: [str] Name of service in reports.
+        self.ID = ID
+        #: [float] Maximum absolute difference in molar fractions of the
+        #: feed to reuse the last phase split.
+        self.composition_tolerance = composition_tolerance
+        #: [float] Maximum absolute difference in temperature to reuse the
+        #: last phase split [K].
+        self.temperature_tolerance = temperature_tolerance
+        #: [bool] Whether to start the minimization from the last phase split.
+        self.warm_start = warm_start
+        #: [MultiStream] Results of the last call.
+        self.multi_stream = None
+        self.reset()
+
+    def reset(self):
+        """Forget the last solution and reset statistics."""
+        #: [int] Number of calls.
+        self.N_calls = 0
+        #: [int] Number of calls that reused the last phase split.
+        self.N_hits = 0
+        #: [int] Number of minimizations of the Gibbs free energy.
+        self.N_solves = 0
+        #: [int] Number of minimizations started from the last phase split.
+        self.N_warm_starts = 0
+        self._lle_chemicals = None
+        self._gamma = None
+        self._top_chemical = None
+        self._z_mol = None
+        self._T = None
+        self._split = None
+
+    @property
+    def hit_rate(self):
+        """[float] Fraction of calls that reused the last phase split."""
+        N = self.N_calls
+        return self.N_hits / N if N else 0.
+
+    def _solve(self, mol, T, x0):
+        gamma = self._gamma
+        bounds = np.zeros([mol.size, 2])
+        bounds[:, 1] = mol
+        options = self.differential_evolution_options
+        if x0 is not None: options = {**options, 'x0': np.clip(x0, 0., mol)}
+        result = differential_evolution(lle_objective_function, bounds,
+                                        (mol, T, gamma.f, gamma.args), **options)
+        return result.x
+
+    def __call__(self, feed, T=None, P=None, top_chemical=None):
+        """
+        Perform liquid-liquid equilibrium of the feed and return a MultiStream
+        object with the liquid phases ('l' and 'L').
+
+        Parameters
+        ----------
+        feed : Stream or MultiStream
+            Feed (all phases are mixed).
+        T : float, optional
+            Operating temperature [K]. Defaults to the temperature of the feed.
+        P : float, optional
+            Operating pressure [Pa]. Defaults to the pressure of the feed.
+        top_chemical : str, optional
+            Identifier of chemical that will be favored in the "liquid" phase.
+
+        """
+        thermo = feed.thermo
+        ms = self.multi_stream
+        if ms is None or ms.thermo is not thermo:
+            self.multi_stream = ms = tmo.MultiStream(None, phases=('l', 'L'), thermo=thermo)
+            self._lle_chemicals = None
+        ms.T = feed.T if T is None else T
+        ms.P = feed.P if P is None else P
+        T = ms.T
+        imol = ms.imol
+        if isinstance(feed, tmo.MultiStream):
+            mol = feed.imol.data.sum(0)
+        else:
+            mol = feed.mol
+        imol['l'] = 0.
+        imol['L'] = mol
+        self.N_calls += 1
+        chemicals = ms.chemicals
+        index = chemicals.get_lle_indices(mol > 0)
+        mol = mol[index]
+        F_mol = mol.sum()
+        if not F_mol: return ms
+        z_mol = mol / F_mol
+        lle_chemicals = tuple([chemicals.tuple[i] for i in index])
+        same_chemicals = lle_chemicals == self._lle_chemicals and top_chemical == self._top_chemical
+        if (same_chemicals
+            and abs(T - self._T) <= self.temperature_tolerance
+            and np.abs(z_mol - self._z_mol).max() <= self.composition_tolerance):
+            self.N_hits += 1
+            mol_l = self._split * mol
+        else:
+            if same_chemicals and self.warm_start and accepts_initial_guess:
+                x0 = (1. - self._split) * mol
+                self.N_warm_starts += 1
+            else:
+                x0 = None
+                if lle_chemicals != self._lle_chemicals:
+                    self._gamma = thermo.Gamma(lle_chemicals)
+            mol_L = self._solve(mol, T, x0)
+            mol_l = mol - mol_L
+            self.N_solves += 1
+            if top_chemical:
+                MW = chemicals.MW[index]
+                mass_L = mol_L * MW
+                mass_l = mol_l * MW
+                top_chemical_index = [i.ID for i in lle_chemicals].index(top_chemical)
+                if (mass_L[top_chemical_index] / mass_L.sum()
+                    > mass_l[top_chemical_index] / mass_l.sum()):
+                    mol_l = mol_L
+            self._split = mol_l / mol
+            self._lle_chemicals = lle_chemicals
+            self._top_chemical = top_chemical
+            self._z_mol = z_mol
+            self._T = T
+        imol['l'][index] = mol_l
+        imol['L'][index] = mol - mol_l
+        return ms
+
+    def lle(self, feed, top, bottom, top_chemical=None, efficiency=1.0):
+        """
+        Run LLE mass and energy balance (as `thermosteam.separations.lle`).
+
+        Parameters
+        ----------
+        feed : Stream
+            Mixed feed.
+        top : Stream
+            Top fluid.
+        bottom : Stream
+            Bottom fluid.
+        top_chemical : str, optional
+            Identifier of chemical that will be favored in the top fluid.
+        efficiency=1. : float,
+            Fraction of feed in liquid-liquid equilibrium.
+            The rest of the feed is divided equally between phases.
+
+        """
+        ms = self(feed, top_chemical=top_chemical)
+        top_phase = 'l'
+        bottom_phase = 'L'
+        if not top_chemical:
+            rho_l = ms['l'].rho
+            rho_L = ms['L'].rho
+            top_L = rho_L < rho_l
+            if top_L:
+                top_phase = 'L'
+                bottom_phase = 'l'
+        top.mol[:] = ms.imol[top_phase]
+        bottom.mol[:] = ms.imol[bottom_phase]
+        top.T = bottom.T = feed.T
+        top.P = bottom.P = feed.P
+        if efficiency < 1.:
+            top.mol *= efficiency
+            bottom.mol *= efficiency
+            mixing = (1. - efficiency) / 2. * feed.mol
+            top.mol += mixing
+            bottom.mol += mixing
+
+    def __repr__(self):
+        hits = 'hit' if self.N_hits == 1 else 'hits'
+        solves = 'solve' if self.N_solves == 1 else 'solves'
+        warm_starts = 'warm start' if self.N_warm_starts == 1 else 'warm starts'
+        return (f"<{type(self).__name__}: {self.ID}, {self.N_hits} {hits}, "
+                f"{self.N_solves} {solves} ({self.N_warm_starts} {warm_starts})>")
+
+
+def get_lle_report(services, N_simulations=None):
+    """
+    Return a DataFrame of calls, solves, warm starts, hits (i.e., saved
+    solves), and hit rate by service. If the number of simulations is
+    given, saved solves per simulation are also reported.
+
+    Parameters
+    ----------
+    services : Iterable[LLEService]
+        Services to report.
+    N_simulations : int, optional
+        Number of simulations since statistics were last reset.
+
+    """
+    services = list(services)
+    data = []
+    for i in services:
+        data.append((i.N_calls, i.N_solves, i.N_warm_starts, i.N_hits, i.hit_rate))
+    columns = ['Calls', 'Solves', 'Warm starts', 'Hits', 'Hit rate']
+    df = pd.DataFrame(data, index=[i.ID for i in services], columns=columns)
+    if N_simulations:
+        df['Saved solves per simulation'] = df['Hits'] / N_simulations
+        df['Calls per simulation'] = df['Calls'] / N_simulations
+    df.index.name = 'Service'
+    return df
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+This module defines the evaluate_model_in_parallel function, which
+evaluates the samples loaded in a Model object (e.g., Monte Carlo) using a
+pool of worker processes. Each worker builds its own model once and
+evaluates contiguous chunks of samples, each from the same initial state;
+results are saved to the `table` of the original model in the original
+sample order. It also defines the
+evaluate_across_coordinate_in_parallel function, which evaluates the same
+samples at each point of a coordinate (e.g., titer) with one point per
+worker task, and the get_percentiles_across_coordinate function.
+
+"""
+import os
+import numpy as np
+from multiprocessing import Pool
+from .system_state import SystemState
+from .result_sink import check_completed_samples, load_table_from_sink
+
+__all__ = ('evaluate_model_in_parallel',
+           'evaluate_across_coordinate_in_parallel',
+           'get_percentiles_across_coordinate')
+
+#: dict Model of this worker process.
+_worker = {}
+
+def _initialize_worker(setup, args, state=None):
+    _worker['model'] = setup(*args)
+    _worker['state'] = state
+
+def _initialize_coordinate_worker(setup, args, samples):
+    _initialize_worker(setup, args)
+    _worker['model'].load_samples(samples)
+
+def _evaluate_samples(model, state, indices, samples, thorough):
+    # Every chunk starts from the same state, so results do not depend on
+    # which chunks were evaluated before by the worker
+    system = model._system
+    state.restore(system)
+    system.reset_cache()
+    model._sample_cache = None
+    model.load_samples(samples)
+    model.evaluate(thorough)
+    metric_indices = [i.index for i in model.metrics]
+    return indices, metric_indices, model.table[metric_indices].values
+
+def _evaluate_chunk(args):
+    indices, samples, thorough = args
+    return _evaluate_samples(_worker['model'], _worker['state'], 
+                             indices, samples, thorough)
+
+def evaluate_model_in_parallel(model, setup, args=(), N_workers=None,
+                               chunk_size=50, thorough=True, sink=None):
+    """
+    Evaluate metrics of a model over its loaded samples using a pool of
+    worker processes and save values to the `table` of the model.
+
+    Parameters
+    ----------
+    model : Model
+        Model with loaded samples.
+    setup : Callable
+        Module-level function that returns a model with the same parameters
+        and metrics (in the same order) as the given model. It is called once
+        by each worker, so that every worker builds its own system.
+    args : tuple, optional
+        Arguments of `setup`.
+    N_workers : int, optional
+        Number of worker processes. Defaults to the number of CPUs. If 1,
+        the model is evaluated in this process.
+    chunk_size : int, optional
+        Number of samples in each chunk dispatched to workers. Defaults to 50.
+    thorough : bool, optional
+        If True, simulate the whole system with each sample. Defaults to True.
+    sink : ResultSink, optional
+        If given, results are streamed to the sink as chunks are completed,
+        samples already in the sink are skipped, and the table of the model
+        is loaded from the sink once complete.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from biorefineries.utils import evaluate_model_in_parallel
+    >>> from biorefineries.lactic.analyses.models import create_model, load_model
+    >>> model = create_model('SSCF')['model']
+    >>> np.random.seed(3221)
+    >>> model.load_samples(model.sample(N=1000, rule='L'))
+    >>> evaluate_model_in_parallel(model, load_model, ('SSCF',))
+
+    Notes
+    -----
+    As in the serial evaluation, samples are evaluated in order of parameter
+    values to minimize changes in state; each chunk is a contiguous block of
+    this order. The state of the system of the given model is saved before
+    evaluation and every chunk starts from this state (in this process or 
+    in a worker), so results only depend on the samples and the chunk size,
+    not on the number of workers.
+
+    """
+    samples = model._samples
+    if samples is None: raise RuntimeError('must load samples before evaluating')
+    if N_workers is None: N_workers = os.cpu_count() or 1
+    indices = np.array(model._index)
+    if sink is not None:
+        indices = indices[~check_completed_samples(model, sink)[indices]]
+        if not indices.size: return load_table_from_sink(model, sink)
+    state = SystemState(model._system)
+    chunks = [(indices[i:i + chunk_size], thorough) for i in range(0, indices.size, chunk_size)]
+    metric_indices = [i.index for i in model.metrics]
+    values = np.full([samples.shape[0], len(metric_indices)], np.nan)
+    def save(indices, worker_metric_indices, data):
+        if worker_metric_indices != metric_indices:
+            raise RuntimeError('metrics of worker models do not match the metrics of the model')
+        if sink is None:
+            values[indices] = data
+        else:
+            sink.extend(indices, np.hstack([samples[indices], data]))
+    if N_workers == 1:
+        table = model.table
+        try:
+            for indices, thorough in chunks:
+                save(*_evaluate_samples(model, state, indices, samples[indices], thorough))
+        finally:
+            # Samples of the last chunk were loaded
+            model.load_samples(samples)
+            model.table = table
+    else:
+        chunks = [(i, samples[i], thorough) for i, thorough in chunks]
+        with Pool(N_workers, _initialize_worker, (setup, args, state)) as pool:
+            for result in pool.imap_unordered(_evaluate_chunk, chunks): save(*result)
+    if sink is None:
+        model.table[metric_indices] = values
+    else:
+        sink.flush()
+        load_table_from_sink(model, sink)
+
+# %% Evaluation across a coordinate
+
+def _evaluate_at_coordinate(model, f_coordinate, x, multi_coordinate, thorough):
+    metric_indices = [i.index for i in model.metrics]
+    parameters = model.get_parameters()
+    baseline_sample = model.get_baseline_sample()
+    try:
+        f_coordinate(*x) if multi_coordinate else f_coordinate(x)
+        model.evaluate(thorough)
+        values = model.table[metric_indices].values.copy()
+    except Exception as exception:
+        print(f"Evaluation at coordinate {x} failed: {exception}")
+        values = np.full([model._samples.shape[0], len(metric_indices)], np.nan)
+    finally:
+        # Restore the baseline state for the next coordinate
+        for parameter, value in zip(parameters, baseline_sample): parameter.setter(value)
+    return metric_indices, values
+
+def _evaluate_coordinate(args):
+    n, x, f_coordinate, multi_coordinate, thorough = args
+    return (n, *_evaluate_at_coordinate(_worker['model'], f_coordinate, x,
+                                        multi_coordinate, thorough))
+
+def evaluate_across_coordinate_in_parallel(model, setup, f_coordinate, coordinate,
+                                           args=(), N_workers=None, thorough=True,
+                                           multi_coordinate=False, notify=True):
+    """
+    Evaluate metrics of a model over its loaded samples at each point of a
+    coordinate using a pool of worker processes. Return a dictionary of
+    metric values (samples x coordinate points) by metric index, as in
+    `Model.evaluate_across_coordinate`, and a boolean array of failed
+    evaluations (samples x coordinate points).
+
+    Parameters
+    ----------
+    model : Model
+        Model with loaded samples. The same samples are evaluated at
+        every point of the coordinate.
+    setup : Callable
+        Module-level function that returns a model with the same parameters
+        and metrics (in the same order) as the given model. It is called once
+        by each worker, so that every worker builds its own system.
+    f_coordinate : Callable
+        Module-level function that changes the state of the system of the
+        worker given the coordinate.
+    coordinate : array
+        Coordinate values.
+    args : tuple, optional
+        Arguments of `setup`.
+    N_workers : int, optional
+        Number of worker processes. Defaults to the number of CPUs. If 1,
+        the model is evaluated in this process.
+    thorough : bool, optional
+        If True, simulate the whole system with each sample. Defaults to True.
+    multi_coordinate : bool, optional
+        If True, each coordinate value is a tuple of arguments of `f_coordinate`.
+    notify : bool, optional
+        If True, notify after each coordinate evaluation. Defaults to True.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from biorefineries.utils import (evaluate_across_coordinate_in_parallel,
+    ...                                  get_percentiles_across_coordinate)
+    >>> from biorefineries.HP.analyses import models
+    >>> model = models.load_montecarlo_across_titer_model()
+    >>> model.load_samples(model.sample(N=150, rule='L'))
+    >>> titers = np.linspace(5., 150., 35)
+    >>> metric_data, failed = evaluate_across_coordinate_in_parallel(
+    ...     model, models.load_montecarlo_across_titer_model, models.set_titer, titers
+    ... )
+    >>> MPSP_index = model.metrics[0].index
+    >>> percentiles = get_percentiles_across_coordinate(metric_data[MPSP_index])
+
+    Notes
+    -----
+    The baseline values of all parameters are restored after each point of
+    the coordinate. Failed samples (e.g., a system that does not converge)
+    are NaN for that sample and point only; if the coordinate cannot be set,
+    all samples at that point are NaN.
+
+    """
+    samples = model._samples
+    if samples is None: raise RuntimeError('must load samples before evaluating')
+    if N_workers is None: N_workers = os.cpu_count() or 1
+    N_points = len(coordinate)
+    metric_indices = [i.index for i in model.metrics]
+    shape = (samples.shape[0], N_points)
+    metric_data = {i: np.zeros(shape) for i in metric_indices}
+    failed = np.zeros(shape, bool)
+    def save(n, worker_metric_indices, values):
+        if worker_metric_indices != metric_indices:
+            raise RuntimeError('metrics of worker models do not match the metrics of the model')
+        for i, metric in enumerate(metric_indices): metric_data[metric][:, n] = values[:, i]
+        failed[:, n] = np.isnan(values).any(1)
+        if notify:
+            print(f"[{n}] Coordinate {coordinate[n]} evaluated; "
+                  f"{failed[:, n].sum()} of {shape[0]} samples failed")
+    if N_workers == 1:
+        for n, x in enumerate(coordinate):
+            save(n, *_evaluate_at_coordinate(model, f_coordinate, x, multi_coordinate, thorough))
+    else:
+        tasks = [(n, x, f_coordinate, multi_coordinate, thorough) for n, x in enumerate(coordinate)]
+        with Pool(min(N_workers, N_points), _initialize_coordinate_worker,
+                  (setup, args, samples)) as pool:
+            for result in pool.imap_unordered(_evaluate_coordinate, tasks): save(*result)
+    return metric_data, failed
+
+def get_percentiles_across_coordinate(ys, q=(5, 25, 50, 75, 95)):
+    """
+    Return the percentiles of metric values (samples x coordinate points)
+    at each point of the coordinate (percentiles x coordinate points),
+    ignoring failed (NaN) samples. Defaults to the 5th, 25th, 50th, 75th,
+    and 95th percentiles, as in `plot_montecarlo_across_coordinate`.
+
+    """
+    return np.nanpercentile(ys, q, axis=0)
@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+This module defines the RecoveryPolicy class, which recovers a system that
+failed to simulate by trying an ordered list of strategies (e.g., resetting
+recycles, reloading baseline specifications, switching the convergence
+method, or relaxing tolerances), within a wall-clock and iteration budget
+for each attempt. The strategy that succeeds is recorded, so that strategies
+that never help can be dropped.
+
+"""
+import time
+import pandas as pd
+from .convergence_profiler import get_recycle_systems, get_first_unit
+
+__all__ = ('RecoveryPolicy',
+           'RecoveryStrategy',
+           'ResetRecycles',
+           'ReloadBaseline',
+           'SwitchSolver',
+           'RelaxTolerance',
+           'RecoveryBudgetExceeded')
+
+class RecoveryBudgetExceeded(RuntimeError):
+    """RuntimeError regarding a recovery attempt that exceeded its budget."""
+
+
+# %% Strategies
+
+def _reset(system):
+    system.reset_cache()
+    system.empty_recycles()
+
+def _get_systems(system):
+    systems = [system]
+    for i in system.subsystems: systems.extend(_get_systems(i))
+    return systems
+
+class RecoveryStrategy:
+    """
+    Abstract class for strategies of a RecoveryPolicy object. Subclasses
+    must implement the `run` method, which simulates the system and leaves
+    its settings (e.g., the convergence method) as they were.
+
+    """
+    __slots__ = ()
+
+    @property
+    def name(self):
+        """[str] Name of strategy."""
+        return type(self).__name__
+
+    def run(self, system):
+        raise NotImplementedError(f"'{type(self).__name__}' object has no 'run' method")
+
+    def __repr__(self):
+        return f"<{self.name}>"
+
+
+class ResetRecycles(RecoveryStrategy):
+    """Reset the cache and empty recycles of the system, then simulate."""
+    __slots__ = ()
+
+    def run(self, system):
+        _reset(system)
+        system.simulate()
+
+
+class ReloadBaseline(RecoveryStrategy):
+    """
+    Reset the system and simulate at baseline specifications, then
+    reload the current specifications and simulate.
+
+    Parameters
+    ----------
+    load_baseline : Callable
+        Load baseline specifications.
+    get_specifications : Callable
+        Return current specifications as a tuple.
+    load_specifications : Callable
+        Load specifications (given as arguments).
+
+    """
+    __slots__ = ('load_baseline', 'get_specifications', 'load_specifications')
+
+    def __init__(self, load_baseline, get_specifications, load_specifications):
+        self.load_baseline = load_baseline
+        self.get_specifications = get_specifications
+        self.load_specifications = load_specifications
+
+    def run(self, system):
+        specifications = self.get_specifications()
+        _reset(system)
+        self.load_baseline()
+        system.simulate()
+        self.load_specifications(*specifications)
+        system.simulate()
+
+
+class SwitchSolver(RecoveryStrategy):
+    """
+    Reset the system and simulate with another convergence method
+    ('wegstein', 'aitken', or 'fixedpoint').
+
+    """
+    __slots__ = ('converge_method',)
+
+    def __init__(self, converge_method):
+        self.converge_method = converge_method
+
+    @property
+    def name(self):
+        return f"{type(self).__name__}({self.converge_method})"
+
+    def run(self, system):
+        converge_method = system.converge_method
+        _reset(system)
+        system.converge_method = self.converge_method
+        try:
+            system.simulate()
+        finally:
+            system.converge_method = converge_method
+
+
+class RelaxTolerance(RecoveryStrategy):
+    """
+    Simulate with molar and temperature tolerances of the system and its
+    subsystems multiplied by a factor.
+
+    """
+    __slots__ = ('factor',)
+
+    #: tuple[str] Tolerance attributes of systems.
+    tolerances = ('molar_tolerance', 'relative_molar_tolerance',
+                  'temperature_tolerance', 'relative_temperature_tolerance')
+
+    def __init__(self, factor=10.):
+        self.factor = factor
+
+    @property
+    def name(self):
+        return f"{type(self).__name__}({self.factor:g})"
+
+    def run(self, system):
+        systems = _get_systems(system)
+        tolerances = self.tolerances
+        original = [[getattr(i, j) for j in tolerances] for i in systems]
+        factor = self.factor
+        for i in systems:
+            for j in tolerances: setattr(i, j, factor * getattr(i, j))
+        try:
+            system.simulate()
+        finally:
+            for i, values in zip(systems, original):
+                for j, value in zip(tolerances, values): setattr(i, j, value)
+
+
+# %% Recovery policy
+
+class RecoveryPolicy:
+    """
+    Create a RecoveryPolicy object that simulates a system and, if the
+    simulation fails, tries each strategy in order until one succeeds.
+
+    Parameters
+    ----------
+    system : System
+        System to recover.
+    strategies : Iterable[RecoveryStrategy]
+        Strategies in the order they are tried.
+    max_time : float, optional
+        Wall-clock budget of each attempt [s]. Defaults to no limit.
+    max_iterations : int, optional
+        Maximum number of iterations of each recycle system in each attempt.
+        Defaults to no limit other than the `maxiter` of each system.
+    verbose : bool, optional
+        Whether to print attempts. Defaults to True.
+
+    Examples
+    --------
+    >>> from biorefineries.utils import RecoveryPolicy, ResetRecycles, SwitchSolver
+    >>> policy = RecoveryPolicy(HP_sys, [ResetRecycles(),
+    ...                                  SwitchSolver('fixedpoint'),
+    ...                                  SwitchSolver('aitken')],
+    ...                         max_time=300.)
+    >>> policy.simulate() # Recovers if the simulation fails
+    >>> policy.report() # Attempts and successes by strategy
+    >>> policy.drop_unhelpful_strategies(min_attempts=20)
+
+    Notes
+    -----
+    Budgets are enforced within each attempt: while a strategy runs, the
+    first unit of each recycle system (which runs at the start of each
+    iteration) is wrapped to raise a RecoveryBudgetExceeded error once the
+    wall-clock budget is spent or the recycle system has completed
+    `max_iterations` iterations, so that the next strategy is tried. Only
+    the units of the recovered system are wrapped, and only during attempts.
+    Budgets above the `maxiter` of a system have no effect, as the system
+    raises a RuntimeError first.
+
+    """
+    __slots__ = ('system', 'strategies', 'max_time', 'max_iterations',
+                 'verbose', 'records', 'N_failures')
+
+    def __init__(self, system, strategies, max_time=None, max_iterations=None,
+                 verbose=True):
+        #: [System] System to recover.
+        self.system = system
+        #: list[RecoveryStrategy] Strategies in the order they are tried.
+        self.strategies = list(strategies)
+        #: [float] Wall-clock budget of each attempt [s].
+        self.max_time = max_time
+        #: [int] Maximum number of iterations of each recycle system in each attempt.
+        self.max_iterations = max_iterations
+        #: [bool] Whether to print attempts.
+        self.verbose = verbose
+        #: dict[str, list] Number of attempts, successes, and total time [s]
+        #: by strategy name.
+        self.records = {}
+        #: [int] Number of recoveries where all strategies failed.
+        self.N_failures = 0
+
+    def _patch_first_units(self, start):
+        # Each iteration of a recycle system starts by running its first unit
+        max_time = self.max_time
+        max_iterations = self.max_iterations
+        first_units = {}
+        for system in get_recycle_systems(self.system):
+            system._iter = 0
+            unit = get_first_unit(system)
+            if unit: first_units.setdefault(unit, []).append(system)
+        originals = {}
+        for unit, systems in first_units.items():
+            dct = unit.__dict__
+            if 'run' in dct: originals[unit] = dct['run']
+            run = unit.run
+            def run_within_budget(run=run, systems=systems):
+                if max_time is not None and time.perf_counter() - start > max_time:
+                    raise RecoveryBudgetExceeded(
+                        f'attempt exceeded {max_time:g} s'
+                    )
+                if max_iterations is not None:
+                    for i in systems:
+                        if i._iter >= max_iterations:
+                            raise RecoveryBudgetExceeded(
+                                f'{i.ID} exceeded {max_iterations} iterations'
+                            )
+                return run()
+            run_within_budget.__name__ = run.__name__
+            run_within_budget.__doc__ = run.__doc__
+            unit.run = run_within_budget
+        return first_units, originals
+
+    def _unpatch_first_units(self, first_units, originals):
+        for unit in first_units:
+            dct = unit.__dict__
+            if unit in originals: dct['run'] = originals[unit]
+            else: del dct['run']
+
+    def _run_within_budget(self, strategy):
+        system = self.system
+        start = time.perf_counter()
+        if self.max_time is None and self.max_iterations is None:
+            patched = None
+        else:
+            patched = self._patch_first_units(start)
+        try:
+            strategy.run(system)
+        finally:
+            if patched: self._unpatch_first_units(*patched)
+            elapsed = time.perf_counter() - start
+            record = self.records.get(strategy.name)
+            if record is None: self.records[strategy.name] = record = [0, 0, 0.]
+            record[0] += 1
+            record[2] += elapsed
+
+    def recover(self, exception=None):
+        """
+        Try each strategy in order until one succeeds and return it.
+        If all fail, raise the exception of the last strategy (or the given
+        exception if there are no strategies). An attempt that exceeds its
+        budget fails with a RecoveryBudgetExceeded error.
+
+        """
+        for strategy in self.strategies:
+            if self.verbose: print(f"Trying {strategy.name} ...")
+            try:
+                self._run_within_budget(strategy)
+            except Exception as e:
+                if self.verbose: print(str(e))
+                exception = e
+            else:
+                self.records[strategy.name][1] += 1
+                return strategy
+        self.N_failures += 1
+        if self.verbose: print("All recovery strategies failed.")
+        if exception is None: raise RuntimeError('no recovery strategies')
+        raise exception
+
+    def simulate(self):
+        """Simulate the system and recover if the simulation fails. Return
+        the strategy that succeeded, if any."""
+        try:
+            self.system.simulate()
+        except Exception as e:
+            if self.verbose: print(str(e))
+            return self.recover(e)
+
+    def report(self):
+        """Return a DataFrame of attempts, successes, success rate, and
+        time [s] by strategy."""
+        data = []
+        names = [i.name for i in self.strategies]
+        names.extend([i for i in self.records if i not in names])
+        for name in names:
+            attempts, successes, total = self.records.get(name, (0, 0, 0.))
+            data.append((attempts, successes,
+                         successes / attempts if attempts else 0.,
+                         total, total / attempts if attempts else 0.))
+        df = pd.DataFrame(data, index=names, columns=(
+            'Attempts', 'Successes', 'Success rate', 'Time [s]', 'Time per attempt [s]'
+        ))
+        df.index.name = 'Strategy'
+        return df
+
+    def get_unhelpful_strategies(self, min_attempts=1):
+        """Return strategies that were attempted at least `min_attempts` times
+        and never succeeded."""
+        records = self.records
+        unhelpful = []
+        for strategy in self.strategies:
+            record = records.get(strategy.name)
+            if record and record[0] >= min_attempts and not record[1]:
+                unhelpful.append(strategy)
+        return unhelpful
+
+    def drop_unhelpful_strategies(self, min_attempts=1):
+        """Remove strategies that were attempted at least `min_attempts` times
+        and never succeeded, and return them."""
+        unhelpful = self.get_unhelpful_strategies(min_attempts)
+        self.strategies = [i for i in self.strategies if i not in unhelpful]
+        return unhelpful
+
+    def __repr__(self):
+        names = ', '.join([i.name for i in self.strategies])
+        return f"<{type(self).__name__}: {self.system.ID}; {names}>"
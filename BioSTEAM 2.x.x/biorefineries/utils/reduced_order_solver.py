@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+This module defines the solve_with_local_model function, which solves a
+specification (e.g., the evaporator vapor fraction that reaches a titer) by
+fitting a cheap local model of the specification variable from one or two
+full evaluations, solving the model, and verifying the solution with a full
+evaluation. A bracketed search is used only if verification fails.
+
+"""
+import flexsolve as flx
+
+__all__ = ('solve_with_local_model',)
+
+def _solve_model(xa, ya, xb, yb, target, reciprocal):
+    if reciprocal:
+        if ya <= 0. or yb <= 0.: return None
+        ya = 1. / ya
+        yb = 1. / yb
+        target = 1. / target
+    dy = yb - ya
+    if xa == xb or dy == 0.: return None
+    return xb + (target - yb) * (xb - xa) / dy
+
+def solve_with_local_model(f, target, x0, y0, x1, x_min, x_max, ytol=1e-3,
+                           reciprocal=True, maxiter=3, fallback_maxiter=200):
+    """
+    Return the value of `x` where `f(x) = 0` (i.e., where the specification
+    variable, `f(x) + target`, reaches the target). The last evaluation of
+    `f` is at the returned value, unless the bracketed search is used.
+
+    Parameters
+    ----------
+    f : Callable[float, float]
+        Objective function (specification variable minus target).
+    target : float
+        Target of the specification variable.
+    x0 : float
+        Point where `f` was evaluated.
+    y0 : float
+        Value of `f` at `x0`.
+    x1 : float
+        First guess (e.g., from a mass balance) used to fit the local model.
+    x_min, x_max : float
+        Bounds of `x`.
+    ytol : float, optional
+        Tolerance of the objective function. Defaults to 1e-3.
+    reciprocal : bool, optional
+        If True, the reciprocal of the specification variable is modeled as
+        linear in `x` (e.g., concentrations where the solvent is removed).
+        Otherwise, the specification variable is modeled as linear in `x`.
+        Defaults to True.
+    maxiter : int, optional
+        Maximum number of evaluations of `f` (including the first guess)
+        before falling back to a bracketed search. Defaults to 3.
+    fallback_maxiter : int, optional
+        Maximum number of iterations of the bracketed search. Defaults to 200.
+
+    Notes
+    -----
+    The local model is refit with the last two points after each evaluation,
+    so repeated verifications amount to secant steps on the model. Points
+    evaluated along the way narrow the bracket of the fallback search.
+
+    """
+    points = [(x0, y0)]
+    x = min(max(x1, x_min), x_max)
+    for i in range(maxiter):
+        y = f(x)
+        if abs(y) < ytol: return x
+        points.append((x, y))
+        (xa, ya), (xb, yb) = points[-2:]
+        x = _solve_model(xa, ya + target, xb, yb + target, target, reciprocal)
+        if x is None: break
+        x = min(max(x, x_min), x_max)
+        if x == xb: break
+    # Narrow the bracket with evaluated points and fall back to a bracketed search
+    lower = [(abs(y), x, y) for x, y in points if y < 0.]
+    upper = [(abs(y), x, y) for x, y in points if y > 0.]
+    if lower and upper:
+        _, xa, ya = min(lower)
+        _, xb, yb = min(upper)
+        return flx.IQ_interpolation(f, xa, xb, y0=ya, y1=yb, ytol=ytol, maxiter=fallback_maxiter)
+    (xp, yp), (xq, yq) = points[-2:]
+    if xp != xq and yp != yq:
+        # The root lies beyond the closest point in the direction of the model
+        _, xa, ya = min(lower or upper)
+        increasing = (yq - yp) / (xq - xp) > 0.
+        xb = x_max if (ya < 0.) is increasing else x_min
+        if xb != xa:
+            return flx.IQ_interpolation(f, xa, xb, y0=ya, ytol=ytol, maxiter=fallback_maxiter)
+    y_min = y0 if x0 == x_min else None
+    return flx.IQ_interpolation(f, x_min, x_max, y0=y_min, ytol=ytol, maxiter=fallback_maxiter)
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+This module defines the ResultSink class, an append-only on-disk store of
+evaluated samples in a columnar format (Parquet or Feather), and the
+evaluate_model_to_sink function, which streams the results of a Model
+object to a sink as samples are evaluated. Rows are buffered and written in
+batches as separate files, so partial results can be read while a run is in
+progress and interrupted runs can be resumed.
+
+Requires pyarrow (install with 'pip install biorefineries[sink]').
+
+"""
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+__all__ = ('ResultSink', 'evaluate_model_to_sink', 'get_model_key')
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        import pyarrow.feather
+    except ImportError: # pragma: no cover
+        raise ImportError("pyarrow is required to stream results to a ResultSink; "
+                          "install it with 'pip install biorefineries[sink]' "
+                          "or 'pip install pyarrow'") from None
+    return pyarrow
+
+
+class ResultSink:
+    """
+    Create a ResultSink object that appends rows of results (e.g., Monte
+    Carlo samples) to a directory of columnar files. Each row is keyed by
+    its sample number.
+
+    Parameters
+    ----------
+    path : str
+        Directory of the sink. If it already has results, new rows are
+        appended to them (columns must match).
+    columns : Iterable[tuple[str, str]]
+        Columns of rows (e.g., the (element, name) columns of a model table).
+    batch_size : int, optional
+        Number of rows buffered in memory before they are written to a new
+        file. Defaults to 100.
+    format : str, optional
+        Either 'parquet' or 'feather'. Defaults to 'parquet'.
+
+    Examples
+    --------
+    >>> from biorefineries.utils import ResultSink, evaluate_model_to_sink
+    >>> sink = ResultSink.from_model('HP_results', model)
+    >>> evaluate_model_to_sink(model, sink)
+    >>> sink.read(sink.columns[:5]) # Partial results of the first 5 columns
+
+    """
+    __slots__ = ('path', 'columns', 'batch_size', 'format', '_indices', '_rows', '_N_files')
+
+    #: dict[str, str] File extensions by format.
+    extensions = {'parquet': '.parquet', 'feather': '.feather'}
+
+    def __init__(self, path, columns, batch_size=100, format='parquet'):
+        if format not in self.extensions:
+            raise ValueError(f"format must be either 'parquet' or 'feather', not {repr(format)}")
+        _import_pyarrow() # Fail before evaluating any samples
+        columns = [tuple(i) if isinstance(i, (tuple, list)) else (i,) for i in columns]
+        os.makedirs(path, exist_ok=True)
+        columns_file = os.path.join(path, 'columns.json')
+        if os.path.exists(columns_file):
+            with open(columns_file) as f:
+                saved_columns = [tuple(i) for i in json.load(f)]
+            if saved_columns != columns:
+                raise ValueError(f"columns do not match the results in '{path}'")
+        else:
+            with open(columns_file, 'w') as f: json.dump(columns, f)
+        #: str Directory of the sink.
+        self.path = path
+        #: list[tuple[str, str]] Columns of rows.
+        self.columns = columns
+        #: int Number of rows buffered before writing.
+        self.batch_size = batch_size
+        #: str File format.
+        self.format = format
+        self._indices = []
+        self._rows = []
+        self._N_files = len(self._get_files())
+
+    @classmethod
+    def from_model(cls, path, model, batch_size=100, format='parquet', keyed=False):
+        """
+        Return a ResultSink object with the columns of the model table. If
+        `keyed` is True, the directory is suffixed with the key of the model
+        (see `get_model_key`), so that results are only resumed for the same
+        samples and model configuration.
+
+        """
+        if keyed: path = f'{path}_{get_model_key(model)}'
+        return cls(path, [*model.table.columns], batch_size, format)
+
+    def _get_files(self):
+        extension = self.extensions[self.format]
+        return sorted([os.path.join(self.path, i) for i in os.listdir(self.path)
+                       if i.endswith(extension)])
+
+    def append(self, index, values):
+        """Append a row of values with a sample number."""
+        self._indices.append(index)
+        self._rows.append(values)
+        if len(self._rows) >= self.batch_size: self.flush()
+
+    def extend(self, indices, data):
+        """Append rows of values with their sample numbers."""
+        for i, j in zip(indices, data): self.append(i, j)
+
+    def flush(self):
+        """Write all buffered rows to a new file."""
+        if not self._rows: return
+        pa = _import_pyarrow()
+        data = np.asarray(self._rows, dtype=float)
+        arrays = [pa.array(np.asarray(self._indices, dtype=np.int64))]
+        arrays.extend([pa.array(i) for i in data.T])
+        names = ['sample', *[str(i) for i in range(len(self.columns))]]
+        table = pa.Table.from_arrays(arrays, names)
+        file = os.path.join(self.path, f'{self._N_files:06d}' + self.extensions[self.format])
+        # Write to a temporary file first, so that readers never see partial files
+        temporary_file = file + '.tmp'
+        if self.format == 'parquet':
+            pa.parquet.write_table(table, temporary_file)
+        else:
+            pa.feather.write_feather(table, temporary_file)
+        os.replace(temporary_file, file)
+        self._N_files += 1
+        self._indices.clear()
+        self._rows.clear()
+
+    def _read_tables(self, names):
+        pa = _import_pyarrow()
+        if self.format == 'parquet':
+            read = lambda file: pa.parquet.read_table(file, columns=names)
+        else:
+            read = lambda file: pa.feather.read_table(file, columns=names)
+        return [read(i) for i in self._get_files()]
+
+    def completed(self):
+        """Return an array of the sample numbers of all written rows."""
+        tables = self._read_tables(['sample'])
+        if not tables: return np.zeros(0, int)
+        return np.concatenate([i.column('sample').to_numpy() for i in tables])
+
+    def read(self, columns=None):
+        """
+        Return a DataFrame of all written rows, indexed by sample number
+        and sorted. Only the given columns are read, if any.
+
+        """
+        if columns is None:
+            columns = self.columns
+        else:
+            columns = [tuple(i) if isinstance(i, (tuple, list)) else (i,) for i in columns]
+        positions = [self.columns.index(i) for i in columns]
+        names = ['sample', *[str(i) for i in positions]]
+        tables = self._read_tables(names)
+        if tables:
+            index = np.concatenate([i.column('sample').to_numpy() for i in tables])
+            data = np.concatenate([
+                np.column_stack([i.column(j).to_numpy() for j in names[1:]])
+                if positions else np.zeros([i.num_rows, 0])
+                for i in tables
+            ])
+        else:
+            index = np.zeros(0, int)
+            data = np.zeros([0, len(columns)])
+        if all([len(i) == 2 for i in columns]):
+            columns = pd.MultiIndex.from_tuples(columns)
+        else:
+            columns = [i[0] if len(i) == 1 else i for i in columns]
+        df = pd.DataFrame(data, index=pd.Index(index, name='sample'), columns=columns)
+        return df.sort_index()
+
+    def to_excel(self, file, sheet_name='Raw data'):
+        """Export all written rows to an Excel file."""
+        self.read().to_excel(file, sheet_name=sheet_name)
+
+    def close(self):
+        """Write all buffered rows."""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, exception, traceback):
+        self.flush()
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: '{self.path}', {len(self.columns)} columns>"
+
+
+def evaluate_model_to_sink(model, sink, thorough=True):
+    """
+    Evaluate metrics of a model over its loaded samples, streaming each
+    sample to the sink as it is evaluated. Samples already in the sink
+    (e.g., from an interrupted run) are skipped. Once complete, the
+    table of the model is loaded from the sink.
+
+    Parameters
+    ----------
+    model : Model
+        Model with loaded samples.
+    sink : ResultSink
+        Sink with the columns of the model table.
+    thorough : bool, optional
+        If True, simulate the whole system with each sample. Defaults to True.
+
+    """
+    samples = model._samples
+    if samples is None: raise RuntimeError('must load samples before evaluating')
+    completed = check_completed_samples(model, sink)
+    for i in model._index:
+        if completed[i]: continue
+        sample = samples[i]
+        sink.append(i, [*sample, *model._evaluate_sample(sample, thorough)])
+    sink.flush()
+    load_table_from_sink(model, sink)
+
+def get_model_key(model):
+    """Return a hash of the loaded samples, parameter distributions and
+    baselines, and table columns of a model."""
+    samples = model._samples
+    if samples is None: raise RuntimeError('must load samples before keying model')
+    key = hashlib.sha256()
+    key.update(np.ascontiguousarray(samples, dtype=float).tobytes())
+    key.update(repr([*model.table.columns]).encode())
+    for i in model.get_parameters():
+        key.update(f'{i.baseline!r}; {i.distribution!r}'.encode())
+    return key.hexdigest()[:16]
+
+def check_completed_samples(model, sink):
+    """Return a boolean array of samples of the model that are in the sink.
+    Raise a ValueError if their parameter values do not match the samples."""
+    samples = model._samples
+    columns = [*model.table.columns]
+    if [tuple(i) for i in columns] != sink.columns:
+        raise ValueError('columns of the sink do not match the model table')
+    completed = np.zeros(samples.shape[0], bool)
+    N_parameters = samples.shape[1]
+    df = sink.read(sink.columns[:N_parameters])
+    index = df.index.values
+    if index.size:
+        if index.max() >= samples.shape[0] or not np.allclose(df.values, samples[index]):
+            raise ValueError('samples in the sink do not match the loaded samples; '
+                             'use a new sink')
+        completed[index] = True
+    return completed
+
+def load_table_from_sink(model, sink):
+    """Set metric values of the model table from the sink."""
+    N_parameters = model._samples.shape[1]
+    metric_columns = sink.columns[N_parameters:]
+    df = sink.read(metric_columns)
+    metric_indices = [i.index for i in model.metrics]
+    values = np.full([model.table.shape[0], len(metric_indices)], np.nan)
+    values[df.index.values] = df.values
+    model.table[metric_indices] = values
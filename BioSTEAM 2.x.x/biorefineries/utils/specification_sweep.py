@@ -0,0 +1,634 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+This module defines the evaluate_across_specs_in_parallel function, which
+splits a grid of fermentation specifications (e.g. yield x titer) across
+worker processes. Each worker builds its own system once and evaluates
+contiguous chunks of grid points. It also defines the SweepCheckpoint class,
+an on-disk store of completed grid points that allows interrupted sweeps
+to be resumed, the RecycleSnapshots class, which seeds each grid point
+with the converged recycle states of its closest neighbour, and the
+SpecificationSweep class, which adds these sweeps to process specifications.
+
+"""
+import os
+import pickle
+import numpy as np
+from numpy.lib.format import open_memmap
+from multiprocessing import Pool
+
+__all__ = ('SweepCheckpoint',
+           'RecycleSnapshots',
+           'serpentine_order',
+           'get_recycle_streams',
+           'evaluate_at_points',
+           'evaluate_across_specs_in_series',
+           'evaluate_across_specs_in_parallel',
+           'SpecificationSweep',
+           'prepare_TRY_worker',
+           'reset_sweep_bookkeeping',
+           'get_sweep_bookkeeping',
+           'merge_sweep_bookkeeping')
+
+#: Bookkeeping attributes of process specifications that are summed across workers.
+summed_attributes = ('count_exceptions',
+                     'average_HXN_energy_balance_percent_error')
+
+#: Bookkeeping attributes of process specifications that are merged dictionaries.
+dict_attributes = ('exceptions_dict',
+                   'HXN_new_HXs',
+                   'HXN_new_HX_utils',
+                   'HXN_Q_bal_percent_error_dict')
+
+#: Bookkeeping attributes of process specifications that are concatenated lists.
+list_attributes = ('HXN_intolerable_points',)
+
+# %% Bookkeeping
+
+def _has(spec, name):
+    return getattr(spec, name, None) is not None
+
+def reset_sweep_bookkeeping(spec):
+    """Reset bookkeeping attributes of the process specification, if any."""
+    for name in summed_attributes:
+        if _has(spec, name): setattr(spec, name, 0 * getattr(spec, name))
+    for name in dict_attributes:
+        if _has(spec, name): setattr(spec, name, {})
+    for name in list_attributes:
+        if _has(spec, name): setattr(spec, name, [])
+
+def _picklable(obj):
+    try:
+        pickle.dumps(obj)
+    except Exception:
+        if isinstance(obj, tuple):
+            return tuple([_picklable(i) for i in obj])
+        elif isinstance(obj, BaseException):
+            return RuntimeError(f"{type(obj).__name__}: {obj}")
+        else:
+            return repr(obj)
+    else:
+        return obj
+
+def get_sweep_bookkeeping(spec):
+    """Return a picklable dictionary of the bookkeeping attributes of the process specification."""
+    bookkeeping = {}
+    for name in summed_attributes + list_attributes:
+        if _has(spec, name): bookkeeping[name] = getattr(spec, name)
+    for name in dict_attributes:
+        if _has(spec, name):
+            bookkeeping[name] = {i: _picklable(j) for i, j in getattr(spec, name).items()}
+    return bookkeeping
+
+def merge_sweep_bookkeeping(spec, bookkeeping):
+    """Merge bookkeeping from a worker into the process specification."""
+    for name, value in bookkeeping.items():
+        if name in summed_attributes:
+            setattr(spec, name, getattr(spec, name) + value)
+        elif name in dict_attributes:
+            getattr(spec, name).update(value)
+        elif name in list_attributes:
+            getattr(spec, name).extend(value)
+        else:
+            raise ValueError(f"invalid bookkeeping attribute '{name}'")
+
+# %% Checkpoints
+
+class SweepCheckpoint:
+    """
+    Create a SweepCheckpoint object that saves metric results of a 
+    specification sweep to disk as each grid point is completed. Results
+    are stored in a memory-mapped .npy file along with a completion mask, 
+    so that completed points are skipped when the sweep is restarted.
+    
+    Parameters
+    ----------
+    file : str
+        Path prefix of the store. Results, completion mask, and grid are 
+        saved to '<file>_data.npy', '<file>_completed.npy', and 
+        '<file>_specs.npz', respectively.
+    spec_1 : array_like[shape]
+        First specification of the grid (e.g. yield).
+    spec_2 : array_like[shape]
+        Second specification of the grid (e.g. titer).
+    spec_3 : array_like[P elements]
+        Third specification evaluated at each grid point (e.g. productivity).
+    
+    Notes
+    -----
+    A ValueError is raised if the store already exists for a different grid.
+    
+    """
+    __slots__ = ('file', 'shape', 'data', 'completed')
+    
+    def __init__(self, file, spec_1, spec_2, spec_3):
+        spec_1, spec_2 = np.broadcast_arrays(spec_1, spec_2)
+        spec_3 = np.asarray(spec_3, dtype=float)
+        self.file = file
+        self.shape = spec_1.shape
+        specs = dict(spec_1=spec_1, spec_2=spec_2, spec_3=spec_3)
+        specs_file = file + '_specs.npz'
+        if os.path.exists(specs_file):
+            with np.load(specs_file) as saved_specs:
+                for name, value in specs.items():
+                    if not np.array_equal(saved_specs[name], value):
+                        raise ValueError(f"checkpoint '{file}' was created for "
+                                         f"a different grid; {name} does not match")
+        else:
+            np.savez(specs_file, **specs)
+        completed_file = file + '_completed.npy'
+        if os.path.exists(completed_file):
+            self.completed = open_memmap(completed_file, mode='r+')
+        else:
+            self.completed = open_memmap(completed_file, mode='w+', 
+                                         dtype=bool, shape=(spec_1.size,))
+        data_file = file + '_data.npy'
+        self.data = open_memmap(data_file, mode='r+') if os.path.exists(data_file) else None
+    
+    @property
+    def pending(self):
+        """[1d array] Flat indices of grid points that have not been evaluated."""
+        return np.flatnonzero(~self.completed)
+    
+    def save(self, indices, data):
+        """Save metric results (array[N x M x P]) at given flat indices."""
+        if self.data is None:
+            self.data = open_memmap(self.file + '_data.npy', mode='w+', dtype=float,
+                                    shape=(self.completed.size, *data.shape[1:]))
+            self.data[:] = np.nan
+        self.data[indices] = data
+        self.data.flush()
+        self.completed[indices] = True
+        self.completed.flush()
+    
+    def results(self):
+        """Return all metric results (array[shape x M x P]); pending points are NaN."""
+        if self.data is None: raise RuntimeError('no grid points have been evaluated')
+        return np.array(self.data).reshape([*self.shape, *self.data.shape[1:]])
+    
+    def __repr__(self):
+        return (f"<{type(self).__name__}: '{self.file}', "
+                f"{self.completed.sum()}/{self.completed.size} points completed>")
+    
+
+# %% Warm starts
+
+def serpentine_order(shape):
+    """
+    Return flat indices of a grid of given shape walked along its last axis,
+    alternating direction every row, so that consecutive points are always
+    neighbours.
+    
+    """
+    N_points = int(np.prod(shape))
+    if len(shape) > 1:
+        indices = np.arange(N_points).reshape([-1, shape[-1]])
+        indices[1::2] = indices[1::2, ::-1]
+    else:
+        indices = np.arange(N_points)
+    return indices.flatten()
+
+def get_recycle_streams(system):
+    """Return a list of all recycle streams of a system and its subsystems."""
+    recycles = []
+    recycle = system.recycle
+    if recycle is not None:
+        if hasattr(recycle, 'mol'):
+            recycles.append(recycle)
+        else:
+            recycles.extend(recycle)
+    for subsystem in system.subsystems:
+        recycles.extend(get_recycle_streams(subsystem))
+    return list(dict.fromkeys(recycles))
+
+
+class RecycleSnapshots:
+    """
+    Create a RecycleSnapshots object that saves the converged state of all 
+    recycle streams of a system at each grid point. Before a new point is 
+    simulated, recycle streams can be seeded from the closest converged 
+    point, which reduces the number of iterations needed for convergence.
+    
+    Parameters
+    ----------
+    system : System
+        System with recycle streams to save.
+    
+    """
+    __slots__ = ('recycles', 'coordinates', 'snapshots', 'warm_starts')
+    
+    def __init__(self, system):
+        #: list[Stream] All recycle streams of the system and its subsystems.
+        self.recycles = get_recycle_streams(system)
+        
+        #: list[tuple] Grid coordinates of saved points.
+        self.coordinates = []
+        
+        #: list[list[Stream]] Saved copies of recycle streams by point.
+        self.snapshots = []
+        
+        #: [int] Number of points seeded from a converged neighbour.
+        self.warm_starts = 0
+    
+    def save(self, coordinate):
+        """Save the state of all recycle streams at given grid coordinate."""
+        self.coordinates.append(coordinate)
+        self.snapshots.append([i.copy() for i in self.recycles])
+    
+    def load_nearest(self, coordinate):
+        """
+        Seed recycle streams with the state of the closest saved point to 
+        the given grid coordinate and return the coordinate of that point.
+        Return None if no point has been saved.
+        
+        """
+        if not self.coordinates: return None
+        distance = ((np.array(self.coordinates) - coordinate)**2).sum(1)
+        index = distance.argmin()
+        for stream, snapshot in zip(self.recycles, self.snapshots[index]):
+            stream.copy_like(snapshot)
+        self.warm_starts += 1
+        return self.coordinates[index]
+    
+    def __repr__(self):
+        return (f"<{type(self).__name__}: {len(self.recycles)} recycles, "
+                f"{len(self.snapshots)} points saved, {self.warm_starts} warm starts>")
+    
+
+# %% Sequential evaluation
+
+def evaluate_at_points(spec, system, indices, shape, spec_1, spec_2, metrics, 
+                       spec_3, snapshots=None):
+    """
+    Evaluate metrics at the given flat indices of a grid in order and return 
+    an array with the all metric results (array[N x M x P]).
+    
+    Parameters
+    ----------
+    spec : ProcessSpecification
+        Must define an `evaluate_at_specs` method.
+    system : System
+        System to simulate at each point.
+    indices : array_like[N]
+        Flat indices of points to evaluate.
+    shape : tuple[int]
+        Shape of the grid.
+    spec_1 : 1d array
+        Flattened first specification of the grid (e.g. yield).
+    spec_2 : 1d array
+        Flattened second specification of the grid (e.g. titer).
+    metrics : Iterable[Callable; M elements]
+        Should return a number given no parameters.
+    spec_3 : array_like[P elements]
+        Third specification to evaluate at each point (e.g. productivity).
+    snapshots : RecycleSnapshots, optional
+        If given, each point is seeded from its closest converged point and
+        points where all metrics are finite are saved as converged.
+        
+    """
+    counted = _has(spec, 'count')
+    data = []
+    for index in indices:
+        if snapshots is not None:
+            coordinate = np.unravel_index(index, shape)
+            snapshots.load_nearest(coordinate)
+        if counted: spec.count = int(index) # Point number is incremented on evaluation
+        values = spec.evaluate_at_specs(system, spec_1[index], spec_2[index], metrics, spec_3)
+        if snapshots is not None and np.isfinite(values).all():
+            snapshots.save(coordinate)
+        data.append(values)
+    return np.array(data)
+
+def evaluate_across_specs_in_series(spec, system, spec_1, spec_2, metrics,
+                                    spec_3, checkpoint=None, warm_start=False):
+    """
+    Evaluate metrics at given spec_1 and spec_2 (e.g., yield and titer)
+    across a set of spec_3 values (e.g. productivities), one point at a time.
+    Return an array with the all metric results (array[shape x M x P]).
+    
+    Parameters
+    ----------
+    spec : ProcessSpecification
+        Must define an `evaluate_at_specs` method.
+    system : System
+        System to simulate at each point.
+    spec_1 : array_like[shape]
+        First specification to evaluate (e.g. yield).
+    spec_2 : array_like[shape]
+        Second specification to evaluate (e.g. titer).
+    metrics : Iterable[Callable; M elements]
+        Should return a number given no parameters.
+    spec_3 : array_like[P elements]
+        Third specification to evaluate at each point (e.g. productivity).
+    checkpoint : str or SweepCheckpoint, optional
+        On-disk store of completed points (or path prefix of the store).
+        If given, each point is saved as it is completed and points 
+        completed in a previous run are skipped.
+    warm_start : bool, optional
+        Whether to walk the grid in serpentine order and seed each point 
+        with the recycle states of its closest converged point. Defaults 
+        to False.
+    
+    """
+    spec_1, spec_2 = np.broadcast_arrays(spec_1, spec_2)
+    shape = spec_1.shape
+    if checkpoint is not None and not isinstance(checkpoint, SweepCheckpoint):
+        checkpoint = SweepCheckpoint(checkpoint, spec_1, spec_2, spec_3)
+    spec_1 = spec_1.flatten()
+    spec_2 = spec_2.flatten()
+    spec_3 = np.asarray(spec_3)
+    if warm_start:
+        indices = serpentine_order(shape)
+        snapshots = RecycleSnapshots(system)
+    else:
+        indices = np.arange(spec_1.size)
+        snapshots = None
+    if checkpoint is None:
+        data = evaluate_at_points(spec, system, indices, shape, spec_1, spec_2, 
+                                  metrics, spec_3, snapshots)
+        results = np.zeros_like(data)
+        results[indices] = data
+        return results.reshape([*shape, *results.shape[1:]])
+    else:
+        indices = indices[~checkpoint.completed[indices]]
+        for index in indices:
+            data = evaluate_at_points(spec, system, [index], shape, spec_1, spec_2, 
+                                      metrics, spec_3, snapshots)
+            checkpoint.save([index], data)
+        return checkpoint.results()
+
+# %% Worker processes
+
+_worker = {}
+
+def _initialize_worker(setup, total_iterations):
+    spec, system, metrics = setup()
+    if _has(spec, 'total_iterations'): spec.total_iterations = total_iterations
+    _worker['spec'] = spec
+    _worker['system'] = system
+    _worker['metrics'] = metrics
+    _worker['snapshots'] = RecycleSnapshots(system)
+
+def _evaluate_chunk(args):
+    indices, shape, spec_1, spec_2, spec_3, warm_start = args
+    spec = _worker['spec']
+    reset_sweep_bookkeeping(spec)
+    data = evaluate_at_points(spec, _worker['system'], indices, shape, spec_1, spec_2,
+                              _worker['metrics'], spec_3, 
+                              _worker['snapshots'] if warm_start else None)
+    return indices, data, get_sweep_bookkeeping(spec)
+
+# %% Parallel evaluation
+
+def split_indices(indices, N_chunks):
+    """Return a list of contiguous chunks of the given indices."""
+    return [i for i in np.array_split(indices, N_chunks) if i.size]
+
+def evaluate_across_specs_in_parallel(setup, spec_1, spec_2, spec_3,
+                                      N_workers=None, chunks_per_worker=4,
+                                      spec=None, checkpoint=None, warm_start=False):
+    """
+    Evaluate metrics at given spec_1 and spec_2 (e.g., yield and titer)
+    across a set of spec_3 values (e.g. productivities) using a pool of
+    worker processes. Return an array with the all metric results.
+
+    Parameters
+    ----------
+    setup : Callable
+        Module-level function that returns a (spec, system, metrics) tuple.
+        It is called once by each worker, so that every worker builds its
+        own system. The process specification must define an
+        `evaluate_at_specs` method and load functions for all specifications.
+    spec_1 : array_like[shape]
+        First specification to evaluate (e.g. yield).
+    spec_2 : array_like[shape]
+        Second specification to evaluate (e.g. titer).
+    spec_3 : array_like[P elements]
+        Third specification to evaluate at each point (e.g. productivity).
+    N_workers : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    chunks_per_worker : int, optional
+        Number of contiguous chunks of grid points dispatched per worker.
+        Defaults to 4.
+    spec : ProcessSpecification, optional
+        If given, point counters, exceptions, and HXN energy balance
+        bookkeeping from all workers are merged into this specification.
+    checkpoint : str or SweepCheckpoint, optional
+        On-disk store of completed points (or path prefix of the store).
+        If given, each chunk is saved as it is completed and points
+        completed in a previous run are skipped.
+    warm_start : bool, optional
+        Whether to walk the grid in serpentine order and seed each point
+        with the recycle states of the closest point converged by the same
+        worker. Defaults to False.
+
+    Returns
+    -------
+    results : array[shape x M x P]
+        All metric results at given spec_1/spec_2 across spec_3.
+
+    Notes
+    -----
+    Exceptions are keyed by point number, as in the serial evaluation.
+    Exceptions that cannot be pickled are returned as RuntimeError objects
+    with the original message.
+
+    """
+    spec_1, spec_2 = np.broadcast_arrays(spec_1, spec_2)
+    shape = spec_1.shape
+    spec_1 = spec_1.flatten()
+    spec_2 = spec_2.flatten()
+    spec_3 = np.asarray(spec_3)
+    N_points = spec_1.size
+    indices = serpentine_order(shape) if warm_start else np.arange(N_points)
+    if checkpoint is not None:
+        if not isinstance(checkpoint, SweepCheckpoint):
+            checkpoint = SweepCheckpoint(checkpoint, spec_1.reshape(shape), 
+                                         spec_2.reshape(shape), spec_3)
+        indices = indices[~checkpoint.completed[indices]]
+        if not indices.size: return checkpoint.results()
+    if N_workers is None: N_workers = os.cpu_count() or 1
+    N_workers = min(N_workers, indices.size)
+    N_chunks = min(indices.size, N_workers * chunks_per_worker)
+    chunks = [(i, shape, spec_1, spec_2, spec_3, warm_start)
+              for i in split_indices(indices, N_chunks)]
+    total_iterations = N_points * spec_3.size
+    results = None
+    with Pool(N_workers, _initialize_worker, (setup, total_iterations)) as pool:
+        for indices, data, bookkeeping in pool.imap_unordered(_evaluate_chunk, chunks):
+            if checkpoint is None:
+                if results is None:
+                    results = np.full([N_points, *data.shape[1:]], np.nan)
+                results[indices] = data
+            else:
+                checkpoint.save(indices, data)
+            if spec is not None:
+                if _has(spec, 'count'): spec.count += indices.size
+                merge_sweep_bookkeeping(spec, bookkeeping)
+    if checkpoint is None:
+        return results.reshape([*shape, *results.shape[1:]])
+    else:
+        return checkpoint.results()
+
+# %% Process specifications
+
+#: [float] Conversion factor from USD/kg to USD/ton.
+_kg_per_ton = 907.185
+
+def prepare_TRY_worker(spec, system, tea, product, *metrics):
+    """
+    Load yield, titer, and productivity as the first, second, and third
+    specifications of the process specification, and return a
+    (spec, system, metrics) tuple for the workers of 
+    `SpecificationSweep.evaluate_across_specs_in_parallel`. The first metric
+    is the minimum selling price of the product [USD/ton], followed by
+    the given metrics.
+    
+    """
+    spec.load_spec_1 = spec.load_yield
+    spec.load_spec_2 = spec.load_titer
+    spec.load_spec_3 = spec.load_productivity
+    get_MPSP = lambda: tea.solve_price(product) * _kg_per_ton # To USD / ton
+    return spec, system, [get_MPSP, *metrics]
+
+class SpecificationSweep:
+    """
+    Abstract class for process specifications that evaluate metrics
+    across a grid of two specifications (e.g., yield x titer) at a set of
+    values of a third specification (e.g., productivity), in series or
+    in parallel. Subclass it along with ReactorSpecification; subclasses
+    must implement the `evaluate_at_specs` method and define `count`,
+    `count_exceptions`, `total_iterations`, and `exceptions_dict`
+    attributes. If defined, the `average_HXN_energy_balance_percent_error`
+    attribute is averaged over all evaluations.
+    
+    """
+    __slots__ = ()
+    
+    def evaluate_at_specs(self, system, spec_1, spec_2, metrics, spec_3):
+        """
+        Evaluate metrics at a single titer and yield across a set of
+        productivities. Return an array with the all metric results
+        (array[M x P]).
+        
+        """
+        raise NotImplementedError(f"'{type(self).__name__}' object has no 'evaluate_at_specs' method")
+    
+    def _reset_sweep(self, spec_1, spec_2, spec_3):
+        self.count = 0
+        self.count_exceptions = 0
+        self.exceptions_dict = {}
+        if _has(self, 'average_HXN_energy_balance_percent_error'):
+            self.average_HXN_energy_balance_percent_error = 0.
+        self.total_iterations = np.broadcast(spec_1, spec_2).size * len(spec_3)
+    
+    def _finish_sweep(self):
+        if self.total_iterations and _has(self, 'average_HXN_energy_balance_percent_error'):
+            self.average_HXN_energy_balance_percent_error /= self.total_iterations
+    
+    def evaluate_across_specs(self, system, 
+            spec_1, spec_2, metrics, spec_3, checkpoint=None,
+            warm_start=False):
+        """
+        Evaluate metrics at given titer and yield across a set of 
+        productivities. Return an array with the all metric results.
+            
+        Parameters
+        ----------
+        system : System
+            System to simulate at each point.
+        spec_1 : array_like[shape]
+            Yield to evaluate.
+        spec_2 : array_like[shape]
+            Titer to evaluate.
+        metrics : Iterable[Callable; M elements]
+            Should return a number given no parameters.
+        spec_3 : array_like[P elements]
+            Productivities to evaluate.
+        checkpoint : str, optional
+            Path prefix of an on-disk store where each completed titer/yield
+            point is saved. If given, points completed in a previous run
+            are skipped.
+        warm_start : bool, optional
+            Whether to walk the grid in serpentine order and seed each point
+            with the converged recycle states of its closest neighbour.
+            Defaults to False.
+        
+        Returns
+        -------
+        results : array[shape x M x P]
+            All metric results at given titer/yield across productivities.
+        
+        Notes
+        -----
+        This method is vectorized along titer and yield. If, for example,
+        the parameters had the following dimensions:
+            
+        titer [Y x T], yield [Y x T], metrics [M], productivities [P]
+        
+        This method would return an array with the following dimensions:
+        
+        results [Y x T x M x P]
+        
+        """
+        self._reset_sweep(spec_1, spec_2, spec_3)
+        results = evaluate_across_specs_in_series(self, system, spec_1, spec_2,
+                                                  metrics, spec_3, checkpoint,
+                                                  warm_start)
+        self._finish_sweep()
+        return results
+    
+    def evaluate_across_specs_in_parallel(self, setup, spec_1, spec_2, spec_3,
+                                          N_workers=None, checkpoint=None,
+                                          warm_start=False):
+        """
+        Evaluate metrics at given titer and yield across a set of
+        productivities using a pool of worker processes. Return an array
+        with the all metric results.
+
+        Parameters
+        ----------
+        setup : Callable
+            Module-level function that returns a (spec, system, metrics)
+            tuple (e.g. `setup_TRY_worker`). Each worker calls it once to
+            build its own system.
+        spec_1 : array_like[shape]
+            Yield to evaluate.
+        spec_2 : array_like[shape]
+            Titer to evaluate.
+        spec_3 : array_like[P elements]
+            Productivities to evaluate.
+        N_workers : int, optional
+            Number of worker processes. Defaults to the number of CPUs.
+        checkpoint : str, optional
+            Path prefix of an on-disk store where each completed titer/yield
+            point is saved. If given, points completed in a previous run
+            are skipped.
+        warm_start : bool, optional
+            Whether to walk the grid in serpentine order and seed each point
+            with the converged recycle states of its closest neighbour.
+            Defaults to False.
+
+        Returns
+        -------
+        results : array[shape x M x P]
+            All metric results at given titer/yield across productivities.
+
+        Notes
+        -----
+        Point counters, exceptions and HXN energy balance bookkeeping from
+        all workers are merged into this specification.
+
+        """
+        self._reset_sweep(spec_1, spec_2, spec_3)
+        results = evaluate_across_specs_in_parallel(setup, spec_1, spec_2, spec_3,
+                                                    N_workers, spec=self,
+                                                    checkpoint=checkpoint,
+                                                    warm_start=warm_start)
+        self._finish_sweep()
+        return results
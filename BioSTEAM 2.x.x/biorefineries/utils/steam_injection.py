@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+This module defines the SteamInjector class, a unit operation that mixes a
+feed with live steam to reach a temperature (or the saturation temperature
+at a pressure), and the solve_steam_injection function, which solves the
+steam flow rate of the mixing energy balance in one step.
+
+"""
+import biosteam as bst
+
+__all__ = ('SteamInjector', 'solve_steam_injection')
+
+#: str CAS number of water.
+water_CAS = '7732-18-5'
+
+def solve_steam_injection(feed, steam, mixed, T, steam_enthalpy=None):
+    """
+    Set the water flow rate of the steam so that mixing it with the feed
+    results in the given temperature, and set the mixed stream. Return the
+    steam molar flow rate [kmol/hr].
+
+    Parameters
+    ----------
+    feed : Stream
+        Feed to heat.
+    steam : Stream
+        Steam; only the water flow rate is set.
+    mixed : Stream
+        Mixed stream.
+    T : float
+        Temperature of mixed stream [K].
+    steam_enthalpy : float, optional
+        Enthalpy of steam per mole of water [kJ/kmol]. Defaults to the
+        enthalpy of the steam stream at its temperature and pressure.
+
+    Notes
+    -----
+    The enthalpy of the mixed stream is linear in the flow rate of water at
+    a fixed temperature, so the energy balance
+
+    .. math::
+        H_{feed} + n h_{steam} = H_{feed}(T) + n h_{water}(T)
+
+    is solved for the steam flow rate, n, directly. A single Newton step
+    corrects for any remaining error (e.g., non-ideal mixing enthalpy).
+    If the feed is already above the temperature, no steam is added and
+    the mixed stream is set at the temperature of the feed.
+
+    """
+    imol = steam.imol
+    if steam_enthalpy is None:
+        imol[water_CAS] = 1.
+        steam_enthalpy = steam.H
+    H_feed = feed.H
+    mixed.mol[:] = feed.mol
+    mixed.T = T
+    H_feed_at_T = mixed.H
+    mixed.imol[water_CAS] += 1.
+    water_enthalpy = mixed.H - H_feed_at_T
+    dH_steam = steam_enthalpy - water_enthalpy
+    steam_mol = (H_feed_at_T - H_feed) / dH_steam
+    if steam_mol < 0.:
+        imol[water_CAS] = 0.
+        mixed.mol[:] = feed.mol
+        mixed.H = H_feed
+        return 0.
+    imol[water_CAS] = steam_mol
+    mixed.mol[:] = feed.mol + steam.mol
+    mixed.T = T
+    error = H_feed + steam_mol * steam_enthalpy - mixed.H
+    if abs(error) > 1e-9 * abs(H_feed_at_T - H_feed):
+        steam_mol = max(steam_mol + error / dH_steam, 0.)
+        imol[water_CAS] = steam_mol
+        mixed.mol[:] = feed.mol + steam.mol
+        mixed.T = T
+    return steam_mol
+
+
+class SteamInjector(bst.Unit):
+    """
+    Create a SteamInjector object that mixes a feed with the steam
+    required to reach a temperature. If no temperature is given, the
+    saturation temperature of water at the pressure is used.
+
+    Parameters
+    ----------
+    ins : stream sequence
+        [0] Feed
+
+        [1] Steam
+    outs : stream
+        Mixed product.
+    T : float, optional
+        Temperature of mixed product [K].
+    P : float, optional
+        Pressure of mixed product [Pa].
+
+    """
+    _N_ins = 2
+    _N_outs = 1
+    _N_heat_utilities = 0
+
+    #: [float] Enthalpy of steam per mole of water [kJ/kmol]. If None, the
+    #: enthalpy of the steam stream is used.
+    steam_enthalpy = None
+
+    def __init__(self, ID='', ins=None, outs=(), thermo=None, *, T=None, P=None):
+        super().__init__(ID, ins, outs, thermo)
+        self.T = T
+        self.P = P
+
+    def _get_mixing_temperature(self):
+        T = self.T
+        if T is None:
+            chemicals = self.chemicals
+            water = chemicals.tuple[chemicals.index(water_CAS)]
+            T = water.Tsat(self.P)
+        return T
+
+    def _run(self):
+        feed, steam = self._ins
+        mixed, = self.outs
+        solve_steam_injection(feed, steam, mixed, self._get_mixing_temperature(),
+                              self.steam_enthalpy)
+        if self.P is not None: mixed.P = self.P
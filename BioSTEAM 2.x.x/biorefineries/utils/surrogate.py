@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+This module defines the ResponseSurface class, a polynomial surrogate model
+fitted by least squares to sampled model results within a box-shaped domain.
+Surrogates can be saved to and loaded from .npz files.
+
+"""
+import numpy as np
+from itertools import combinations_with_replacement
+
+__all__ = ('ResponseSurface',)
+
+def polynomial_powers(N_inputs, degree):
+    """Return the powers of all monomials of up to the given total degree as a 2d array."""
+    powers = []
+    for n in range(degree + 1):
+        for combination in combinations_with_replacement(range(N_inputs), n):
+            power = np.zeros(N_inputs, dtype=int)
+            for i in combination: power[i] += 1
+            powers.append(power)
+    return np.array(powers)
+
+class ResponseSurface:
+    """
+    Create a ResponseSurface object, a polynomial of the inputs for each
+    output. Inputs are scaled to [-1, 1] within the domain bounds before
+    evaluating the polynomial.
+
+    Parameters
+    ----------
+    inputs : tuple[str]
+        Names of inputs.
+    outputs : tuple[str]
+        Names of outputs.
+    lower : 1d array
+        Lower bounds of inputs.
+    upper : 1d array
+        Upper bounds of inputs.
+    powers : 2d array
+        Powers of inputs in each polynomial term (terms x inputs).
+    coefficients : 2d array
+        Polynomial coefficients (terms x outputs).
+    R2 : 1d array, optional
+        Coefficient of determination of each output on the fitted data.
+
+    """
+    __slots__ = ('inputs', 'outputs', 'lower', 'upper',
+                 'powers', 'coefficients', 'R2')
+
+    def __init__(self, inputs, outputs, lower, upper, powers, coefficients, R2=None):
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.lower = np.asarray(lower, dtype=float)
+        self.upper = np.asarray(upper, dtype=float)
+        self.powers = np.asarray(powers, dtype=int)
+        self.coefficients = np.asarray(coefficients, dtype=float)
+        self.R2 = None if R2 is None else np.asarray(R2, dtype=float)
+
+    @classmethod
+    def fit(cls, X, Y, inputs, outputs, degree=3, lower=None, upper=None,
+            min_R2=None):
+        """
+        Return a ResponseSurface object fitted to input samples `X` (samples x
+        inputs) and output values `Y` (samples x outputs). Bounds default to
+        the range of the samples. If `min_R2` is given, a ValueError is raised
+        if the coefficient of determination of any output is less than 
+        `min_R2`.
+
+        """
+        X = np.asarray(X, dtype=float)
+        Y = np.asarray(Y, dtype=float)
+        if Y.ndim == 1: Y = Y[:, np.newaxis]
+        lower = X.min(0) if lower is None else lower
+        upper = X.max(0) if upper is None else upper
+        powers = polynomial_powers(X.shape[1], degree)
+        if len(powers) > X.shape[0]:
+            raise ValueError(f'at least {len(powers)} samples are required to '
+                             f'fit a polynomial of degree {degree}; only '
+                             f'{X.shape[0]} given')
+        surrogate = cls(inputs, outputs, lower, upper, powers,
+                        np.zeros([len(powers), Y.shape[1]]))
+        A = surrogate._terms(X)
+        surrogate.coefficients = np.linalg.lstsq(A, Y, rcond=None)[0]
+        residuals = Y - A @ surrogate.coefficients
+        SS_residuals = (residuals**2).sum(0)
+        SS_total = ((Y - Y.mean(0))**2).sum(0)
+        constant = SS_total == 0.
+        SS_total[constant] = 1.
+        surrogate.R2 = R2 = 1. - SS_residuals / SS_total
+        R2[constant] = 1. # Constant outputs are fitted by the intercept
+        if min_R2 is not None:
+            poor_fit = [i for i, j in zip(surrogate.outputs, R2) if not j >= min_R2]
+            if poor_fit:
+                raise ValueError(f'coefficient of determination of {", ".join(poor_fit)} '
+                                 f'is less than {min_R2}; increase the number '
+                                 f'of samples or the degree of the polynomial')
+        return surrogate
+
+    def _terms(self, X):
+        lower = self.lower
+        x = 2. * (X - lower) / (self.upper - lower) - 1.
+        return (x[:, np.newaxis, :] ** self.powers).prod(2)
+
+    def in_domain(self, x):
+        """Return whether the input sample is within the domain bounds."""
+        x = np.asarray(x, dtype=float)
+        return bool(((self.lower <= x) & (x <= self.upper)).all())
+
+    def predict(self, X):
+        """Return predicted outputs (samples x outputs) at input samples (samples x inputs)."""
+        X = np.asarray(X, dtype=float)
+        return self._terms(np.atleast_2d(X)) @ self.coefficients
+
+    def __call__(self, x):
+        """Return a dictionary of predicted outputs at the input sample."""
+        return dict(zip(self.outputs, self.predict(x)[0].tolist()))
+
+    def save(self, file):
+        """Save surrogate to a .npz file."""
+        np.savez(file, inputs=self.inputs, outputs=self.outputs,
+                 lower=self.lower, upper=self.upper, powers=self.powers,
+                 coefficients=self.coefficients,
+                 R2=np.full(len(self.outputs), np.nan) if self.R2 is None else self.R2)
+
+    @classmethod
+    def load(cls, file):
+        """Return a ResponseSurface object from a .npz file."""
+        with np.load(file) as data:
+            return cls([str(i) for i in data['inputs']],
+                       [str(i) for i in data['outputs']],
+                       data['lower'], data['upper'], data['powers'],
+                       data['coefficients'], data['R2'])
+
+    def __repr__(self):
+        return f'{type(self).__name__}(inputs={self.inputs}, outputs={self.outputs})'
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+This module defines the SystemState class, which holds the flow rates,
+temperatures, pressures and phases of all streams in a converged system so
+that the system can be restored without simulating (e.g., from disk), and the
+rescale_system function, which scales a converged system to a new feed rate.
+
+"""
+import pickle
+
+__all__ = ('SystemState', 'rescale_system')
+
+class SystemState:
+    """
+    Create a SystemState object from the streams of a converged system.
+
+    Parameters
+    ----------
+    system : System
+        Converged system.
+
+    Examples
+    --------
+    >>> from biorefineries import lipidcane as lc
+    >>> from biorefineries.utils import SystemState
+    >>> state = SystemState(lc.lipidcane_sys)
+    >>> state.save('lipidcane_state.pkl')
+    >>> SystemState.load('lipidcane_state.pkl').restore(lc.lipidcane_sys)
+
+    """
+    __slots__ = ('IDs', 'data')
+
+    def __init__(self, system):
+        streams = self._get_streams(system)
+        #: tuple[str] IDs of streams.
+        self.IDs = tuple([i.ID for i in streams])
+        #: list[tuple] Phases, molar flow rates, temperature and pressure of streams.
+        self.data = [(i.phases, i.imol.data.copy(), i.T, i.P) for i in streams]
+
+    @staticmethod
+    def _get_streams(system):
+        return sorted(system.streams, key=lambda i: str(i.ID))
+
+    def restore(self, system):
+        """Set the streams of the system to this state."""
+        streams = self._get_streams(system)
+        IDs = tuple([i.ID for i in streams])
+        if IDs != self.IDs:
+            raise RuntimeError('system streams do not match the state; '
+                               'cannot restore state')
+        for stream, (phases, mol, T, P) in zip(streams, self.data):
+            stream.phases = phases
+            stream.imol.data[:] = mol
+            stream.T = T
+            stream.P = P
+
+    def save(self, file):
+        """Save state to a pickle file."""
+        with open(file, 'wb') as f: pickle.dump(self, f)
+
+    @classmethod
+    def load(cls, file):
+        """Return a SystemState object from a pickle file."""
+        with open(file, 'rb') as f: return pickle.load(f)
+
+    def __getstate__(self):
+        return self.IDs, self.data
+
+    def __setstate__(self, state):
+        self.IDs, self.data = state
+
+    def __repr__(self):
+        return f'<{type(self).__name__}: {len(self.IDs)} streams>'
+
+
+def rescale_system(system, factor):
+    """
+    Scale the flow rates of all streams of a converged system by a factor and
+    re-evaluate the design, cost, and facilities of the system without
+    converging the recycle loops again. Mass and energy balances are assumed
+    to be linear in the feed rate.
+
+    """
+    scaled = set() # Streams may share flow rate data (e.g., proxy streams)
+    for i in system.streams:
+        data = i.imol.data
+        if id(data) in scaled: continue
+        scaled.add(id(data))
+        data *= factor
+    system._summary()
+    facility_loop = getattr(system, '_facility_loop', None)
+    if facility_loop: facility_loop._converge()
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+This module defines the TEABatch class, which evaluates the discounted cash
+flow of a TEA object across a batch of economic scenarios (stream prices,
+IRR, operating days, and start/end year) at once with NumPy arrays.
+None of these scenarios change the mass and energy balances, so the
+converged system is used as is.
+
+"""
+import numpy as np
+import biosteam as bst
+
+__all__ = ('TEABatch',)
+
+class TEABatch:
+    """
+    Create a TEABatch object that evaluates the cash flow of a TEA across
+    many economic scenarios of one converged system. Each scenario may have
+    its own stream prices, IRR, operating days, and start/end year;
+    arguments are broadcasted against each other, so scalars apply to all
+    scenarios.
+
+    The capital investment, depreciation, loan, and fixed operating cost
+    are taken from the TEA as is, while the material cost, utility cost and
+    sales are scaled with the operating hours and updated with the prices
+    of the scenarios. Income tax is charged on positive taxable cash flows
+    as in the biosteam TEA.
+
+    Parameters
+    ----------
+    tea : TEA
+        TEA of a converged system.
+    streams : Iterable[Stream], optional
+        Feeds and products with prices that vary across scenarios.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from biorefineries import cornstover as cs
+    >>> from biorefineries.utils import TEABatch
+    >>> batch = TEABatch(cs.cornstover_tea, (cs.cornstover, cs.ethanol))
+    >>> MESP = batch.solve_price(cs.ethanol, IRR=np.linspace(0.05, 0.20, 1000),
+    ...                          prices={cs.cornstover: 0.06})
+
+    """
+    __slots__ = ('tea', 'streams')
+
+    def __init__(self, tea, streams=()):
+        tea_type = type(tea)
+        if tea_type._fill_tax_and_incentives is not bst.TEA._fill_tax_and_incentives:
+            raise NotImplementedError(
+                f"{tea_type.__name__} objects overwrite how tax and "
+                 "incentives are computed; cannot evaluate in batch"
+            )
+        self.tea = tea
+        self.streams = tuple(streams)
+
+    def _sign(self, stream):
+        if stream.sink and not stream.source: return -1. # Feed, a cost
+        elif stream.source: return 1. # Product, a sale
+        else: raise ValueError("stream must be either a feed or a product")
+
+    def _scenarios(self, prices, IRR, operating_days, start_year, end_year):
+        tea = self.tea
+        streams = self.streams
+        prices = prices or {}
+        for i in prices:
+            if i not in streams:
+                raise ValueError(f'price of {repr(i)} cannot change; '
+                                  'stream must be passed to the TEABatch object')
+        start, end = tea.duration
+        arrays = [tea.IRR if IRR is None else IRR,
+                  tea.operating_days if operating_days is None else operating_days,
+                  start if start_year is None else start_year,
+                  end if end_year is None else end_year,
+                  *[prices.get(i, i.price) for i in streams]]
+        arrays = np.broadcast_arrays(*[np.asarray(i, dtype=float) for i in arrays])
+        IRR, operating_days, start_year, end_year, *prices = [np.ravel(i) for i in arrays]
+        return IRR, operating_days * 24., start_year.astype(int), end_year.astype(int), prices
+
+    def _cashflows(self, IRR, hours, start_year, end_year, prices):
+        # Yield the index, taxable cash flow, nontaxable cash flow,
+        # discount factors, duration array, hours, and sales and VOC
+        # coefficients of the scenarios with the same start and end year
+        tea = self.tea
+        hours_0 = tea.operating_hours
+        VOC_0 = tea.VOC
+        sales_0 = tea.sales
+        # Annual material cost and sales change in USD/yr per operating hour
+        dVOC = np.zeros_like(hours)
+        dsales = np.zeros_like(hours)
+        for stream, price in zip(self.streams, prices):
+            dcost = stream.F_mass * (price - stream.price)
+            if self._sign(stream) < 0.: dVOC += dcost
+            else: dsales += dcost
+        VOC = hours * (VOC_0 / hours_0 + dVOC)
+        sales = hours * (sales_0 / hours_0 + dsales)
+        w0 = tea._startup_time
+        w1 = 1. - w0
+        duration = tea.duration
+        try:
+            for key in set(zip(start_year, end_year)):
+                index, = np.where((start_year == key[0]) & (end_year == key[1]))
+                tea.duration = key
+                start = tea._start
+                taxable, nontaxable = tea._taxable_and_nontaxable_cashflow_arrays()
+                sales_coefficients = np.ones_like(taxable)
+                sales_coefficients[:start] = 0.
+                VOC_coefficients = sales_coefficients.copy()
+                sales_coefficients[start] = w0 * tea.startup_salesfrac + w1
+                VOC_coefficients[start] = w0 * tea.startup_VOCfrac + w1
+                taxable = (taxable
+                           + np.outer(sales[index] - sales_0, sales_coefficients)
+                           - np.outer(VOC[index] - VOC_0, VOC_coefficients))
+                duration_array = tea._get_duration_array()
+                discount_factors = (1. + IRR[index, None]) ** duration_array
+                yield (index, taxable, nontaxable, discount_factors, duration_array,
+                       hours[index], sales_coefficients, VOC_coefficients)
+        finally:
+            tea.duration = duration
+
+    def _cashflow(self, taxable, nontaxable):
+        income_tax = self.tea.income_tax
+        return nontaxable + taxable - income_tax * np.where(taxable > 0., taxable, 0.)
+
+    def VOC(self, prices=None, operating_days=None):
+        """Return the variable operating cost of the scenarios [USD/yr]."""
+        tea = self.tea
+        IRR, hours, start_year, end_year, prices = self._scenarios(
+            prices, None, operating_days, None, None
+        )
+        dVOC = sum([i.F_mass * (j - i.price) for i, j in zip(self.streams, prices)
+                    if self._sign(i) < 0.], 0.)
+        return hours * (tea.VOC / tea.operating_hours + dVOC)
+
+    def NPV(self, prices=None, IRR=None, operating_days=None,
+            start_year=None, end_year=None):
+        """Return the net present value of the scenarios [USD]."""
+        scenarios = self._scenarios(prices, IRR, operating_days, start_year, end_year)
+        results = np.zeros(scenarios[0].size)
+        for index, taxable, nontaxable, discount_factors, *_ in self._cashflows(*scenarios):
+            cashflow = self._cashflow(taxable, nontaxable)
+            results[index] = (cashflow / discount_factors).sum(1)
+        return results
+
+    def solve_price(self, stream, prices=None, IRR=None, operating_days=None,
+                    start_year=None, end_year=None, xtol=1e-6, maxiter=100):
+        """
+        Return the price [USD/kg] of a stream at the break even point
+        (NPV = 0) of each scenario.
+
+        Notes
+        -----
+        The NPV is piecewise linear and concave in the price (income tax is
+        only charged on positive taxable cash flows), so Newton's method
+        converges in a few iterations from any initial guess.
+
+        """
+        if stream not in self.streams:
+            raise ValueError(f'{repr(stream)} must be passed to the TEABatch object')
+        sign = self._sign(stream)
+        F_mass = stream.F_mass
+        income_tax = self.tea.income_tax
+        scenarios = self._scenarios(prices, IRR, operating_days, start_year, end_year)
+        if not F_mass: return np.full(scenarios[0].size, np.inf)
+        results = scenarios[-1][self.streams.index(stream)].copy()
+        for (index, taxable, nontaxable, discount_factors, duration_array,
+             hours, sales_coefficients, VOC_coefficients) in self._cashflows(*scenarios):
+            coefficients = sales_coefficients if sign > 0. else -VOC_coefficients
+            # Change in taxable cash flow per change in price
+            a = np.outer(F_mass * hours, coefficients)
+            x = np.zeros(index.size)
+            for i in range(maxiter):
+                T = taxable + x[:, None] * a
+                taxed = T > 0.
+                cashflow = nontaxable + T - income_tax * np.where(taxed, T, 0.)
+                NPV = (cashflow / discount_factors).sum(1)
+                dNPV = (a * (1. - income_tax * taxed) / discount_factors).sum(1)
+                dx = NPV / dNPV
+                x -= dx
+                if (np.abs(dx) < xtol).all(): break
+            results[index] += x
+        return results
+
+    def solve_IRR(self, prices=None, operating_days=None, start_year=None,
+                  end_year=None, IRR=None, xtol=1e-6, maxiter=200):
+        """
+        Return the IRR at the break even point (NPV = 0) of each scenario.
+        The `IRR` argument is only used as the initial guess.
+
+        """
+        scenarios = self._scenarios(prices, IRR, operating_days, start_year, end_year)
+        results = np.zeros(scenarios[0].size)
+        for (index, taxable, nontaxable, discount_factors, duration_array,
+             *_) in self._cashflows(*scenarios):
+            cashflow = self._cashflow(taxable, nontaxable)
+            r = scenarios[0][index]
+            r = np.where(r > 0., r, 0.10)
+            for i in range(maxiter):
+                discount_factors = (1. + r[:, None]) ** duration_array
+                NPV = (cashflow / discount_factors).sum(1)
+                dNPV = -(duration_array * cashflow / (discount_factors * (1. + r[:, None]))).sum(1)
+                dr = NPV / dNPV
+                # Do not step past r = -1
+                r = np.where(r - dr > -1., r - dr, 0.5 * (r - 1.))
+                if (np.abs(dr) < xtol).all(): break
+            results[index] = r
+        return results
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+This module defines the WarmStartSolver class, a bounded 1-D root finder
+for process specifications that remembers the last root and the local slope
+of the objective function, so that successive solves (e.g., across recycle
+iterations or Monte Carlo samples) start from the last solution. Hits and
+misses are counted to gauge the benefit.
+
+"""
+import flexsolve as flx
+
+__all__ = ('WarmStartSolver',)
+
+class WarmStartSolver:
+    """
+    Create a WarmStartSolver object that solves `f(x) = 0` within bounds,
+    starting from the last root.
+
+    Parameters
+    ----------
+    f : Callable
+        Objective function.
+    x_min, x_max : float
+        Bounds of `x`.
+    xtol : float, optional
+        Tolerance of `x`. Defaults to 0.
+    ytol : float, optional
+        Tolerance of the objective function. Defaults to 5e-8.
+    maxiter : int, optional
+        Maximum number of iterations. Defaults to 50.
+    checkbounds : bool, optional
+        Whether to raise a ValueError if the objective function has the
+        same sign at both bounds of the bracketed search. Defaults to True.
+
+    Examples
+    --------
+    >>> from biorefineries.utils import WarmStartSolver
+    >>> solver = WarmStartSolver(titer_at_water, 0., 1e10, xtol=0.1, ytol=0.01)
+    >>> water_R301.imass['Water'] = solver.solve()
+    >>> solver # Hits are solves that start from the last root
+    <WarmStartSolver: titer_at_water, 0 hits, 1 miss, 12 evaluations>
+
+    Notes
+    -----
+    Each solve first evaluates the last root. If it is not within tolerance,
+    one secant step is taken with the last slope; a new root within
+    tolerance, or a bracket of the two points, is a hit. Otherwise (a
+    miss), the bracketed search starts from the bounds as it would with no
+    previous solution.
+
+    """
+    __slots__ = ('f', 'x_min', 'x_max', 'xtol', 'ytol', 'maxiter', 'checkbounds',
+                 'x', 'slope', 'N_hits', 'N_misses', 'N_evaluations',
+                 '_points')
+
+    def __init__(self, f, x_min, x_max, xtol=0., ytol=5e-8, maxiter=50, checkbounds=True):
+        #: [Callable] Objective function.
+        self.f = f
+        #: [float] Lower bound of `x`.
+        self.x_min = x_min
+        #: [float] Upper bound of `x`.
+        self.x_max = x_max
+        #: [float] Tolerance of `x`.
+        self.xtol = xtol
+        #: [float] Tolerance of the objective function.
+        self.ytol = ytol
+        #: [int] Maximum number of iterations.
+        self.maxiter = maxiter
+        #: [bool] Whether to check that the objective function changes sign
+        #: within the bounds of the bracketed search.
+        self.checkbounds = checkbounds
+        self.reset()
+
+    def reset(self):
+        """Forget the last root and reset statistics."""
+        #: [float] Last root.
+        self.x = None
+        #: [float] Slope of the objective function near the last root.
+        self.slope = None
+        #: [int] Number of solves that started from the last root.
+        self.N_hits = 0
+        #: [int] Number of solves that required a bracketed search from the bounds.
+        self.N_misses = 0
+        #: [int] Number of evaluations of the objective function.
+        self.N_evaluations = 0
+        self._points = []
+
+    @property
+    def hit_rate(self):
+        """[float] Fraction of solves that started from the last root."""
+        N = self.N_hits + self.N_misses
+        return self.N_hits / N if N else 0.
+
+    def _f(self, x, *args):
+        y = self.f(x, *args)
+        self._points.append((x, y))
+        return y
+
+    def _warm_solve(self, args, x_min, x_max):
+        f = self._f
+        ytol = self.ytol
+        x0 = min(max(self.x, x_min), x_max)
+        y0 = f(x0, *args)
+        if abs(y0) < ytol: return x0
+        slope = self.slope
+        if not slope: return None
+        x1 = min(max(x0 - y0 / slope, x_min), x_max)
+        if x1 == x0: return None
+        y1 = f(x1, *args)
+        if abs(y1) < ytol or abs(x1 - x0) < self.xtol: return x1
+        if (y0 < 0.) is not (y1 < 0.):
+            return flx.IQ_interpolation(f, x0, x1, y0=y0, y1=y1,
+                                        xtol=self.xtol, ytol=ytol, maxiter=self.maxiter,
+                                        args=args, checkbounds=self.checkbounds)
+
+    def _update_slope(self):
+        points = sorted(self._points, key=lambda i: abs(i[1]))
+        if not points: return
+        xa, ya = points[0]
+        for xb, yb in points[1:]:
+            if xb != xa and yb != ya:
+                self.slope = (yb - ya) / (xb - xa)
+                return
+
+    def solve(self, *args, x_min=None, x_max=None, x=None):
+        """
+        Return the root of the objective function.
+
+        Parameters
+        ----------
+        *args
+            Arguments of the objective function.
+        x_min, x_max : float, optional
+            Bounds of `x` for this solve. Default to the bounds of the solver.
+        x : float, optional
+            Guess of the bracketed search if there is no last root (or it misses).
+
+        """
+        if x_min is None: x_min = self.x_min
+        if x_max is None: x_max = self.x_max
+        self._points = []
+        try:
+            root = None if self.x is None else self._warm_solve(args, x_min, x_max)
+            if root is None:
+                self.N_misses += 1
+                root = flx.IQ_interpolation(self._f, x_min, x_max, x=x,
+                                            xtol=self.xtol, ytol=self.ytol, maxiter=self.maxiter,
+                                            args=args, checkbounds=self.checkbounds)
+            else:
+                self.N_hits += 1
+        finally:
+            self.N_evaluations += len(self._points)
+        self._update_slope()
+        self.x = root
+        return root
+
+    def __repr__(self):
+        name = getattr(self.f, '__name__', None) or repr(self.f)
+        hits = 'hit' if self.N_hits == 1 else 'hits'
+        misses = 'miss' if self.N_misses == 1 else 'misses'
+        return (f"<{type(self).__name__}: {name}, {self.N_hits} {hits}, "
+                f"{self.N_misses} {misses}, {self.N_evaluations} evaluations>")
@@ -10,7 +10,6 @@ Humbird, D., Davis, R., Tao, L., Kinchin, C., Hsu, D., Aden, A., Dudgeon, D. (20
 """
 import os
 import sys
-import flexsolve as flx
 from thermosteam import MultiStream
 from biosteam import Unit
 from biosteam.units.decorators import cost, design
@@ -26,6 +25,7 @@ ParallelRxn = tmo.reaction.ParallelReaction
 # %% Add excel unit operations
 
 from biosteam.units.factories import xl2mod
+from biorefineries.utils import SteamInjector
 path = os.path.join(os.path.dirname(os.path.realpath(__file__)), '_humbird2011.xlsx')
 xl2mod(path, sys.modules[__name__])
 del sys, xl2mod, os, path
@@ -85,7 +85,7 @@ class WashingTank(bst.Unit):
 
 
 # %% Pretreatment
-class SteamMixer(Unit):
+class SteamMixer(SteamInjector):
     """
     **ins**
     
@@ -101,27 +101,14 @@ class SteamMixer(Unit):
     _N_outs = 1
     _N_ins = 2
     _N_heat_utilities = 1
+    steam_enthalpy = 40798 # kJ/kmol
     def __init__(self, ID='', ins=None, outs=(), *, P):
-        super().__init__(ID, ins, outs)
-        self.P = P
-    
-    @staticmethod
-    def _P_at_flow(mol_water, P, steam, mixed, feed):
-        steam.imol['7732-18-5'] = mol_water
-        mixed.mol[:] = steam.mol + feed.mol
-        mixed.H = feed.H + mol_water * 40798
-        P_new = mixed.chemicals.Water.Psat(mixed.T)
-        return P - P_new
+        super().__init__(ID, ins, outs, P=P)
     
     def _run(self):
-        feed, steam = self._ins
-        steam_mol = steam.F_mol
+        super()._run()
+        steam = self._ins[1]
         mixed = self.outs[0]
-        steam_mol = flx.aitken_secant(self._P_at_flow,
-                                  steam_mol, steam_mol+0.1, 
-                                  1e-4, 1e-4,
-                                  args=(self.P, steam, mixed, feed))
-        mixed.P = self.P      
         hu = self.heat_utilities[0]
         hu(steam.Hvap, mixed.T)
 
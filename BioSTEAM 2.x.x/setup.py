@@ -15,7 +15,8 @@ setup(
     description="Biorefinery models in BioSTEAM",
     long_description=open('README.rst').read(),
     author='Yoel Cortes-Pena',
-    install_requires=['biosteam>=2.28.2'],
+    install_requires=['biosteam>=2.28.2,<2.29'],
+    extras_require={'sink': ['pyarrow']},
     python_requires=">=3.6",
     package_data=
         {'biorefineries': ['biorefineries/*',
@@ -31,6 +32,7 @@ setup(
                            'LAOs/*',
                            'LAOs/units/*',
                            'tests/*',
+                           'utils/*',
                       ]},
     platforms=['Windows', 'Mac', 'Linux'],
     author_email='yoelcortes@gmail.com',